@@ -13,6 +13,8 @@ load_dotenv()
 
 from src.agents.tutor_agent import ChatbotTutor, ModelTrainingTutor, ProgrammingTutor
 from src.rag.database import db_manager
+from src.scraping.transport import close_firecrawl_transport
+from src.tools.process_pool import close_process_pool
 
 app = FastAPI(title="Claude Education API", version="1.0.0")
 
@@ -98,6 +100,16 @@ async def startup_event():
     except Exception as e:
         print(f"⚠️  Database initialization warning: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close database connections and worker pools on shutdown"""
+    try:
+        await db_manager.close()
+    except Exception as e:
+        print(f"⚠️  Database shutdown warning: {e}")
+    close_firecrawl_transport()
+    close_process_pool()
+
 @app.get("/")
 async def root():
     return {
@@ -11,6 +11,9 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str
+    db_acquire_timeout: float = 30.0
+    db_advisory_lock_timeout: float = 300.0
+    db_advisory_lock_poll_interval: float = 1.0
     
     # Model Settings
     claude_model: str = "claude-3-5-sonnet-20241022"
@@ -22,6 +25,66 @@ class Settings(BaseSettings):
     chunk_overlap: int = 200
     top_k_results: int = 5
     
+    # Scraping Settings
+    firecrawl_max_workers: int = 4
+    firecrawl_batch_poll_interval: float = 1.0
+    firecrawl_batch_timeout: float = 120.0
+    analysis_token_budget: int = 2000
+    near_duplicate_max_distance: int = 7
+    revalidation_allow_private_hosts: bool = False  # conditional HEADs to non-public addresses
+    
+    # Lead Queue Settings
+    lead_worker_concurrency: int = 4
+    lead_worker_lease_seconds: float = 600.0
+    lead_worker_max_attempts: int = 3
+    lead_worker_poll_interval: float = 5.0
+    
+    # Content Gate Settings (checked before Claude analysis)
+    content_gate_enabled: bool = True
+    content_gate_languages: List[str] = ["english", "spanish"]
+    content_gate_min_words: int = 100
+    content_gate_min_relevance: float = 0.005
+    
+    # Process Pool Settings (CPU-bound text processing)
+    process_pool_max_workers: Optional[int] = None  # defaults to the CPU count
+    process_pool_inline_chars: int = 20000
+    
+    # Scrape Cache Memory Tier Settings
+    memory_cache_max_entries: int = 1000
+    memory_cache_max_bytes: int = 64 * 1024 * 1024
+    memory_cache_ttl_seconds: float = 24 * 3600.0
+    
+    # Analysis Memo Memory Tier Settings
+    memo_memory_max_entries: int = 5000
+    memo_memory_max_bytes: int = 32 * 1024 * 1024
+    memo_memory_ttl_seconds: float = 24 * 3600.0
+    
+    # Page Fingerprint Memory Tier Settings
+    fingerprint_memory_max_entries: int = 20000
+    fingerprint_memory_max_bytes: int = 8 * 1024 * 1024
+    fingerprint_memory_ttl_seconds: float = 24 * 3600.0
+    
+    # Wait Profile Memory Tier Settings
+    wait_profile_memory_max_entries: int = 10000
+    wait_profile_memory_max_bytes: int = 2 * 1024 * 1024
+    wait_profile_memory_ttl_seconds: float = 24 * 3600.0
+    
+    # Near-Duplicate Index Memory Tier Settings
+    near_duplicate_memory_max_entries: int = 20000
+    near_duplicate_memory_max_bytes: int = 32 * 1024 * 1024
+    near_duplicate_memory_ttl_seconds: float = 24 * 3600.0
+    
+    # Scrape Cache File Tier Settings
+    cache_file_format: str = "compact"  # or "json" for pretty-printed files
+    cache_compression_level: int = 3  # zlib level; 0 stores compact JSON uncompressed
+    cache_file_tier: str = "files"  # or "segments" for the append-only segment log
+    cache_segment_max_bytes: int = 64 * 1024 * 1024
+    cache_compaction_threshold: float = 0.5
+    cache_write_behind: bool = True
+    cache_write_queue_size: int = 1000
+    cache_write_batch_size: int = 50
+    cache_write_flush_interval: float = 0.5
+    
     # File paths
     knowledge_base_path: str = "data/knowledge_base"
     chroma_db_path: str = "data/chroma_db"
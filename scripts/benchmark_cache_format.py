@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the compact file cache format against pretty-printed JSON
+"""
+
+import json
+import random
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import settings
+from src.scraping.cache_format import decode_entry, encode_entry, orjson
+
+WORDS = (
+    "python loop function variable tutorial example learn list dictionary "
+    "class object method return value string integer print range index error"
+).split()
+
+def build_entry(i: int, rng: random.Random) -> dict:
+    """Build a cache entry shaped like a scraped and analyzed tutorial page"""
+    sections = []
+    for s in range(rng.randint(20, 80)):
+        prose = " ".join(rng.choice(WORDS) for _ in range(rng.randint(60, 160)))
+        sections.append(
+            f"## Section {s}\n\n{prose}\n\n"
+            f"[Next lesson](https://example.com/course-{i}/lesson-{s + 1})\n\n"
+            f"```python\nfor n in range({s}):\n    print(n * {i})\n```"
+        )
+    url = f"https://example.com/course-{i}/lesson-1"
+    return {
+        "url": url,
+        "data": {
+            "url": url,
+            "pages": [{
+                "url": url,
+                "markdown": "\n\n".join(sections),
+                "metadata": {"title": f"Lesson {i}", "language": "en", "statusCode": 200}
+            }],
+            "learning_objectives": [f"objective {n}" for n in range(8)],
+            "difficulty_level": "beginner"
+        },
+        "timestamp": "2026-01-01T00:00:00",
+        "cache_type": "tutorials"
+    }
+
+def legacy_encode(entry: dict) -> bytes:
+    """Pretty-printed JSON as previously written"""
+    return json.dumps(entry, indent=2, ensure_ascii=False).encode("utf-8")
+
+def legacy_decode(raw: bytes) -> dict:
+    """Stdlib JSON parse as previously read"""
+    return json.loads(raw.decode("utf-8"))
+
+def run(name: str, directory: Path, entries: list, encode, decode) -> None:
+    """Write then read back every entry and print sizes and throughput"""
+    payload = sum(len(json.dumps(entry, separators=(",", ":"))) for entry in entries)
+
+    start = time.perf_counter()
+    for i, entry in enumerate(entries):
+        (directory / f"{i}.{name}").write_bytes(encode(entry))
+    write_seconds = time.perf_counter() - start
+
+    files = [directory / f"{i}.{name}" for i in range(len(entries))]
+    disk = sum(f.stat().st_size for f in files)
+
+    def read_all(cold: bool) -> float:
+        if cold:
+            evict_from_page_cache(files)
+        start = time.perf_counter()
+        for file_path in files:
+            decode(file_path.read_bytes())
+        return time.perf_counter() - start
+
+    cold_seconds = read_all(cold=True)
+    warm_seconds = read_all(cold=False)
+
+    mb = payload / 1024 / 1024
+    print(
+        f"{name:<8} disk {disk / 1024 / 1024:6.1f} MB   write {mb / write_seconds:6.1f} MB/s   "
+        f"cold read {mb / cold_seconds:6.1f} MB/s   warm read {mb / warm_seconds:6.1f} MB/s"
+    )
+
+def evict_from_page_cache(files: list) -> None:
+    """Flush files and drop them from the OS page cache so reads hit the disk"""
+    for file_path in files:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+def main():
+    """Run the benchmark"""
+    rng = random.Random(0)
+    entries = [build_entry(i, rng) for i in range(300)]
+    print(f"{len(entries)} entries, encoder: {'orjson' if orjson else 'json'}")
+
+    # Next to the cache rather than in /tmp, which may be memory-backed
+    with tempfile.TemporaryDirectory(dir=".") as tmp:
+        run("legacy", Path(tmp), entries, legacy_encode, legacy_decode)
+        for level in sorted({0, 1, settings.cache_compression_level}):
+            run(
+                f"level-{level}", Path(tmp), entries,
+                lambda entry: encode_entry(entry, level)[0], decode_entry
+            )
+
+if __name__ == "__main__":
+    main()
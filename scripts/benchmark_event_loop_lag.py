@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Event loop lag while preparing large pages inline versus in the process pool
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scraping.core import _prepare_analysis_input
+from src.scraping.gate import measure_page
+from src.tools.process_pool import ProcessPool
+
+TICK = 0.005
+
+KEYWORDS = {"tutorial", "learn", "example", "loop", "function"}
+
+def build_page(sections: int) -> str:
+    """Build a large tutorial-like markdown page"""
+    parts = []
+    for i in range(sections):
+        parts.append(f"## Section {i}: learn loops with an example")
+        parts.append(f"Read the [lesson {i}](https://example.com/lesson-{i}) before the exercise. " * 5)
+        parts.append(f"```python\nfor n in range({i}):\n    print(n * {i})\n```")
+    return "\n\n".join(parts)
+
+async def ticker(lags: list, stop: asyncio.Event) -> None:
+    """Sleep in short ticks and record how late each wake-up is"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+async def measure(pool: ProcessPool, pages: list) -> tuple:
+    """Prepare all pages concurrently and return (wall time, lags)"""
+    lags, stop = [], asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK * 2)
+
+    async def prepare(page):
+        await pool.run(measure_page, page, KEYWORDS, size=len(page))
+        await pool.run(_prepare_analysis_input, page, 2000, size=len(page))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(prepare(page) for page in pages))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick_task
+    return elapsed, sorted(lags)
+
+def report(name: str, elapsed: float, lags: list) -> None:
+    """Print wall time and loop lag percentiles"""
+    p95 = lags[int(len(lags) * 0.95)] if lags else 0.0
+    worst = lags[-1] if lags else 0.0
+    print(
+        f"{name:<12} wall {elapsed * 1000:8.1f} ms   "
+        f"lag p95 {p95 * 1000:7.1f} ms   lag max {worst * 1000:7.1f} ms"
+    )
+
+async def main():
+    """Run the benchmark"""
+    pages = [build_page(3000) for _ in range(8)]
+    print(f"{len(pages)} pages of {len(pages[0]) // 1024} KB")
+
+    inline = ProcessPool(inline_threshold=sys.maxsize)
+    report("inline", *await measure(inline, pages))
+
+    pool = ProcessPool(inline_threshold=0)
+    try:
+        # Start the workers outside the measurement
+        await asyncio.gather(*(pool.run(os.getpid) for _ in range(pool.max_workers)))
+        report("process pool", *await measure(pool, pages))
+    finally:
+        pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the single-pass markdown scanner against per-feature regexes
+"""
+
+import json
+import re
+import sys
+import os
+import timeit
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scraping.markdown import find_json_object, scan_markdown
+
+def build_page(sections: int) -> str:
+    """Build a large tutorial-like markdown page"""
+    parts = []
+    for i in range(sections):
+        parts.append(f"## Section {i}: loops and `range({i})`")
+        parts.append(f"Read the [lesson {i}](https://example.com/lesson-{i}) before the exercise.")
+        parts.append(f"- Objective {i}: understand `for` loops\n- Prerequisite: [variables](/vars-{i})")
+        parts.append(f"```python\nfor n in range({i}):\n    print(n * {i})\n```")
+    return "\n\n".join(parts)
+
+def legacy_extract(text: str):
+    """Extraction as previously done, one regex pass per feature"""
+    code_blocks = re.findall(r'```[\w]*\n(.*?)\n```', text, re.DOTALL)
+    inline_code = re.findall(r'`([^`]+)`', text)
+    links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', text)
+    items = [
+        line for line in text.split('\n')
+        if re.search('objectives?', line, re.IGNORECASE) and '-' in line
+    ]
+    return code_blocks, inline_code, links, items
+
+def legacy_json(text: str):
+    """JSON extraction as previously done, with a greedy DOTALL regex"""
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group())
+        except ValueError:
+            return None
+    return None
+
+def report(name: str, legacy, scanner, number: int) -> None:
+    """Time both implementations and print the comparison"""
+    legacy_time = min(timeit.repeat(legacy, number=number, repeat=3)) / number
+    scanner_time = min(timeit.repeat(scanner, number=number, repeat=3)) / number
+    print(
+        f"{name:<32} legacy {legacy_time * 1000:9.2f} ms   "
+        f"scanner {scanner_time * 1000:9.2f} ms   x{legacy_time / scanner_time:6.1f}"
+    )
+
+def main():
+    """Run the benchmark suite"""
+    for sections in (100, 2000, 20000):
+        page = build_page(sections)
+        report(
+            f"page {len(page) // 1024} KB",
+            lambda: legacy_extract(page),
+            lambda: scan_markdown(page),
+            number=5
+        )
+
+    response = "Here is the analysis:\n" + json.dumps({
+        "learning_objectives": [f"objective {i}" for i in range(50)],
+        "code_examples": ["for i in range(3): print({i})"] * 50
+    }) + "\nNotes: use {placeholders} in f-strings {like_this}."
+    report("model response", lambda: legacy_json(response), lambda: find_json_object(response), number=200)
+
+    # Unclosed brackets make the link regex backtrack over the rest of the line
+    for size in (2000, 8000):
+        unclosed = "[x](" * size
+        report(
+            f"unclosed links x{size}",
+            lambda: legacy_extract(unclosed),
+            lambda: scan_markdown(unclosed),
+            number=3
+        )
+
+if __name__ == "__main__":
+    main()
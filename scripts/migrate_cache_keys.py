@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Re-key existing educational cache entries under canonical URLs
+"""
+
+import asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.connection import get_db_manager
+from src.scraping.cache import SmartCache
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def migrate_cache_keys():
+    """Migrate file, segment log and database cache entries to canonical URL keys"""
+    try:
+        logger.info("🚀 Migrating educational cache keys...")
+        
+        db = await get_db_manager()
+        cache = SmartCache(db)
+        
+        counts = await cache.migrate_cache_keys()
+        await cache.close()
+        
+        logger.info(f"✅ Migrated entries: {counts['migrated']}")
+        logger.info(f"✅ Merged duplicates: {counts['merged']}")
+        logger.info("🎉 Cache key migration complete!")
+        
+    except Exception as e:
+        logger.error(f"❌ Cache key migration failed: {e}")
+        raise
+    finally:
+        if 'db' in locals():
+            await db.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_cache_keys())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Scrape pending educational leads from the database work queue
+
+Run one copy per process or machine; all copies share the queue.
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.connection import get_db_manager
+from src.scraping.core import EducationalScraper
+from src.scraping.lead_worker import LeadWorker
+from src.scraping.transport import close_firecrawl_transport
+from src.tools.process_pool import close_process_pool
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def run_lead_workers(concurrency: int = None, once: bool = False, depth: int = 1):
+    """Work the educational lead queue until interrupted (or empty with --once)"""
+    try:
+        logger.info("🚀 Starting educational lead workers...")
+
+        db = await get_db_manager()
+        scraper = EducationalScraper(db_manager=db)
+        worker = LeadWorker(scraper, db, concurrency=concurrency, scrape_options={"depth": depth})
+
+        # Finish the leads in progress on Ctrl+C / SIGTERM instead of abandoning them
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+
+        stats = await worker.run(stop_when_empty=once)
+
+        logger.info(f"✅ Leads processed: {stats['processed']}")
+        logger.info(f"✅ Leads failed: {stats['failed']} ({stats['archived']} archived)")
+        logger.info("🎉 Lead workers finished!")
+
+    except Exception as e:
+        logger.error(f"❌ Lead workers failed: {e}")
+        raise
+    finally:
+        if 'scraper' in locals():
+            await scraper.close()
+        if 'db' in locals():
+            await db.disconnect()
+        close_firecrawl_transport()
+        close_process_pool()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent leads per process")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    parser.add_argument("--depth", type=int, default=1, help="Crawl depth per lead")
+    args = parser.parse_args()
+
+    asyncio.run(run_lead_workers(args.workers, args.once, args.depth))
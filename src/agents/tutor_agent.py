@@ -1,7 +1,7 @@
 from langchain_anthropic import ChatAnthropic
 from src.rag.knowledge_base import KnowledgeBase
 from src.rag.database import db_manager
-from src.tools.data_collector import DataCollector
+from src.tools.data_collector import get_data_collector
 from config.settings import settings
 from typing import Dict, List, Any
 import asyncio
@@ -16,7 +16,7 @@ class EducationalTutor:
             api_key=settings.anthropic_api_key
         )
         self.kb = KnowledgeBase()
-        self.data_collector = DataCollector()
+        self.data_collector = get_data_collector()
         self.conversation_history = []
         
         self.system_prompt = f"""
@@ -54,7 +54,7 @@ Teaching style:
             )
             
             unified_content = self.data_collector.unified_content_extraction(web_data)
-            self.kb.add_documents(unified_content)
+            await self.kb.add_documents_async(unified_content)
             
             # Search again with new data
             kb_results = self.kb.search(topic)
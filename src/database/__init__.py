@@ -11,7 +11,11 @@ from .models import (
     CurriculumUpdate,
     StudentResearch,
     EducationalLead,
-    CacheEntry
+    CacheEntry,
+    AnalysisMemoEntry,
+    PageFingerprint,
+    NearDuplicateEntry,
+    WaitProfile
 )
 
 __all__ = [
@@ -23,5 +27,9 @@ __all__ = [
     'CurriculumUpdate',
     'StudentResearch',
     'EducationalLead',
-    'CacheEntry'
+    'CacheEntry',
+    'AnalysisMemoEntry',
+    'PageFingerprint',
+    'NearDuplicateEntry',
+    'WaitProfile'
 ]
\ No newline at end of file
@@ -4,9 +4,10 @@ Neon PostgreSQL database connection and management
 
 import asyncio
 import asyncpg
+import hashlib
 import json
 import logging
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
 from typing import Dict, List, Optional, Any
 from config.settings import settings
 
@@ -19,10 +20,16 @@ class DatabaseManager:
     
     def __init__(self):
         self.pool = None
+        # Separate pool for the session that holds advisory locks, so held
+        # locks never starve queries
+        self.lock_pool = None
+        self._lock_conn = None
+        self._lock_guard = None
+        self._held_locks = set()
         self._connection_url = settings.database_url
     
     async def connect(self):
-        """Initialize connection pool"""
+        """Initialize connection pools"""
         try:
             self.pool = await asyncpg.create_pool(
                 self._connection_url,
@@ -30,39 +37,147 @@ class DatabaseManager:
                 max_size=10,
                 command_timeout=60
             )
+            self.lock_pool = await asyncpg.create_pool(
+                self._connection_url,
+                min_size=0,
+                max_size=1,
+                command_timeout=60
+            )
             logger.info("📊 Connected to Neon PostgreSQL database")
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
     
     async def disconnect(self):
-        """Close connection pool"""
+        """Close connection pools"""
+        if self.lock_pool:
+            if self._lock_conn is not None:
+                conn, self._lock_conn = self._lock_conn, None
+                self._held_locks.clear()
+                await self.lock_pool.release(conn)
+            await self.lock_pool.close()
         if self.pool:
             await self.pool.close()
             logger.info("📊 Disconnected from database")
     
     async def execute(self, query: str, *args) -> str:
         """Execute a query and return result"""
-        async with self.pool.acquire() as conn:
+        async with self.pool.acquire(timeout=settings.db_acquire_timeout) as conn:
             return await conn.execute(query, *args)
     
     async def fetch(self, query: str, *args) -> List[Dict]:
         """Fetch multiple rows"""
-        async with self.pool.acquire() as conn:
+        async with self.pool.acquire(timeout=settings.db_acquire_timeout) as conn:
             rows = await conn.fetch(query, *args)
             return [dict(row) for row in rows]
     
     async def fetchrow(self, query: str, *args) -> Optional[Dict]:
         """Fetch single row"""
-        async with self.pool.acquire() as conn:
+        async with self.pool.acquire(timeout=settings.db_acquire_timeout) as conn:
             row = await conn.fetchrow(query, *args)
             return dict(row) if row else None
     
     async def fetchval(self, query: str, *args) -> Any:
         """Fetch single value"""
-        async with self.pool.acquire() as conn:
+        async with self.pool.acquire(timeout=settings.db_acquire_timeout) as conn:
             return await conn.fetchval(query, *args)
     
+    @asynccontextmanager
+    async def advisory_lock(self, key: str, timeout: Optional[float] = None):
+        """
+        Try to hold a session-level Postgres advisory lock for a string key
+        
+        Serializes work on the key across every process sharing the
+        database. All of a process's locks live on one shared session from
+        the lock pool, so a lock held for a whole scrape occupies no
+        connection of its own and any number of keys can be held at once.
+        The lock is polled with pg_try_advisory_lock; since session locks
+        are re-entrant, a key already held in this process waits just like
+        one held by another process. Yields True while the lock is held, or
+        False if it could not be taken within ``timeout`` seconds (or the
+        database failed); the block then runs unlocked. Errors raised by
+        the block itself propagate unchanged.
+        """
+        lock_id = int.from_bytes(
+            hashlib.sha256(key.encode()).digest()[:8], 'big', signed=True
+        )
+        if timeout is None:
+            timeout = settings.db_advisory_lock_timeout
+        
+        try:
+            locked = await self._try_advisory_lock(lock_id, timeout)
+        except Exception as e:
+            logger.warning(f"Advisory lock error for {key}: {e}")
+            locked = False
+        
+        if not locked:
+            yield False
+            return
+        
+        try:
+            yield True
+        finally:
+            try:
+                # Shielded so a cancelled scrape still releases its lock
+                await asyncio.shield(self._lock_query("SELECT pg_advisory_unlock($1)", lock_id))
+            except Exception as e:
+                # A lost lock session has already dropped the lock
+                logger.warning(f"Advisory unlock error for {key}: {e}")
+            finally:
+                self._held_locks.discard(lock_id)
+    
+    async def _try_advisory_lock(self, lock_id: int, timeout: float) -> bool:
+        """Poll for an advisory lock until it is taken or the timeout passes"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        while True:
+            if lock_id not in self._held_locks:
+                # Claim the key in this process before asking the database
+                self._held_locks.add(lock_id)
+                attempt = asyncio.ensure_future(
+                    self._lock_query("SELECT pg_try_advisory_lock($1)", lock_id)
+                )
+                try:
+                    locked = await asyncio.shield(attempt)
+                except asyncio.CancelledError:
+                    # Don't leave a lock the abandoned attempt took on the shared session
+                    try:
+                        if await attempt:
+                            await self._lock_query("SELECT pg_advisory_unlock($1)", lock_id)
+                    except Exception:
+                        pass
+                    self._held_locks.discard(lock_id)
+                    raise
+                except BaseException:
+                    self._held_locks.discard(lock_id)
+                    raise
+                if locked:
+                    return True
+                self._held_locks.discard(lock_id)
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(settings.db_advisory_lock_poll_interval, remaining))
+    
+    async def _lock_query(self, query: str, lock_id: int) -> Any:
+        """Run an advisory lock query on the shared lock session, one at a time"""
+        if self._lock_guard is None:
+            self._lock_guard = asyncio.Lock()
+        
+        async with self._lock_guard:
+            if self._lock_conn is None:
+                self._lock_conn = await self.lock_pool.acquire(timeout=settings.db_acquire_timeout)
+            try:
+                return await self._lock_conn.fetchval(query, lock_id)
+            except (asyncpg.PostgresConnectionError, asyncpg.InterfaceError, OSError):
+                # The session and every lock on it are gone; start a new one next time
+                conn, self._lock_conn = self._lock_conn, None
+                self._held_locks.clear()
+                await self.lock_pool.release(conn)
+                raise
+    
     async def create_tables(self):
         """Create all required tables"""
         
@@ -256,7 +371,7 @@ class DatabaseManager:
                 difficulty_estimate VARCHAR(20),
                 language VARCHAR(20),
                 quality_score FLOAT DEFAULT 0.0,
-                processing_status VARCHAR(50) DEFAULT 'pending', -- pending, processed, enriched, archived
+                processing_status VARCHAR(50) DEFAULT 'pending', -- pending, processing, processed, enriched, archived
                 last_scraped TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
@@ -280,6 +395,20 @@ class DatabaseManager:
         await self.execute("""
             CREATE INDEX IF NOT EXISTS idx_educational_leads_created_at ON educational_leads(created_at)
         """)
+        
+        # Work queue bookkeeping for lead workers; claims expire after a lease
+        await self.execute("""
+            ALTER TABLE educational_leads 
+                ADD COLUMN IF NOT EXISTS claimed_by TEXT,
+                ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP,
+                ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS last_error TEXT
+        """)
+        await self.execute("""
+            CREATE INDEX IF NOT EXISTS idx_educational_leads_queue 
+            ON educational_leads(quality_score DESC, created_at) 
+            WHERE processing_status = 'pending'
+        """)
     
     async def _create_cache_tables(self):
         """Create tables for intelligent caching"""
@@ -307,6 +436,85 @@ class DatabaseManager:
         await self.execute("""
             CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(last_accessed)
         """)
+        
+        # Claude analysis memo keyed by normalized content hash
+        await self.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_memo (
+                id SERIAL PRIMARY KEY,
+                content_hash VARCHAR(64) NOT NULL UNIQUE,
+                content_type VARCHAR(50) NOT NULL,
+                prompt_version VARCHAR(20) NOT NULL,
+                analysis JSONB NOT NULL,
+                cost FLOAT DEFAULT 0.0,
+                hit_count INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        await self.execute("""
+            CREATE INDEX IF NOT EXISTS idx_analysis_memo_accessed ON analysis_memo(last_accessed)
+        """)
+        
+        # Content fingerprints and HTTP validators for incremental re-crawls
+        await self.execute("""
+            CREATE TABLE IF NOT EXISTS page_fingerprints (
+                id SERIAL PRIMARY KEY,
+                url TEXT NOT NULL,
+                content_type VARCHAR(50) NOT NULL,
+                fingerprint VARCHAR(64) NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                result JSONB NOT NULL,
+                analysis_cost FLOAT DEFAULT 0.0,
+                checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (url, content_type)
+            )
+        """)
+        
+        await self.execute("""
+            CREATE INDEX IF NOT EXISTS idx_page_fingerprints_checked ON page_fingerprints(checked_at)
+        """)
+        
+        # SimHash LSH index of analyzed pages for near-duplicate reuse
+        await self.execute("""
+            CREATE TABLE IF NOT EXISTS near_duplicate_index (
+                id SERIAL PRIMARY KEY,
+                url TEXT NOT NULL,
+                content_type VARCHAR(50) NOT NULL,
+                simhash BIGINT NOT NULL,
+                bands INTEGER[] NOT NULL, -- LSH band values tagged with their position
+                analysis JSONB NOT NULL,
+                cost FLOAT DEFAULT 0.0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (url, content_type)
+            )
+        """)
+        
+        await self.execute("""
+            CREATE INDEX IF NOT EXISTS idx_near_duplicate_bands ON near_duplicate_index USING GIN (bands)
+        """)
+        
+        # Learned Firecrawl waitFor per domain and content type
+        await self.execute("""
+            CREATE TABLE IF NOT EXISTS wait_profiles (
+                id SERIAL PRIMARY KEY,
+                domain TEXT NOT NULL,
+                content_type VARCHAR(50) NOT NULL,
+                wait_ms INTEGER NOT NULL,
+                is_static BOOLEAN DEFAULT FALSE,
+                failed_ms INTEGER DEFAULT -1, -- longest wait that produced incomplete markdown
+                streak INTEGER DEFAULT 0,
+                samples INTEGER DEFAULT 0,
+                false_alarms INTEGER DEFAULT 0, -- retries at a longer wait that added nothing
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (domain, content_type)
+            )
+        """)
+        await self.execute("""
+            ALTER TABLE wait_profiles ADD COLUMN IF NOT EXISTS false_alarms INTEGER DEFAULT 0
+        """)
     
     # Cache management methods
     async def set_cache(
@@ -315,41 +523,97 @@ class DatabaseManager:
         cache_type: str, 
         data: Dict, 
         expires_hours: int = 24,
-        url: str = None
+        url: str = None,
+        age_seconds: float = 0.0
     ):
-        """Set cache entry"""
-        expires_at = datetime.now() + timedelta(hours=expires_hours)
+        """
+        Set cache entry
         
+        age_seconds back-dates created_at (and expires_at with it) for
+        entries promoted from a slower tier, so they keep their real age.
+        Timestamps come from the database clock, like the expiry checks.
+        """
         await self.execute("""
-            INSERT INTO cache_entries (cache_key, cache_type, url, data, expires_at)
-            VALUES ($1, $2, $3, $4, $5)
+            INSERT INTO cache_entries (cache_key, cache_type, url, data, created_at, expires_at)
+            VALUES (
+                $1, $2, $3, $4,
+                CURRENT_TIMESTAMP - make_interval(secs => $6),
+                CURRENT_TIMESTAMP - make_interval(secs => $6) + make_interval(hours => $5)
+            )
             ON CONFLICT (cache_key) 
             DO UPDATE SET 
                 data = EXCLUDED.data,
+                created_at = EXCLUDED.created_at,
                 expires_at = EXCLUDED.expires_at,
                 last_accessed = CURRENT_TIMESTAMP,
                 hit_count = cache_entries.hit_count + 1
-        """, cache_key, cache_type, url, json.dumps(data), expires_at)
+        """, cache_key, cache_type, url, json.dumps(data), expires_hours, float(age_seconds))
     
-    async def get_cache(self, cache_key: str) -> Optional[Dict]:
-        """Get cache entry if not expired"""
+    async def set_cache_many(self, entries: List[Dict]):
+        """
+        Set many cache entries in one multi-row upsert
+        
+        Each entry takes the keyword arguments of set_cache; cache keys
+        must be unique within a call.
+        """
+        if not entries:
+            return
+        
+        await self.execute("""
+            INSERT INTO cache_entries (cache_key, cache_type, url, data, created_at, expires_at)
+            SELECT
+                e.cache_key, e.cache_type, e.url, e.data::jsonb,
+                CURRENT_TIMESTAMP - make_interval(secs => e.age_seconds),
+                CURRENT_TIMESTAMP - make_interval(secs => e.age_seconds) + make_interval(hours => e.expires_hours)
+            FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::float8[], $6::int[])
+                AS e(cache_key, cache_type, url, data, age_seconds, expires_hours)
+            ON CONFLICT (cache_key) 
+            DO UPDATE SET 
+                data = EXCLUDED.data,
+                created_at = EXCLUDED.created_at,
+                expires_at = EXCLUDED.expires_at,
+                last_accessed = CURRENT_TIMESTAMP,
+                hit_count = cache_entries.hit_count + 1
+        """,
+            [entry['cache_key'] for entry in entries],
+            [entry['cache_type'] for entry in entries],
+            [entry.get('url') for entry in entries],
+            [json.dumps(entry['data']) for entry in entries],
+            [float(entry.get('age_seconds', 0.0)) for entry in entries],
+            [entry.get('expires_hours', 24) for entry in entries]
+        )
+    
+    async def get_cache_entry(self, cache_key: str) -> Optional[Dict]:
+        """
+        Get an unexpired cache entry with its age, recording the hit
+        
+        One round trip: the hit count is updated by the same statement
+        that returns the entry.
+        
+        Returns:
+            data, created_at, expires_at, age_seconds and expires_in_seconds,
+            or None if missing or expired
+        """
         result = await self.fetchrow("""
-            SELECT data FROM cache_entries 
+            UPDATE cache_entries 
+            SET hit_count = hit_count + 1, last_accessed = CURRENT_TIMESTAMP
             WHERE cache_key = $1 AND expires_at > CURRENT_TIMESTAMP
+            RETURNING data, created_at, expires_at,
+                EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - created_at))::float AS age_seconds,
+                EXTRACT(EPOCH FROM (expires_at - CURRENT_TIMESTAMP))::float AS expires_in_seconds
         """, cache_key)
         
         if result:
-            # Update hit count and last accessed
-            await self.execute("""
-                UPDATE cache_entries 
-                SET hit_count = hit_count + 1, last_accessed = CURRENT_TIMESTAMP
-                WHERE cache_key = $1
-            """, cache_key)
-            
-            return json.loads(result['data'])
+            result['data'] = json.loads(result['data'])
+            return result
         
         return None
     
+    async def get_cache(self, cache_key: str) -> Optional[Dict]:
+        """Get cache entry data if not expired"""
+        entry = await self.get_cache_entry(cache_key)
+        return entry['data'] if entry else None
+    
     async def cleanup_expired_cache(self) -> int:
         """Clean up expired cache entries"""
         result = await self.execute("""
@@ -360,6 +624,308 @@ class DatabaseManager:
         count = int(result.split()[-1]) if result.split()[-1].isdigit() else 0
         return count
     
+    # Analysis memo methods
+    async def set_analysis_memo(
+        self,
+        content_hash: str,
+        content_type: str,
+        prompt_version: str,
+        analysis: Dict,
+        cost: float = 0.0
+    ):
+        """Store a Claude analysis under its content hash"""
+        await self.execute("""
+            INSERT INTO analysis_memo (content_hash, content_type, prompt_version, analysis, cost)
+            VALUES ($1, $2, $3, $4, $5)
+            ON CONFLICT (content_hash) 
+            DO UPDATE SET 
+                analysis = EXCLUDED.analysis,
+                cost = EXCLUDED.cost,
+                last_accessed = CURRENT_TIMESTAMP
+        """, content_hash, content_type, prompt_version, json.dumps(analysis), cost)
+    
+    async def get_analysis_memo(self, content_hash: str) -> Optional[Dict]:
+        """Get a memoized analysis and record the hit"""
+        result = await self.fetchrow("""
+            UPDATE analysis_memo 
+            SET hit_count = hit_count + 1, last_accessed = CURRENT_TIMESTAMP
+            WHERE content_hash = $1
+            RETURNING analysis, content_type, prompt_version, cost
+        """, content_hash)
+        
+        if result:
+            result['analysis'] = json.loads(result['analysis'])
+            return result
+        
+        return None
+    
+    # Page fingerprint methods
+    async def set_page_fingerprint(
+        self,
+        url: str,
+        content_type: str,
+        fingerprint: str,
+        result: Dict,
+        etag: str = None,
+        last_modified: str = None,
+        analysis_cost: float = 0.0
+    ):
+        """Store the fingerprint, validators and result of a scraped page"""
+        await self.execute("""
+            INSERT INTO page_fingerprints 
+                (url, content_type, fingerprint, etag, last_modified, result, analysis_cost)
+            VALUES ($1, $2, $3, $4, $5, $6, $7)
+            ON CONFLICT (url, content_type) 
+            DO UPDATE SET 
+                changed_at = CASE 
+                    WHEN page_fingerprints.fingerprint = EXCLUDED.fingerprint 
+                    THEN page_fingerprints.changed_at 
+                    ELSE CURRENT_TIMESTAMP 
+                END,
+                fingerprint = EXCLUDED.fingerprint,
+                etag = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified,
+                result = EXCLUDED.result,
+                analysis_cost = EXCLUDED.analysis_cost,
+                checked_at = CURRENT_TIMESTAMP
+        """, url, content_type, fingerprint, etag, last_modified, json.dumps(result), analysis_cost)
+    
+    async def get_page_fingerprint(self, url: str, content_type: str) -> Optional[Dict]:
+        """Get the last recorded fingerprint of a page"""
+        result = await self.fetchrow("""
+            SELECT fingerprint, etag, last_modified, result, analysis_cost 
+            FROM page_fingerprints 
+            WHERE url = $1 AND content_type = $2
+        """, url, content_type)
+        
+        if result:
+            result['result'] = json.loads(result['result'])
+            return result
+        
+        return None
+    
+    async def touch_page_fingerprint(self, url: str, content_type: str):
+        """Record that a page was revalidated without changes"""
+        await self.execute("""
+            UPDATE page_fingerprints SET checked_at = CURRENT_TIMESTAMP
+            WHERE url = $1 AND content_type = $2
+        """, url, content_type)
+        
+        await self.mark_lead_scraped(url)
+    
+    async def mark_lead_scraped(self, url: str):
+        """Update last_scraped of the educational lead for a URL, if any"""
+        await self.execute("""
+            UPDATE educational_leads SET last_scraped = CURRENT_TIMESTAMP
+            WHERE url = $1
+        """, url)
+    
+    # Educational lead queue methods
+    async def add_educational_lead(
+        self,
+        url: str,
+        source_type: str,
+        title: str = None,
+        description: str = None,
+        content_type: str = None,
+        quality_score: float = 0.0
+    ) -> bool:
+        """Queue a URL as a pending educational lead; returns False if already known"""
+        status = await self.execute("""
+            INSERT INTO educational_leads 
+                (url, source_type, title, description, content_type, quality_score)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (url) DO NOTHING
+        """, url, source_type, title, description, content_type, quality_score)
+        
+        return status.endswith(" 1")
+    
+    async def claim_leads(
+        self,
+        worker_id: str,
+        limit: int = 1,
+        lease_seconds: float = 600,
+        max_attempts: int = 3
+    ) -> List[Dict]:
+        """
+        Claim the best pending leads for a worker
+        
+        Rows locked by another claimer are skipped rather than waited on, so
+        any number of workers can claim concurrently. Leads whose claim
+        outlived its lease (their worker died) are claimed again while they
+        have attempts left, and archived once they have used them up.
+        """
+        await self.execute("""
+            UPDATE educational_leads SET 
+                processing_status = 'archived',
+                last_error = COALESCE(last_error, 'Lease expired on the final attempt'),
+                claimed_by = NULL,
+                claimed_at = NULL
+            WHERE processing_status = 'processing' 
+              AND claimed_at < CURRENT_TIMESTAMP - make_interval(secs => $1)
+              AND attempts >= $2
+        """, float(lease_seconds), max_attempts)
+        
+        rows = await self.fetch("""
+            UPDATE educational_leads SET 
+                processing_status = 'processing',
+                claimed_by = $1,
+                claimed_at = CURRENT_TIMESTAMP,
+                attempts = attempts + 1
+            WHERE id IN (
+                SELECT id FROM educational_leads 
+                WHERE processing_status = 'pending' 
+                   OR (processing_status = 'processing' 
+                       AND claimed_at < CURRENT_TIMESTAMP - make_interval(secs => $3)
+                       AND attempts < $4)
+                ORDER BY quality_score DESC, created_at 
+                LIMIT $2 
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, url, content_type, quality_score, attempts
+        """, worker_id, limit, float(lease_seconds), max_attempts)
+        
+        return sorted(rows, key=lambda row: row['quality_score'] or 0.0, reverse=True)
+    
+    async def renew_lead_lease(self, lead_id: int, worker_id: str) -> bool:
+        """Extend the lease of a lead still being processed; returns False if the claim was lost"""
+        status = await self.execute("""
+            UPDATE educational_leads SET claimed_at = CURRENT_TIMESTAMP
+            WHERE id = $1 AND claimed_by = $2 AND processing_status = 'processing'
+        """, lead_id, worker_id)
+        
+        return status.endswith(" 1")
+    
+    async def complete_lead(
+        self,
+        lead_id: int,
+        worker_id: str,
+        difficulty_estimate: str = None,
+        language: str = None,
+        quality_score: float = None
+    ) -> bool:
+        """Mark a claimed lead processed; returns False if the claim was lost"""
+        status = await self.execute("""
+            UPDATE educational_leads SET 
+                processing_status = 'processed',
+                difficulty_estimate = COALESCE($3, difficulty_estimate),
+                language = COALESCE($4, language),
+                quality_score = COALESCE($5, quality_score),
+                last_scraped = CURRENT_TIMESTAMP,
+                last_error = NULL,
+                claimed_by = NULL,
+                claimed_at = NULL
+            WHERE id = $1 AND claimed_by = $2 AND processing_status = 'processing'
+        """, lead_id, worker_id, difficulty_estimate, language, quality_score)
+        
+        return status.endswith(" 1")
+    
+    async def fail_lead(self, lead_id: int, worker_id: str, error: str, max_attempts: int = 3) -> Optional[str]:
+        """
+        Release a claimed lead after a failed scrape
+        
+        The lead goes back to pending, or to archived once it has used up
+        max_attempts. Returns the new status, or None if the claim was lost.
+        """
+        return await self.fetchval("""
+            UPDATE educational_leads SET 
+                processing_status = CASE WHEN attempts >= $4 THEN 'archived' ELSE 'pending' END,
+                last_error = $3,
+                claimed_by = NULL,
+                claimed_at = NULL
+            WHERE id = $1 AND claimed_by = $2 AND processing_status = 'processing'
+            RETURNING processing_status
+        """, lead_id, worker_id, error, max_attempts)
+    
+    # Near-duplicate index methods
+    async def add_near_duplicate(
+        self,
+        url: str,
+        content_type: str,
+        simhash: int,
+        bands: List[int],
+        analysis: Dict,
+        cost: float = 0.0
+    ):
+        """Index an analyzed page by its SimHash bands"""
+        await self.execute("""
+            INSERT INTO near_duplicate_index 
+                (url, content_type, simhash, bands, analysis, cost)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (url, content_type) 
+            DO UPDATE SET 
+                simhash = EXCLUDED.simhash,
+                bands = EXCLUDED.bands,
+                analysis = EXCLUDED.analysis,
+                cost = EXCLUDED.cost
+        """, url, content_type, simhash, bands, json.dumps(analysis), cost)
+    
+    async def find_near_duplicate(
+        self,
+        content_type: str,
+        simhash: int,
+        bands: List[int],
+        max_distance: int
+    ) -> Optional[Dict]:
+        """
+        Get the closest indexed page within max_distance bits of a SimHash
+        
+        Band candidates are filtered by Hamming distance in the database,
+        so only the best match's analysis is transferred and decoded.
+        """
+        row = await self.fetchrow("""
+            SELECT url, simhash, analysis, cost FROM (
+                SELECT url, simhash, analysis, cost,
+                       length(replace(((simhash # $2)::bit(64))::text, '0', '')) AS distance
+                FROM near_duplicate_index 
+                WHERE content_type = $1 AND bands && $3::integer[]
+            ) candidates
+            WHERE distance <= $4
+            ORDER BY distance
+            LIMIT 1
+        """, content_type, simhash, bands, max_distance)
+        
+        if row:
+            row['analysis'] = json.loads(row['analysis'])
+        
+        return row
+    
+    # Wait profile methods
+    async def set_wait_profile(
+        self,
+        domain: str,
+        content_type: str,
+        wait_ms: int,
+        is_static: bool = False,
+        failed_ms: int = -1,
+        streak: int = 0,
+        samples: int = 0,
+        false_alarms: int = 0
+    ):
+        """Store the learned waitFor profile of a domain"""
+        await self.execute("""
+            INSERT INTO wait_profiles 
+                (domain, content_type, wait_ms, is_static, failed_ms, streak, samples, false_alarms)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            ON CONFLICT (domain, content_type) 
+            DO UPDATE SET 
+                wait_ms = EXCLUDED.wait_ms,
+                is_static = EXCLUDED.is_static,
+                failed_ms = EXCLUDED.failed_ms,
+                streak = EXCLUDED.streak,
+                samples = EXCLUDED.samples,
+                false_alarms = EXCLUDED.false_alarms,
+                updated_at = CURRENT_TIMESTAMP
+        """, domain, content_type, wait_ms, is_static, failed_ms, streak, samples, false_alarms)
+    
+    async def get_wait_profile(self, domain: str, content_type: str) -> Optional[Dict]:
+        """Get the learned waitFor profile of a domain"""
+        return await self.fetchrow("""
+            SELECT wait_ms, is_static, failed_ms, streak, samples, false_alarms 
+            FROM wait_profiles 
+            WHERE domain = $1 AND content_type = $2
+        """, domain, content_type)
+    
     # Student progress methods
     async def add_student_progress(
         self, 
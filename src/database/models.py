@@ -95,9 +95,13 @@ class EducationalLead:
     difficulty_estimate: Optional[str] = None
     language: Optional[str] = None
     quality_score: float = 0.0
-    processing_status: str = "pending"  # pending, processed, enriched, archived
+    processing_status: str = "pending"  # pending, processing, processed, enriched, archived
     last_scraped: Optional[datetime] = None
     created_at: Optional[datetime] = None
+    claimed_by: Optional[str] = None
+    claimed_at: Optional[datetime] = None
+    attempts: int = 0
+    last_error: Optional[str] = None
 
 @dataclass
 class CacheEntry:
@@ -110,4 +114,56 @@ class CacheEntry:
     created_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
     hit_count: int = 0
-    last_accessed: Optional[datetime] = None
\ No newline at end of file
+    last_accessed: Optional[datetime] = None
+
+@dataclass
+class AnalysisMemoEntry:
+    """Memoized Claude analysis keyed by content hash"""
+    id: Optional[int] = None
+    content_hash: str = ""
+    content_type: str = ""
+    prompt_version: str = ""
+    analysis: Dict[str, Any] = None
+    cost: float = 0.0
+    hit_count: int = 0
+    created_at: Optional[datetime] = None
+    last_accessed: Optional[datetime] = None
+
+@dataclass
+class PageFingerprint:
+    """Content fingerprint and HTTP validators of a scraped page"""
+    id: Optional[int] = None
+    url: str = ""
+    content_type: str = ""
+    fingerprint: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    result: Dict[str, Any] = None
+    analysis_cost: float = 0.0
+    checked_at: Optional[datetime] = None
+    changed_at: Optional[datetime] = None
+
+@dataclass
+class NearDuplicateEntry:
+    """Analyzed page indexed by SimHash for near-duplicate reuse"""
+    id: Optional[int] = None
+    url: str = ""
+    content_type: str = ""
+    simhash: int = 0
+    bands: List[int] = None
+    analysis: Dict[str, Any] = None
+    cost: float = 0.0
+    created_at: Optional[datetime] = None
+
+@dataclass
+class WaitProfile:
+    """Learned Firecrawl waitFor of a domain for one content type"""
+    id: Optional[int] = None
+    domain: str = ""
+    content_type: str = ""
+    wait_ms: int = 0
+    is_static: bool = False
+    failed_ms: int = -1
+    streak: int = 0
+    samples: int = 0
+    updated_at: Optional[datetime] = None
@@ -130,6 +130,61 @@ class EducationalEnricher:
         
         return result
     
+    async def ingest_educational_content(
+        self,
+        url: str,
+        knowledge_base,
+        content_type: str = "tutorial",
+        depth: int = 2,
+        max_pages: int = 10
+    ) -> int:
+        """
+        Stream scraped pages into a knowledge base as they arrive
+        
+        Each page is indexed as soon as it is scraped, so only one page is
+        held in memory at a time.
+        
+        Args:
+            url: Starting URL for scraping
+            knowledge_base: KnowledgeBase receiving the pages
+            content_type: Type of content to focus on
+            depth: How many levels deep to crawl
+            max_pages: Maximum pages to scrape
+        
+        Returns:
+            Number of pages ingested
+        """
+        
+        ingested = 0
+        
+        async for page in self.scraper.iter_educational_content(
+            url, content_type=content_type, depth=depth, max_pages=max_pages
+        ):
+            if page['error']:
+                logger.warning(f"Skipping ingestion of {page['url']}: {page['error']}")
+                continue
+            
+            content = page['content'] or {}
+            markdown = content.get('markdown', '')
+            if not markdown:
+                continue
+            
+            await knowledge_base.add_documents_async([{
+                'content': markdown,
+                'source': 'firecrawl',
+                'title': content.get('metadata', {}).get('title', page['url']),
+                'url': page['url']
+            }])
+            ingested += 1
+        
+        logger.info(f"📥 Ingested {ingested} pages from {url}")
+        return ingested
+    
+    async def close(self) -> None:
+        """Persist the scraper's queued cache writes; call before shutting down"""
+        
+        await self.scraper.close()
+    
     def _categorize_educational_content(
         self, 
         search_results: List[Dict], 
@@ -149,14 +204,15 @@ class EducationalEnricher:
         target_complexity = age_config['complexity']
         
         for result in search_results:
+            difficulty = self._estimate_difficulty(result)
             content_item = {
                 'title': result['title'],
                 'url': result['url'],
                 'description': result['description'],
                 'relevance_score': result['relevance_score'],
                 'estimated_type': result['estimated_type'],
-                'difficulty': self._estimate_difficulty(result),
-                'suitable_for_age': self._is_suitable_for_age(result, age_group)
+                'difficulty': difficulty,
+                'suitable_for_age': self._is_suitable_for_age(result, age_group, difficulty)
             }
             
             # Only include content suitable for age group
@@ -184,35 +240,30 @@ class EducationalEnricher:
     def _estimate_difficulty(self, content: Dict) -> str:
         """Estimate content difficulty level"""
         
-        text = f"{content['title']} {content['description']}".lower()
-        
-        beginner_indicators = [
-            'beginner', 'basic', 'intro', 'getting started', 
-            'fundamentals', 'first', 'simple'
-        ]
-        
-        advanced_indicators = [
-            'advanced', 'expert', 'complex', 'deep dive',
-            'master', 'professional', 'optimization'
-        ]
-        
-        intermediate_indicators = [
-            'intermediate', 'next level', 'beyond basics'
-        ]
+        hits = self.scraper.keyword_matcher.match(
+            f"{content['title']} {content['description']}",
+            ('beginner_indicators', 'advanced_indicators', 'intermediate_indicators')
+        )
         
-        if any(indicator in text for indicator in beginner_indicators):
+        if hits['beginner_indicators']:
             return 'beginner'
-        elif any(indicator in text for indicator in advanced_indicators):
+        elif hits['advanced_indicators']:
             return 'advanced'
-        elif any(indicator in text for indicator in intermediate_indicators):
+        elif hits['intermediate_indicators']:
             return 'intermediate'
         
         return 'unknown'
     
-    def _is_suitable_for_age(self, content: Dict, age_group: str) -> bool:
+    def _is_suitable_for_age(
+        self, 
+        content: Dict, 
+        age_group: str, 
+        difficulty: Optional[str] = None
+    ) -> bool:
         """Check if content is suitable for the target age group"""
         
-        difficulty = self._estimate_difficulty(content)
+        if difficulty is None:
+            difficulty = self._estimate_difficulty(content)
         age_config = self.age_groups.get(age_group, self.age_groups['10-16'])
         
         # Map age groups to suitable difficulties
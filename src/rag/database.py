@@ -22,6 +22,13 @@ class AsyncDatabaseManager:
             self._initialized = True
         return self._db_manager
     
+    async def close(self):
+        """Close the database connection pools"""
+        if self._db_manager is not None:
+            await self._db_manager.disconnect()
+            self._db_manager = None
+            self._initialized = False
+    
     async def create_tables(self):
         """Create all database tables"""
         db = await self._ensure_connected()
@@ -3,9 +3,19 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_anthropic import ChatAnthropic
 from langchain.schema import Document
 from typing import List, Dict, Any
+import asyncio
 import json
 import hashlib
 from config.settings import settings
+from src.tools.process_pool import get_process_pool
+
+def split_texts(texts: List[str], chunk_size: int, chunk_overlap: int) -> List[List[str]]:
+    """Split texts into chunks (module-level so it can run in a worker process)"""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+    return [text_splitter.split_text(text) for text in texts]
 
 class KnowledgeBase:
     def __init__(self):
@@ -26,22 +36,42 @@ class KnowledgeBase:
     
     def add_documents(self, unified_content: List[Dict[str, str]]):
         """Add documents to knowledge base with deduplication"""
+        contents = [content for content in unified_content if content.get("content")]
+        
+        # Split into chunks
+        chunked = [self.text_splitter.split_text(content["content"]) for content in contents]
+        
+        self._add_chunks(contents, chunked)
+    
+    async def add_documents_async(self, unified_content: List[Dict[str, str]]):
+        """
+        Add documents without blocking the event loop
+        
+        Chunking of large batches runs in the shared process pool and the
+        Chroma calls run in a worker thread.
+        """
+        contents = [content for content in unified_content if content.get("content")]
+        texts = [content["content"] for content in contents]
+        
+        chunked = await get_process_pool().run(
+            split_texts, texts, settings.chunk_size, settings.chunk_overlap,
+            size=sum(len(text) for text in texts)
+        )
+        
+        await asyncio.to_thread(self._add_chunks, contents, chunked)
+    
+    def _add_chunks(self, contents: List[Dict[str, str]], chunked: List[List[str]]):
+        """Store the chunks of each document, skipping chunks already stored"""
         documents = []
         metadatas = []
         ids = []
         
-        for content in unified_content:
-            if not content.get("content"):
-                continue
-                
+        for content, chunks in zip(contents, chunked):
             # Create unique ID based on content hash
             content_hash = hashlib.md5(
                 content["content"].encode('utf-8')
             ).hexdigest()
             
-            # Split into chunks
-            chunks = self.text_splitter.split_text(content["content"])
-            
             for i, chunk in enumerate(chunks):
                 chunk_id = f"{content_hash}_{i}"
                 
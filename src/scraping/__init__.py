@@ -8,5 +8,15 @@ designed for educational content discovery and research.
 from .core import EducationalScraper
 from .cache import SmartCache
 from .rate_limiter import EducationalRateLimiter
+from .transport import FirecrawlTransport
+from .crawler import EducationalCrawler
+from .lead_worker import LeadWorker
 
-__all__ = ['EducationalScraper', 'SmartCache', 'EducationalRateLimiter']
\ No newline at end of file
+__all__ = [
+    'EducationalScraper',
+    'SmartCache',
+    'EducationalRateLimiter',
+    'FirecrawlTransport',
+    'EducationalCrawler',
+    'LeadWorker'
+]
\ No newline at end of file
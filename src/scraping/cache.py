@@ -2,12 +2,22 @@
 Smart caching system for educational web scraping
 """
 
+import asyncio
 import hashlib
 import json
 import logging
+import time
 from datetime import datetime, timedelta
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+from config.settings import settings
+from src.scraping.cache_format import COMPACT_SUFFIX, LEGACY_SUFFIX, decode_entry, encode_entry
+from src.scraping.lru import BoundedLRUCache
+from src.scraping.metrics import Histogram
+from src.scraping.segment_store import SegmentLogStore
+from src.scraping.urls import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
@@ -19,13 +29,32 @@ class SmartCache:
     def __init__(self, db_manager=None, cache_dir: str = "cache/educational"):
         self.db = db_manager
         self.cache_dir = Path(cache_dir)
-        self.memory_cache = {}  # In-memory cache for current session
+        # Bounded in-memory tier for the current session
+        self.memory_cache = BoundedLRUCache(
+            max_entries=settings.memory_cache_max_entries,
+            max_bytes=settings.memory_cache_max_bytes,
+            ttl=settings.memory_cache_ttl_seconds
+        )
         
         # Create cache directories
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         for subdir in ["tutorials", "documentation", "courses", "searches"]:
             (self.cache_dir / subdir).mkdir(exist_ok=True)
         
+        # File tier format; files in either format are always readable
+        self.compact_files = settings.cache_file_format == "compact"
+        self.compression_level = settings.cache_compression_level
+        
+        # Optional segment log replacing the one-file-per-key tier
+        self.segments = None
+        if settings.cache_file_tier == "segments":
+            self.segments = SegmentLogStore(
+                self.cache_dir / "segments",
+                segment_max_bytes=settings.cache_segment_max_bytes,
+                compaction_threshold=settings.cache_compaction_threshold,
+                compression_level=self.compression_level
+            )
+        
         # Cache statistics
         self.stats = {
             "hits": 0,
@@ -34,11 +63,41 @@ class SmartCache:
             "memory_size": 0,
             "estimated_savings": 0.0
         }
+        
+        # Write-behind queue: cache_key -> (entry, cache_type, url) awaiting
+        # database and file persistence, oldest first
+        self.write_behind = settings.cache_write_behind
+        self._pending: "OrderedDict[str, Tuple[Dict, str, str]]" = OrderedDict()
+        self._in_flight: Dict[str, Tuple[Dict, str, str]] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self.flush_latency = Histogram()
+        self.write_stats = {
+            "queued": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "flush_errors": 0
+        }
+        
+        # File tier I/O; payload bytes are the uncompressed JSON
+        self.file_stats = {
+            "files_read": 0,
+            "bytes_read": 0,
+            "payload_bytes_read": 0,
+            "read_seconds": 0.0,
+            "files_written": 0,
+            "bytes_written": 0,
+            "payload_bytes_written": 0,
+            "write_seconds": 0.0
+        }
     
     def _generate_cache_key(self, url: str, params: Dict = None) -> str:
         """Generate unique cache key for URL and parameters"""
         
-        cache_input = f"{url}:{json.dumps(params or {}, sort_keys=True)}"
+        cache_input = f"{canonicalize_url(url)}:{json.dumps(params or {}, sort_keys=True)}"
         return hashlib.md5(cache_input.encode()).hexdigest()
     
     async def get(
@@ -50,21 +109,24 @@ class SmartCache:
         """
         Retrieve cached educational content
         
-        Priority: memory → database → file
+        Priority: memory → database → segment log or file
         """
         
         cache_key = self._generate_cache_key(url)
         
-        # 1. Check memory cache
-        if cache_key in self.memory_cache:
-            cached = self.memory_cache[cache_key]
-            if self._is_valid(cached, max_age_hours):
-                self.stats["hits"] += 1
-                logger.debug(f"Cache hit (memory): {url}")
-                return cached["data"]
-            else:
-                # Remove expired entry
-                del self.memory_cache[cache_key]
+        # 1. Check memory cache (expired entries are dropped by the lookup)
+        cached = self.memory_cache.get(cache_key, max_age_hours * 3600)
+        if cached is not None:
+            self.stats["hits"] += 1
+            logger.debug(f"Cache hit (memory): {url}")
+            return cached["data"]
+        
+        # Writes still queued for persistence are not in the slower tiers yet
+        pending = self._pending.get(cache_key) or self._in_flight.get(cache_key)
+        if pending is not None and self._is_valid(pending[0], max_age_hours):
+            self.stats["hits"] += 1
+            logger.debug(f"Cache hit (write queue): {url}")
+            return pending[0]["data"]
         
         # 2. Check database cache
         if self.db:
@@ -72,23 +134,42 @@ class SmartCache:
                 db_cache = await self._get_from_database(cache_key)
                 if db_cache and self._is_valid(db_cache, max_age_hours):
                     # Populate memory cache
-                    self.memory_cache[cache_key] = db_cache
+                    self._remember(cache_key, db_cache)
                     self.stats["hits"] += 1
                     logger.debug(f"Cache hit (database): {url}")
                     return db_cache["data"]
             except Exception as e:
                 logger.warning(f"Database cache error: {e}")
         
-        # 3. Check file cache
-        file_path = self.cache_dir / cache_type / f"{cache_key}.json"
-        if file_path.exists():
+        # 3. Check segment log
+        if self.segments is not None:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    cached = json.load(f)
+                cached = self.segments.get(cache_key, max_age_hours * 3600)
+            except Exception as e:
+                logger.warning(f"Segment log read error: {e}")
+                self.segments.delete(cache_key)
+                cached = None
+            
+            if cached is not None:
+                # Populate higher-tier caches
+                self._remember(cache_key, cached)
+                
+                if self.db:
+                    await self._save_to_database(cache_key, cached, cache_type, url)
+                
+                self.stats["hits"] += 1
+                logger.debug(f"Cache hit (segment log): {url}")
+                return cached["data"]
+        
+        # 4. Check file cache (used when the segment log is disabled)
+        file_path = None if self.segments is not None else self._existing_file(cache_type, cache_key)
+        if file_path is not None:
+            try:
+                cached = self._read_file(file_path)
                 
                 if self._is_valid(cached, max_age_hours):
                     # Populate higher-tier caches
-                    self.memory_cache[cache_key] = cached
+                    self._remember(cache_key, cached)
                     
                     if self.db:
                         await self._save_to_database(cache_key, cached, cache_type, url)
@@ -121,8 +202,12 @@ class SmartCache:
     ) -> None:
         """
         Save educational content to all cache tiers
+        
+        The memory tier is written immediately; with write-behind enabled
+        the database and file tiers are written by a background flusher.
         """
         
+        url = canonicalize_url(url)
         cache_key = self._generate_cache_key(url)
         
         cached_entry = {
@@ -134,26 +219,211 @@ class SmartCache:
         }
         
         # 1. Save to memory cache
-        self.memory_cache[cache_key] = cached_entry
+        self._remember(cache_key, cached_entry)
         self.stats["memory_size"] = len(self.memory_cache)
         
-        # 2. Save to database
+        # 2. Save to database and file, in the background or right away
+        if self.write_behind:
+            self._enqueue_write(cache_key, cached_entry, cache_type, url)
+        else:
+            await self._persist([(cache_key, (cached_entry, cache_type, url))])
+        
+        self.stats["saves"] += 1
+        logger.debug(f"Cached educational content: {url}")
+    
+    def _enqueue_write(self, cache_key: str, cached_entry: Dict, cache_type: str, url: str) -> None:
+        """Queue an entry for persistence, coalescing repeated writes of a key"""
+        
+        if cache_key in self._pending:
+            self.write_stats["coalesced"] += 1
+        elif len(self._pending) >= settings.cache_write_queue_size:
+            # The entry stays in the memory tier; only persistence is skipped
+            self.write_stats["dropped"] += 1
+            logger.warning(f"Cache write queue full, not persisting: {url}")
+            return
+        else:
+            self.write_stats["queued"] += 1
+        
+        self._pending[cache_key] = (cached_entry, cache_type, url)
+        self._wakeup.set()
+        
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+    
+    async def _flush_loop(self) -> None:
+        """Persist queued writes in batches as they arrive"""
+        
+        while True:
+            await self._wakeup.wait()
+            if len(self._pending) < settings.cache_write_batch_size:
+                # Let concurrent writes join the batch
+                await asyncio.sleep(settings.cache_write_flush_interval)
+            self._wakeup.clear()
+            
+            while self._pending:
+                await self._flush_batch()
+    
+    async def _flush_batch(self) -> None:
+        """Persist up to one batch of queued writes"""
+        
+        async with self._flush_lock:
+            count = min(settings.cache_write_batch_size, len(self._pending))
+            if not count:
+                return
+            
+            batch = [self._pending.popitem(last=False) for _ in range(count)]
+            self._in_flight = dict(batch)
+            start = time.perf_counter()
+            try:
+                await self._persist(batch)
+            finally:
+                self._in_flight = {}
+                self.flush_latency.record(time.perf_counter() - start)
+                self.write_stats["flushes"] += 1
+                self.write_stats["flushed"] += count
+    
+    async def _persist(self, batch: List[Tuple[str, Tuple[Dict, str, str]]]) -> None:
+        """Write a batch of entries to the database and file tiers"""
+        
+        # 1. Database, as one multi-row upsert
         if self.db:
             try:
-                await self._save_to_database(cache_key, cached_entry, cache_type, url)
+                await self.db.set_cache_many([
+                    {
+                        "cache_key": cache_key,
+                        "cache_type": f"educational_{cache_type}",
+                        "data": cached_entry["data"],
+                        "expires_hours": 24,  # Default 24 hours
+                        "url": url,
+                        "age_seconds": self._age_seconds(cached_entry)
+                    }
+                    for cache_key, (cached_entry, cache_type, url) in batch
+                ])
             except Exception as e:
+                self.write_stats["flush_errors"] += 1
                 logger.warning(f"Database cache save error: {e}")
         
-        # 3. Save to file
-        file_path = self.cache_dir / cache_type / f"{cache_key}.json"
+        # 2. Segment log or files, written in a thread
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(cached_entry, f, indent=2, ensure_ascii=False)
+            if self.segments is not None:
+                await asyncio.to_thread(self._write_segments, batch)
+                self.segments.maybe_compact()
+            else:
+                await asyncio.to_thread(self._write_files, batch)
         except Exception as e:
+            self.write_stats["flush_errors"] += 1
             logger.warning(f"File cache save error: {e}")
+    
+    def _write_segments(self, batch: List[Tuple[str, Tuple[Dict, str, str]]]) -> None:
+        """Append entries to the segment log"""
         
-        self.stats["saves"] += 1
-        logger.debug(f"Cached educational content: {url}")
+        for cache_key, (cached_entry, cache_type, url) in batch:
+            self.segments.put(cache_key, cached_entry, cache_type)
+    
+    def _write_files(self, batch: List[Tuple[str, Tuple[Dict, str, str]]]) -> None:
+        """Write entries to files, replacing copies in the other format"""
+        
+        for cache_key, (cached_entry, cache_type, url) in batch:
+            file_path, stale_path = self._file_paths(cache_type, cache_key)
+            self._write_file(file_path, cached_entry)
+            if stale_path.exists():
+                stale_path.unlink()
+    
+    async def flush(self) -> None:
+        """Persist all queued writes now"""
+        
+        while self._pending:
+            await self._flush_batch()
+        
+        # Wait out a batch the background flusher may still be writing
+        async with self._flush_lock:
+            pass
+    
+    async def close(self) -> None:
+        """Drain the write queue and stop the background flusher"""
+        
+        await self.flush()
+        
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        
+        if self.segments is not None:
+            self.segments.close()
+    
+    def _file_paths(self, cache_type: str, cache_key: str) -> List[Path]:
+        """File paths for a key, the configured format first"""
+        
+        suffixes = [COMPACT_SUFFIX, LEGACY_SUFFIX] if self.compact_files else [LEGACY_SUFFIX, COMPACT_SUFFIX]
+        return [self.cache_dir / cache_type / f"{cache_key}{suffix}" for suffix in suffixes]
+    
+    def _existing_file(self, cache_type: str, cache_key: str) -> Optional[Path]:
+        """The file holding a key, in whichever format it was written"""
+        
+        for file_path in self._file_paths(cache_type, cache_key):
+            if file_path.exists():
+                return file_path
+        return None
+    
+    @staticmethod
+    def _cache_files(cache_type_dir: Path) -> Iterator[Path]:
+        """All cache files of one type, in both formats"""
+        
+        yield from cache_type_dir.glob(f"*{COMPACT_SUFFIX}")
+        yield from cache_type_dir.glob(f"*{LEGACY_SUFFIX}")
+    
+    def _read_file(self, file_path: Path) -> Dict:
+        """Read and decode a cache file of either format"""
+        
+        start = time.perf_counter()
+        raw = file_path.read_bytes()
+        cached, payload_size = decode_entry(raw)
+        
+        self.file_stats["files_read"] += 1
+        self.file_stats["bytes_read"] += len(raw)
+        self.file_stats["payload_bytes_read"] += payload_size
+        self.file_stats["read_seconds"] += time.perf_counter() - start
+        return cached
+    
+    def _write_file(self, file_path: Path, cached: Dict) -> None:
+        """Encode and write a cache file in the format its suffix names"""
+        
+        start = time.perf_counter()
+        if file_path.suffix == COMPACT_SUFFIX:
+            raw, payload_size = encode_entry(cached, self.compression_level)
+        else:
+            raw = json.dumps(cached, indent=2, ensure_ascii=False).encode('utf-8')
+            payload_size = len(raw)
+        file_path.write_bytes(raw)
+        
+        self.file_stats["files_written"] += 1
+        self.file_stats["bytes_written"] += len(raw)
+        self.file_stats["payload_bytes_written"] += payload_size
+        self.file_stats["write_seconds"] += time.perf_counter() - start
+    
+    def _remember(self, cache_key: str, cached: Dict) -> None:
+        """Put an entry in the memory tier, carrying over its age and size"""
+        
+        expires_in = None
+        if cached.get("expires_at"):
+            expires_in = (datetime.fromisoformat(cached["expires_at"]) - datetime.now()).total_seconds()
+        
+        size = cached.get("size") or len(json.dumps(cached.get("data")))
+        self.memory_cache.put(cache_key, cached, size, age=self._age_seconds(cached), expires_in=expires_in)
+    
+    @staticmethod
+    def _age_seconds(cached: Dict) -> float:
+        """Seconds since an entry was created, 0 if unknown"""
+        
+        try:
+            age = (datetime.now() - datetime.fromisoformat(cached["timestamp"])).total_seconds()
+        except Exception:
+            return 0.0
+        return max(0.0, age)
     
     def _is_valid(self, cached: Dict, max_age_hours: int) -> bool:
         """Check if cached entry is still valid"""
@@ -164,6 +434,8 @@ class SmartCache:
         try:
             cached_time = datetime.fromisoformat(cached["timestamp"])
             age = datetime.now() - cached_time
+            if cached.get("expires_at") and datetime.fromisoformat(cached["expires_at"]) <= datetime.now():
+                return False
             return age < timedelta(hours=max_age_hours)
         except Exception:
             return False
@@ -175,13 +447,16 @@ class SmartCache:
             return None
         
         try:
-            # Using the database manager's get_cache method
-            result = await self.db.get_cache(cache_key)
+            result = await self.db.get_cache_entry(cache_key)
             
             if result:
+                # Ages come from the database clock and are rebased onto
+                # ours, so clock or time zone differences do not matter
+                now = datetime.now()
                 return {
-                    "data": result,
-                    "timestamp": datetime.now().isoformat()  # Approximate
+                    "data": result["data"],
+                    "timestamp": (now - timedelta(seconds=result["age_seconds"])).isoformat(),
+                    "expires_at": (now + timedelta(seconds=result["expires_in_seconds"])).isoformat()
                 }
         except Exception as e:
             logger.warning(f"Database cache get error: {e}")
@@ -206,7 +481,8 @@ class SmartCache:
                 cache_type=f"educational_{cache_type}",
                 data=cached_entry["data"],
                 expires_hours=24,  # Default 24 hours
-                url=url
+                url=url,
+                age_seconds=self._age_seconds(cached_entry)
             )
         except Exception as e:
             logger.warning(f"Database cache save error: {e}")
@@ -218,17 +494,24 @@ class SmartCache:
         
         cache_key = self._generate_cache_key(url)
         
-        # Remove from memory
-        if cache_key in self.memory_cache:
-            del self.memory_cache[cache_key]
+        # Remove from memory and the write queue, and let a batch writing
+        # the key finish so it cannot recreate what is deleted below
+        self.memory_cache.pop(cache_key)
+        self._pending.pop(cache_key, None)
+        if cache_key in self._in_flight:
+            async with self._flush_lock:
+                pass
         
         # Remove from file cache
-        file_path = self.cache_dir / cache_type / f"{cache_key}.json"
-        if file_path.exists():
-            try:
-                file_path.unlink()
-            except Exception as e:
-                logger.warning(f"File cache invalidation error: {e}")
+        for file_path in self._file_paths(cache_type, cache_key):
+            if file_path.exists():
+                try:
+                    file_path.unlink()
+                except Exception as e:
+                    logger.warning(f"File cache invalidation error: {e}")
+        
+        if self.segments is not None:
+            self.segments.delete(cache_key)
         
         # Remove from database
         if self.db:
@@ -254,22 +537,18 @@ class SmartCache:
         cutoff_time = datetime.now() - timedelta(days=max_age_days)
         
         # Clean memory cache
-        expired_keys = []
-        for key, entry in self.memory_cache.items():
-            if not self._is_valid(entry, max_age_days * 24):
-                expired_keys.append(key)
+        cleaned_count += self.memory_cache.purge_expired(max_age_days * 86400)
         
-        for key in expired_keys:
-            del self.memory_cache[key]
-            cleaned_count += 1
+        # Clean segment log from its index, without reading payloads
+        if self.segments is not None:
+            cleaned_count += self.segments.purge_expired(max_age_days * 86400)
         
         # Clean file cache
         for cache_type_dir in self.cache_dir.iterdir():
             if cache_type_dir.is_dir():
-                for cache_file in cache_type_dir.glob("*.json"):
+                for cache_file in self._cache_files(cache_type_dir):
                     try:
-                        with open(cache_file, 'r', encoding='utf-8') as f:
-                            cached = json.load(f)
+                        cached = self._read_file(cache_file)
                         
                         if not self._is_valid(cached, max_age_days * 24):
                             cache_file.unlink()
@@ -291,6 +570,164 @@ class SmartCache:
         logger.info(f"Cleaned up {cleaned_count} expired cache entries")
         return cleaned_count
     
+    async def migrate_cache_keys(self) -> Dict[str, int]:
+        """
+        Re-key cache entries written before URL canonicalization
+        
+        Older entries are keyed by the raw URL, so fragment, tracking and
+        scheme variants of one page each hold their own entry. Every entry
+        is moved to its canonical key; when variants collide the newest
+        one is kept and the rest are removed.
+        
+        Returns:
+            Number of entries migrated and merged away
+        """
+        
+        counts = {"migrated": 0, "merged": 0}
+        
+        # Queued writes would otherwise land under their old keys afterwards
+        await self.flush()
+        
+        # Migrate file cache, newest entries first so they win collisions
+        file_entries = []
+        for cache_type_dir in self.cache_dir.iterdir():
+            if cache_type_dir.is_dir():
+                for cache_file in self._cache_files(cache_type_dir):
+                    try:
+                        cached = self._read_file(cache_file)
+                        file_entries.append((cache_file, cached))
+                    except Exception as e:
+                        logger.warning(f"Skipping unreadable cache file {cache_file}: {e}")
+        
+        file_entries.sort(key=lambda item: item[1].get("timestamp", ""), reverse=True)
+        claimed = set()
+        
+        for cache_file, cached in file_entries:
+            if cache_file in claimed:
+                # Already overwritten by a newer variant of the same page
+                counts["merged"] += 1
+                continue
+            
+            if not cached.get("url"):
+                continue
+            
+            canonical_url = canonicalize_url(cached["url"])
+            new_key = self._generate_cache_key(canonical_url)
+            # Entries are rewritten in the configured format
+            target = self._file_paths(cache_file.parent.name, new_key)[0]
+            
+            if target in claimed:
+                cache_file.unlink()
+                counts["merged"] += 1
+                continue
+            
+            claimed.add(target)
+            if target == cache_file and cached["url"] == canonical_url:
+                continue
+            
+            cached["url"] = canonical_url
+            self._write_file(target, cached)
+            if target != cache_file:
+                cache_file.unlink()
+            counts["migrated"] += 1
+
+        # Migrate the segment log, newest entries first like the files
+        if self.segments is not None:
+            segment_entries = sorted(
+                self.segments.index.items(), key=lambda item: item[1].timestamp, reverse=True
+            )
+            claimed = set()
+        
+            for cache_key, location in segment_entries:
+                if cache_key in claimed:
+                    # Already overwritten by a newer variant of the same page
+                    counts["merged"] += 1
+                    continue
+        
+                try:
+                    cached = self.segments.get(cache_key)
+                except ValueError as e:
+                    logger.warning(f"Skipping unreadable segment log entry {cache_key}: {e}")
+                    continue
+        
+                if not cached or not cached.get("url"):
+                    continue
+        
+                canonical_url = canonicalize_url(cached["url"])
+                new_key = self._generate_cache_key(canonical_url)
+        
+                if new_key in claimed:
+                    self.segments.delete(cache_key)
+                    counts["merged"] += 1
+                    continue
+        
+                claimed.add(new_key)
+                if new_key == cache_key and cached["url"] == canonical_url:
+                    continue
+        
+                cached["url"] = canonical_url
+                self.segments.put(new_key, cached, location.cache_type, timestamp=location.timestamp)
+                if new_key != cache_key:
+                    self.segments.delete(cache_key)
+                counts["migrated"] += 1
+        
+        # Migrate database cache
+        if self.db:
+            try:
+                # Newest first, so the first row seen for a key is the one kept
+                rows = await self.db.fetch("""
+                    SELECT cache_key, url FROM cache_entries
+                    WHERE url IS NOT NULL
+                    ORDER BY created_at DESC, expires_at DESC
+                """)
+                
+                stored_keys = {row["cache_key"] for row in rows}
+                claimed_keys = set()
+                removed_keys = set()
+                
+                for row in rows:
+                    if row["cache_key"] in removed_keys:
+                        continue
+                    
+                    new_key = self._generate_cache_key(row["url"])
+                    if new_key in claimed_keys:
+                        # Older than the variant already kept for this page
+                        await self.db.execute(
+                            "DELETE FROM cache_entries WHERE cache_key = $1",
+                            row["cache_key"]
+                        )
+                        counts["merged"] += 1
+                        continue
+                    
+                    claimed_keys.add(new_key)
+                    if new_key == row["cache_key"]:
+                        continue
+                    
+                    if new_key in stored_keys:
+                        # An older entry holds the canonical key; this variant replaces it
+                        await self.db.execute(
+                            "DELETE FROM cache_entries WHERE cache_key = $1", new_key
+                        )
+                        removed_keys.add(new_key)
+                        counts["merged"] += 1
+                    
+                    await self.db.execute(
+                        "UPDATE cache_entries SET cache_key = $1, url = $2 WHERE cache_key = $3",
+                        new_key, canonicalize_url(row["url"]), row["cache_key"]
+                    )
+                    counts["migrated"] += 1
+            except Exception as e:
+                logger.warning(f"Database cache migration error: {e}")
+        
+        # Memory entries are rebuilt on demand under canonical keys
+        self.memory_cache.clear()
+        
+        logger.info(
+            f"Migrated {counts['migrated']} cache entries to canonical keys, "
+            f"merged {counts['merged']} duplicates"
+        )
+        return counts
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         
@@ -300,18 +737,44 @@ class SmartCache:
         # Estimate cost savings (assuming $0.0001 per scrape)
         estimated_savings = self.stats["hits"] * 0.0001
         
-        return {
+        files = self.file_stats
+        compression_ratio = files["payload_bytes_written"] / max(1, files["bytes_written"])
+        read_mb_per_s = files["payload_bytes_read"] / 1024 / 1024 / max(1e-9, files["read_seconds"])
+        write_mb_per_s = files["payload_bytes_written"] / 1024 / 1024 / max(1e-9, files["write_seconds"])
+        
+        stats = {
             "hits": self.stats["hits"],
             "misses": self.stats["misses"],
             "saves": self.stats["saves"],
             "hit_rate": f"{hit_rate:.1f}%",
             "memory_entries": len(self.memory_cache),
-            "memory_size_mb": sum(
-                entry.get("size", 0) for entry in self.memory_cache.values()
-            ) / 1024 / 1024,
+            "memory_size_mb": self.memory_cache.bytes / 1024 / 1024,
+            "memory_evictions": self.memory_cache.stats["evictions"],
+            "memory_expirations": self.memory_cache.stats["expirations"],
+            "memory_rejected_oversize": self.memory_cache.stats["rejected_oversize"],
+            "file_format": "compact" if self.compact_files else "json",
+            "file_reads": files["files_read"],
+            "file_writes": files["files_written"],
+            "file_compression_ratio": f"{compression_ratio:.2f}x",
+            "file_read_mb_per_s": round(read_mb_per_s, 1),
+            "file_write_mb_per_s": round(write_mb_per_s, 1),
             "estimated_savings": f"${estimated_savings:.4f}",
             "total_requests": total_requests
         }
+        
+        stats["write_queue"] = {
+            **self.write_stats,
+            "enabled": self.write_behind,
+            "depth": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "capacity": settings.cache_write_queue_size,
+            "flush_latency": self.flush_latency.summary()
+        }
+        
+        if self.segments is not None:
+            stats["segment_log"] = self.segments.get_stats()
+        
+        return stats
     
     async def get_cache_summary(self) -> Dict[str, Any]:
         """Get comprehensive cache summary"""
@@ -336,12 +799,20 @@ class SmartCache:
             summary["memory_cache"]["types"][cache_type] = \
                 summary["memory_cache"]["types"].get(cache_type, 0) + 1
         
-        # Analyze file cache
-        for cache_type_dir in self.cache_dir.iterdir():
-            if cache_type_dir.is_dir():
-                file_count = len(list(cache_type_dir.glob("*.json")))
-                summary["file_cache"]["types"][cache_type_dir.name] = file_count
-                summary["file_cache"]["total_files"] += file_count
+        # Analyze file cache; the segment log answers from its index
+        if self.segments is not None:
+            types = self.segments.summary()
+            summary["file_cache"] = {
+                "storage": "segments",
+                "total_files": sum(types.values()),
+                "types": types
+            }
+        else:
+            for cache_type_dir in self.cache_dir.iterdir():
+                if cache_type_dir.is_dir():
+                    file_count = sum(1 for _ in self._cache_files(cache_type_dir))
+                    summary["file_cache"]["types"][cache_type_dir.name] = file_count
+                    summary["file_cache"]["total_files"] += file_count
         
         # Check database cache status
         if self.db:
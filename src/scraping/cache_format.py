@@ -0,0 +1,85 @@
+"""
+Compact, compressed serialization of file cache entries
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+# Header of compact files: magic, format version, codec
+MAGIC = b"EDUC"
+FORMAT_VERSION = 1
+CODEC_NONE = ord("n")
+CODEC_ZLIB = ord("z")
+
+HEADER_SIZE = len(MAGIC) + 2
+
+# Compact entries are written under a new suffix; legacy files keep .json
+COMPACT_SUFFIX = ".cache"
+LEGACY_SUFFIX = ".json"
+
+def dumps_compact(value: Any) -> bytes:
+    """Serialize to JSON without whitespace"""
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib handles them
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def loads(payload: bytes) -> Any:
+    """Parse JSON with the fastest available decoder"""
+
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+def encode_entry(entry: Dict[str, Any], level: int = 3) -> Tuple[bytes, int]:
+    """
+    Encode a cache entry as header + compact JSON
+
+    Args:
+        level: zlib compression level; 0 stores the JSON uncompressed
+
+    Returns:
+        (encoded bytes, size of the uncompressed JSON)
+    """
+
+    payload = dumps_compact(entry)
+    if level <= 0:
+        return MAGIC + bytes([FORMAT_VERSION, CODEC_NONE]) + payload, len(payload)
+    return MAGIC + bytes([FORMAT_VERSION, CODEC_ZLIB]) + zlib.compress(payload, level), len(payload)
+
+def decode_entry(raw: bytes) -> Tuple[Dict[str, Any], int]:
+    """
+    Decode a compact or legacy pretty-printed JSON cache file
+
+    Returns:
+        (entry, size of the uncompressed JSON)
+
+    Raises:
+        ValueError: on an unknown format version or codec, or corrupt data
+    """
+
+    if not raw.startswith(MAGIC):
+        return loads(raw), len(raw)
+
+    if len(raw) < HEADER_SIZE:
+        raise ValueError("Truncated cache file header")
+
+    version, codec = raw[len(MAGIC)], raw[len(MAGIC) + 1]
+    if version != FORMAT_VERSION or codec not in (CODEC_NONE, CODEC_ZLIB):
+        raise ValueError(f"Unsupported cache file format {version}/{chr(codec)}")
+
+    payload = raw[HEADER_SIZE:]
+    if codec == CODEC_ZLIB:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise ValueError(f"Corrupt cache file: {e}") from e
+
+    return loads(payload), len(payload)
@@ -0,0 +1,178 @@
+"""
+Token-budgeted structural compression of markdown before Claude analysis
+"""
+
+import re
+from typing import List, Tuple
+
+# Rough characters-per-token ratio for English and Spanish prose
+CHARS_PER_TOKEN = 4
+
+# Longest fenced code block kept, in lines
+MAX_CODE_BLOCK_LINES = 40
+
+# Block kinds in the order they are kept when the budget is tight
+HEADING, SUMMARY, CODE, LIST, PARAGRAPH = range(5)
+
+# Site chrome that opens a line; matched only on short lines
+BOILERPLATE_PATTERNS = re.compile(
+    r'^\W*(cookies?\b|we use cookies|privacy policy|terms of (use|service)'
+    r'|all rights reserved|©|copyright|subscribe|newsletter|sign (in|up)\W*$|log in\W*$'
+    r'|skip to (main )?content|share (on|this)|follow us|back to top|table of contents)',
+    re.IGNORECASE
+)
+
+LINK_PATTERN = re.compile(r'!?\[[^\]]*\]\([^)]*\)')
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+\S')
+LIST_PATTERN = re.compile(r'^\s*([-*+]|\d+[.)])\s+\S')
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+RULE_PATTERN = re.compile(r'^\s*([-*_]\s*){3,}$')
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text"""
+
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def compress_markdown(markdown: str, token_budget: int) -> str:
+    """
+    Compress page markdown to fit a token budget while keeping its structure
+
+    Navigation and link-farm lines, boilerplate, images and rules are
+    always dropped. If the page still exceeds the budget, each section is
+    reduced to its heading, first sentence, fenced code blocks and lists,
+    and blocks are then admitted by priority (headings, first sentences,
+    code, lists) until the budget is spent. Kept blocks stay in document
+    order.
+    """
+
+    if not markdown:
+        return ''
+
+    blocks = _parse_blocks(markdown)
+    text = _join(full for _, _, full in blocks)
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    # Keep only the signal-bearing parts of each section
+    blocks = [block for block in blocks if block[1] != PARAGRAPH]
+    text = _join(block for block, _, _ in blocks)
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    char_budget = token_budget * CHARS_PER_TOKEN
+    kept = set()
+    used = 0
+    for priority in (HEADING, SUMMARY, CODE, LIST):
+        for position, (block, kind, _) in enumerate(blocks):
+            if kind != priority:
+                continue
+            size = len(block) + 2
+            if used + size > char_budget:
+                continue
+            kept.add(position)
+            used += size
+
+    return _join(block for position, (block, _, _) in enumerate(blocks) if position in kept)
+
+def _parse_blocks(markdown: str) -> List[Tuple[str, int, str]]:
+    """
+    Split markdown into (text, kind, full_text) blocks, dropping noise
+
+    A section's first paragraph becomes a SUMMARY block holding its first
+    sentence, with the whole paragraph as full_text; later paragraphs are
+    PARAGRAPH blocks.
+    """
+
+    blocks = []
+    paragraph = []
+    list_items = []
+    code = None
+    needs_summary = True
+
+    def flush_paragraph():
+        nonlocal needs_summary
+        if paragraph:
+            text = ' '.join(paragraph)
+            if needs_summary:
+                first = SENTENCE_END.split(text, maxsplit=1)[0]
+                blocks.append((first, SUMMARY, text))
+                needs_summary = False
+            else:
+                blocks.append((text, PARAGRAPH, text))
+            paragraph.clear()
+
+    def flush_list():
+        if list_items:
+            items = '\n'.join(list_items)
+            blocks.append((items, LIST, items))
+            list_items.clear()
+
+    for line in markdown.splitlines():
+        if code is not None:
+            code.append(line)
+            if FENCE_PATTERN.match(line):
+                if len(code) > MAX_CODE_BLOCK_LINES:
+                    code = code[:MAX_CODE_BLOCK_LINES - 1] + [code[-1]]
+                block = '\n'.join(code)
+                blocks.append((block, CODE, block))
+                code = None
+            continue
+
+        stripped = line.strip()
+
+        if FENCE_PATTERN.match(line):
+            flush_paragraph()
+            flush_list()
+            code = [line]
+            continue
+
+        if not stripped:
+            flush_paragraph()
+            flush_list()
+            continue
+
+        if _is_noise(stripped):
+            continue
+
+        if HEADING_PATTERN.match(stripped):
+            flush_paragraph()
+            flush_list()
+            blocks.append((stripped, HEADING, stripped))
+            needs_summary = True
+        elif LIST_PATTERN.match(line):
+            flush_paragraph()
+            list_items.append(line.rstrip())
+        else:
+            flush_list()
+            paragraph.append(stripped)
+
+    # An unterminated fence still carries code
+    if code is not None:
+        block = '\n'.join(code[:MAX_CODE_BLOCK_LINES])
+        blocks.append((block, CODE, block))
+    flush_paragraph()
+    flush_list()
+
+    return blocks
+
+def _is_noise(line: str) -> bool:
+    """Check whether a line is navigation, boilerplate or decoration"""
+
+    if RULE_PATTERN.match(line):
+        return True
+
+    links = LINK_PATTERN.findall(line)
+    if links:
+        remainder = LINK_PATTERN.sub('', line)
+        remainder = re.sub(r'^\s*([-*+]|\d+[.)])\s+', '', remainder)
+        # Lines that are mostly links are navigation or link farms
+        if len(links) >= 3 or len(remainder.strip(' |·•-')) < 20:
+            return True
+
+    return len(line) < 120 and bool(BOILERPLATE_PATTERNS.search(line))
+
+def _join(texts) -> str:
+    """Join block texts into markdown"""
+
+    return '\n\n'.join(texts)
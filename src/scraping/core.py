@@ -2,40 +2,94 @@
 Core educational web scraper with intelligent content discovery
 """
 
-import asyncio
-import hashlib
-import json
+import copy
 import logging
 import re
-import tiktoken
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from urllib.parse import urljoin, urlparse
+import time
+from typing import AsyncIterator, Dict, List, Optional, Any, Sequence, Tuple
+from urllib.parse import urlparse
 
-from firecrawl import FirecrawlApp
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
 from config.settings import settings
 from src.scraping.cache import SmartCache
+from src.scraping.compression import compress_markdown, estimate_tokens
+from src.scraping.crawler import EducationalCrawler
+from src.scraping.dedup import NearDuplicateDetector, SimHashIndex, simhash
+from src.scraping.fingerprint import FingerprintStore
+from src.scraping.gate import ContentGate, GateDecision, measure_page
+from src.scraping.markdown import MarkdownScan, find_json_object, scan_markdown
+from src.scraping.matcher import KeywordMatcher
+from src.scraping.memo import AnalysisMemo
+from src.scraping.metrics import StageMetrics
 from src.scraping.rate_limiter import EducationalRateLimiter
-from src.database.connection import get_db_manager
+from src.scraping.singleflight import SingleFlight
+from src.scraping.transport import document_source_url, get_firecrawl_transport
+from src.scraping.urls import canonicalize_url, is_http_url, resolve_url
+from src.scraping.wait_profiles import WaitProfileStore, default_wait
+from src.tools.process_pool import get_process_pool
 
 logger = logging.getLogger(__name__)
 
+# Claude pricing in USD per 1K tokens
+ANTHROPIC_INPUT_COST_PER_1K = 0.003
+ANTHROPIC_OUTPUT_COST_PER_1K = 0.015
+
+# Bump whenever the analysis prompt changes so memoized results are not reused
+ANALYSIS_PROMPT_VERSION = "1"
+
+# Result fields assembled from pages rather than taken from page metadata
+AGGREGATE_RESULT_FIELDS = {
+    'source_url', 'content_type', 'pages_scraped', 'educational_content',
+    'crawled_urls', 'duplicate_urls', 'duplicate_of', 'total_cost', 'error'
+}
+
+# Keyword groups consulted when scoring and classifying search results
+ITEM_KEYWORD_GROUPS = (
+    'tutorial_indicators', 'code_terms', 'learning_keywords',
+    'course_terms', 'documentation_terms', 'tutorial_terms', 'example_terms'
+)
+
+# Providers queried by educational search; Firecrawl would only re-scrape
+# pages the search providers already describe
+SEARCH_PROVIDERS = ("tavily", "exa")
+
+def _prepare_analysis_input(markdown: str, token_budget: int) -> tuple:
+    """
+    Compress a page for analysis and fingerprint it
+    
+    Runs in a worker process for large pages.
+    
+    Returns:
+        (compressed markdown, raw tokens, compressed tokens, SimHash)
+    """
+    
+    compressed = compress_markdown(markdown, token_budget)
+    return compressed, estimate_tokens(markdown), estimate_tokens(compressed), simhash(markdown)
+
 class EducationalScraper:
     """
     Advanced web scraper optimized for educational content discovery
     """
     
     def __init__(self, db_manager=None):
-        self.firecrawl = FirecrawlApp(api_key=settings.firecrawl_api_key)
-        self.anthropic = Anthropic(api_key=settings.anthropic_api_key)
+        self.firecrawl = get_firecrawl_transport()
+        self.anthropic = AsyncAnthropic(api_key=settings.anthropic_api_key)
         self.db = db_manager
         
         # Initialize components
         self.cache = SmartCache(db_manager)
+        self.memo = AnalysisMemo(db_manager)
+        self.fingerprints = FingerprintStore(db_manager)
+        self.single_flight = SingleFlight()
+        self.wait_profiles = WaitProfileStore(db_manager)
+        self.metrics = StageMetrics()
+        self.process_pool = get_process_pool()
+        self.dedup = NearDuplicateDetector(
+            db_manager, max_distance=settings.near_duplicate_max_distance
+        )
         self.rate_limiter = EducationalRateLimiter()
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.search_collector = None
         
         # Educational content patterns
         self.educational_patterns = {
@@ -50,16 +104,48 @@ class EducationalScraper:
             'educational_sites': [
                 'coursera.org', 'edx.org', 'udemy.com', 'khanacademy.org',
                 'freecodecamp.org', 'codecademy.com', 'pluralsight.com'
+            ],
+            'code_terms': [
+                'code', 'programming', 'python', 'javascript', 'tutorial'
+            ],
+            'learning_keywords': [
+                'learn', 'course', 'lesson', 'guide', 'example', 'practice'
+            ],
+            'course_terms': ['course', 'class', 'curriculum'],
+            'documentation_terms': ['docs', 'documentation', 'reference', 'api'],
+            'tutorial_terms': ['tutorial', 'guide', 'how-to', 'walkthrough'],
+            'example_terms': ['example', 'demo', 'sample'],
+            'beginner_indicators': [
+                'beginner', 'basic', 'intro', 'getting started',
+                'fundamentals', 'first', 'simple'
+            ],
+            'advanced_indicators': [
+                'advanced', 'expert', 'complex', 'deep dive',
+                'master', 'professional', 'optimization'
+            ],
+            'intermediate_indicators': [
+                'intermediate', 'next level', 'beyond basics'
             ]
         }
         
+        # One compiled matcher answers every keyword check in a single pass
+        self.keyword_matcher = KeywordMatcher(self.educational_patterns)
+        self.gate = ContentGate(
+            keywords=[keyword for group in self.educational_patterns.values() for keyword in group],
+            languages=settings.content_gate_languages,
+            min_words=settings.content_gate_min_words,
+            min_relevance=settings.content_gate_min_relevance
+        )
+        
         # Statistics tracking
         self.stats = {
             'total_scrapes': 0,
             'educational_content_found': 0,
             'cache_hits': 0,
             'total_cost': 0.0,
-            'errors': 0
+            'errors': 0,
+            'analysis_tokens_raw': 0,
+            'analysis_tokens_compressed': 0
         }
     
     async def scrape_educational_content(
@@ -67,7 +153,13 @@ class EducationalScraper:
         url: str,
         content_type: str = "tutorial",
         depth: int = 1,
-        max_pages: int = 10
+        max_pages: int = 10,
+        max_concurrency: int = 3,
+        per_domain_limit: int = 2,
+        per_depth_limit: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        cost_budget: Optional[float] = None,
+        batch: bool = False
     ) -> Dict[str, Any]:
         """
         Scrape educational content with intelligent discovery
@@ -77,12 +169,59 @@ class EducationalScraper:
             content_type: Type of content to focus on (tutorial, documentation, course)
             depth: How many levels deep to crawl
             max_pages: Maximum pages to scrape
+            max_concurrency: Maximum related pages fetched at the same time
+            per_domain_limit: Maximum concurrent fetches against one domain
+            per_depth_limit: Maximum pages fetched per crawl level
+            time_budget: Seconds the related-page crawl may run
+            cost_budget: Maximum spend in USD, including the main page scrape and analysis
+            batch: Scrape each crawl level as one Firecrawl batch job
         
         Returns:
             Comprehensive educational content data
         """
         
-        logger.info(f"🎓 Scraping educational content from {url}")
+        # Fetch the URL as given; variants of it share one identity for
+        # coalescing, locking and caching
+        url = resolve_url(url)
+        key = canonicalize_url(url)
+        
+        crawl_options = {
+            'depth': depth,
+            'max_pages': max_pages,
+            'max_concurrency': max_concurrency,
+            'per_domain_limit': per_domain_limit,
+            'per_depth_limit': per_depth_limit,
+            'time_budget': time_budget,
+            'cost_budget': cost_budget,
+            'batch': batch
+        }
+        
+        async def scrape():
+            if self.db:
+                # Serialize with other workers scraping the same cache entry
+                async with self.db.advisory_lock(self.cache._generate_cache_key(url)) as locked:
+                    if locked:
+                        result = await self._collect_educational_content(
+                            url, content_type, crawl_options
+                        )
+                        # Persist before unlocking so the next holder gets a cache hit
+                        await self.cache.flush()
+                        return result
+                logger.info(f"🔓 Scraping {url} without the cross-process lock")
+            
+            return await self._collect_educational_content(url, content_type, crawl_options)
+        
+        # Concurrent requests for the same page share a single scrape
+        result = await self.single_flight.do((key, content_type), scrape)
+        return copy.deepcopy(result)
+    
+    async def _collect_educational_content(
+        self,
+        url: str,
+        content_type: str,
+        crawl_options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Assemble, cache and fingerprint the streamed pages of one scrape"""
         
         result = {
             'source_url': url,
@@ -95,60 +234,59 @@ class EducationalScraper:
             'difficulty_level': None,
             'estimated_time': None,
             'related_topics': [],
+            'crawled_urls': [],
+            'duplicate_urls': [],
+            'duplicate_of': {},
             'total_cost': 0.0,
             'error': None
         }
         
+        pages = []
+        
         try:
-            # Apply rate limiting
-            await self.rate_limiter.acquire('firecrawl')
+            async for page in self.iter_educational_content(
+                url, content_type=content_type, **crawl_options
+            ):
+                if page['error']:
+                    result['error'] = page['error']
+                    return result
+                pages.append(page)
             
-            # Check cache first
-            cached = await self.cache.get(url, f"educational_{content_type}")
-            if cached:
-                logger.info(f"📚 Using cached educational content for {url}")
-                self.stats['cache_hits'] += 1
-                return cached
+            # Restore discovery order so cached payloads stay deterministic
+            pages.sort(key=lambda page: page['index'])
             
-            # Scrape main page with educational optimization
-            main_content = await self._scrape_educational_page(url, content_type)
+            for page in pages:
+                if page['duplicate_of']:
+                    result['duplicate_urls'].append(page['url'])
+                    result['duplicate_of'][page['url']] = page['duplicate_of']
+                    result['total_cost'] += page['cost']
+                    continue
+                if page['metadata']:
+                    result.update(page['metadata'])
+                result['educational_content'].append(page['content'])
+                result['crawled_urls'].append(page['url'])
+                result['pages_scraped'] += 1
+                result['total_cost'] += page['cost']
             
-            if main_content['error']:
-                result['error'] = main_content['error']
+            if pages and pages[0]['cached']:
+                self.stats['cache_hits'] += 1
                 return result
             
-            result['pages_scraped'] += 1
+            # Cache successful results
+            with self.metrics.time('cache_set', self._domain(url)):
+                await self.cache.set(url, result, f"educational_{content_type}")
             
-            # Extract educational metadata
-            educational_data = await self._extract_educational_metadata(
-                main_content['content'], content_type
+            # Remember the main page so later re-crawls can skip unchanged content
+            root = pages[0]
+            await self.fingerprints.record(
+                canonicalize_url(url),
+                content_type,
+                root['content'].get('markdown', ''),
+                result,
+                metadata=root['content'].get('metadata'),
+                analysis_cost=root['cost']
             )
             
-            result.update(educational_data)
-            result['educational_content'].append(main_content['content'])
-            
-            # Discover related educational pages if depth > 1
-            if depth > 1 and result['pages_scraped'] < max_pages:
-                related_urls = self._discover_related_educational_urls(
-                    main_content['content'], url
-                )
-                
-                for related_url in related_urls[:max_pages - result['pages_scraped']]:
-                    try:
-                        related_content = await self._scrape_educational_page(
-                            related_url, content_type
-                        )
-                        
-                        if not related_content['error']:
-                            result['educational_content'].append(related_content['content'])
-                            result['pages_scraped'] += 1
-                            
-                    except Exception as e:
-                        logger.warning(f"Failed to scrape related URL {related_url}: {e}")
-            
-            # Cache successful results
-            await self.cache.set(url, result, f"educational_{content_type}")
-            
             # Update statistics
             self.stats['total_scrapes'] += 1
             self.stats['educational_content_found'] += len(result['educational_content'])
@@ -162,6 +300,228 @@ class EducationalScraper:
         
         return result
     
+    async def iter_educational_content(
+        self,
+        url: str,
+        content_type: str = "tutorial",
+        depth: int = 1,
+        max_pages: int = 10,
+        max_concurrency: int = 3,
+        per_domain_limit: int = 2,
+        per_depth_limit: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        cost_budget: Optional[float] = None,
+        batch: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream educational content page by page as it is scraped
+        
+        The main page is yielded first, together with its educational
+        metadata; related pages follow as each one completes. Every page
+        is a dict with 'url', 'index' (breadth-first discovery position,
+        main page 0), 'depth', 'content', 'metadata' (main page only),
+        'cost', 'cached', 'error' and 'duplicate_of'. Related pages that
+        are near-duplicates of a page already yielded carry no content and
+        name that page in 'duplicate_of'. If the main page cannot be
+        scraped a single page with 'error' set is yielded.
+        
+        Results served from the cache are replayed page by page. After the
+        cache expires, a page whose HTTP validators or content fingerprint
+        show it unchanged replays its previous result without re-analysis,
+        and that result's cache lifetime is extended. Otherwise streamed
+        results are not written to the cache; scrape_educational_content
+        caches the assembled result.
+        
+        Args are the same as for scrape_educational_content.
+        """
+        
+        url = resolve_url(url)
+        key = canonicalize_url(url)
+        
+        logger.info(f"🎓 Scraping educational content from {url}")
+        
+        # Apply rate limiting
+        await self._acquire_rate_limit('firecrawl', url)
+        
+        # Check cache first
+        with self.metrics.time('cache_get', self._domain(url)):
+            cached = await self.cache.get(url, f"educational_{content_type}")
+        if cached:
+            logger.info(f"📚 Using cached educational content for {url}")
+            for page in self._replay_cached_pages(cached):
+                yield page
+            return
+        
+        # Revalidate an expired result with a conditional request
+        previous = await self.fingerprints.get(key, content_type)
+        if previous and await self.fingerprints.is_not_modified(url, previous):
+            pages = await self._reuse_previous_result(url, content_type, previous)
+            if pages is not None:
+                logger.info(f"🔁 {url} not modified, reusing previous result")
+                for page in pages:
+                    yield page
+                return
+        
+        # Scrape main page with educational optimization
+        main_content = await self._scrape_educational_page(url, content_type)
+        
+        if main_content['error']:
+            yield self._make_page(url, 0, 1, None, error=main_content['error'])
+            return
+        
+        # Skip analysis and crawling if the page content is unchanged
+        if self.fingerprints.matches(previous, main_content['content'].get('markdown', '')):
+            pages = await self._reuse_previous_result(url, content_type, previous)
+            if pages is not None:
+                logger.info(f"🔁 {url} unchanged since last scrape, reusing previous result")
+                for page in pages:
+                    yield page
+                return
+        
+        # Extract educational metadata
+        educational_data, root_cost = await self._extract_educational_metadata(
+            main_content['content'], content_type, url
+        )
+        
+        yield self._make_page(
+            url, 0, 1, main_content['content'], metadata=educational_data, cost=root_cost
+        )
+        
+        # Crawl related educational pages breadth-first if depth > 1
+        if depth > 1 and max_pages > 1:
+            crawler = EducationalCrawler(
+                self,
+                content_type=content_type,
+                max_depth=depth,
+                max_pages=max_pages - 1,
+                max_concurrency=max_concurrency,
+                per_domain_limit=per_domain_limit,
+                per_depth_limit=per_depth_limit,
+                time_budget=time_budget,
+                cost_budget=cost_budget,
+                batch=batch
+            )
+            
+            # Mirrors and syndicated copies within one crawl are merged away
+            seen_pages = SimHashIndex(self.dedup.max_distance)
+            root_fingerprint = await self._fingerprint_page(main_content['content'])
+            if root_fingerprint is not None:
+                seen_pages.add(url, root_fingerprint)
+            
+            # The budget covers the main page's scrape as well as its analysis
+            async for page in crawler.iter_pages(
+                url, main_content['content'], initial_cost=crawler.cost_per_page + root_cost
+            ):
+                fingerprint = await self._fingerprint_page(page['content'])
+                duplicate_of = seen_pages.find(fingerprint) if fingerprint is not None else None
+                
+                if duplicate_of is not None:
+                    self.dedup.record_merged()
+                    logger.info(f"🪞 {page['url']} is a near-duplicate of {duplicate_of}")
+                    yield self._make_page(
+                        page['url'], page['index'], page['depth'], None,
+                        cost=crawler.cost_per_page, duplicate_of=duplicate_of
+                    )
+                    continue
+                
+                if fingerprint is not None:
+                    seen_pages.add(page['url'], fingerprint)
+                yield self._make_page(
+                    page['url'], page['index'], page['depth'], page['content'],
+                    cost=crawler.cost_per_page
+                )
+    
+    async def _fingerprint_page(self, content: Dict[str, Any]) -> Optional[int]:
+        """SimHash a page's markdown, in a worker process when it is large"""
+        
+        markdown = content.get('markdown', '')
+        return await self.process_pool.run(simhash, markdown, size=len(markdown))
+    
+    async def _reuse_previous_result(
+        self,
+        url: str,
+        content_type: str,
+        previous: Dict[str, Any]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Extend the cache lifetime of an unchanged result and replay it
+        
+        Returns None when the previous result is no longer stored, in
+        which case the page is analyzed again.
+        """
+        
+        key = canonicalize_url(url)
+        result = await self.fingerprints.load_result(key, content_type, previous)
+        if result is None:
+            return None
+        
+        with self.metrics.time('cache_set', self._domain(url)):
+            await self.cache.set(url, result, f"educational_{content_type}")
+        await self.fingerprints.mark_unchanged(key, content_type, previous)
+        
+        return self._replay_cached_pages(result)
+    
+    def _make_page(
+        self,
+        url: str,
+        index: int,
+        depth: Optional[int],
+        content: Optional[Dict],
+        metadata: Optional[Dict] = None,
+        cost: float = 0.0,
+        cached: bool = False,
+        error: Optional[str] = None,
+        duplicate_of: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build one streamed page record"""
+        
+        return {
+            'url': url,
+            'index': index,
+            'depth': depth,
+            'content': content,
+            'metadata': metadata,
+            'cost': cost,
+            'cached': cached,
+            'error': error,
+            'duplicate_of': duplicate_of
+        }
+    
+    def _replay_cached_pages(self, cached: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Split a cached scrape result back into streamed page records"""
+        
+        metadata = {
+            key: value for key, value in cached.items()
+            if key not in AGGREGATE_RESULT_FIELDS
+        }
+        urls = cached.get('crawled_urls') or [cached.get('source_url')]
+        
+        pages = []
+        for index, content in enumerate(cached.get('educational_content', [])):
+            pages.append(self._make_page(
+                urls[index] if index < len(urls) else None,
+                index,
+                None,
+                content,
+                metadata=metadata if index == 0 else None,
+                cost=cached.get('total_cost', 0.0) if index == 0 else 0.0,
+                cached=True
+            ))
+        
+        # Merged near-duplicates follow the pages they duplicate
+        duplicate_of = cached.get('duplicate_of') or {}
+        for duplicate_url in cached.get('duplicate_urls') or []:
+            pages.append(self._make_page(
+                duplicate_url,
+                len(pages),
+                None,
+                None,
+                cached=True,
+                duplicate_of=duplicate_of.get(duplicate_url, urls[0])
+            ))
+        
+        return pages
+    
     async def _scrape_educational_page(
         self, 
         url: str, 
@@ -169,33 +529,41 @@ class EducationalScraper:
     ) -> Dict[str, Any]:
         """Scrape a single page optimized for educational content"""
         
-        # Get optimized parameters for educational content
-        params = self._get_educational_scrape_params(content_type)
+        # Get optimized parameters, waiting as long as this domain needs to render
+        wait_ms, probe = await self.wait_profiles.plan(url, content_type)
+        params = self._get_educational_scrape_params(content_type, wait_ms, probe)
         
         try:
             # Apply rate limiting
-            await self.rate_limiter.acquire('firecrawl')
-            
-            # Scrape with Firecrawl
-            scraped = self.firecrawl.scrape(url, params)
-            
-            if hasattr(scraped, 'markdown') and scraped.markdown:
-                return {
-                    'url': url,
-                    'content': {
-                        'markdown': scraped.markdown,
-                        'title': getattr(scraped, 'title', ''),
-                        'description': getattr(scraped, 'description', ''),
-                        'metadata': getattr(scraped, 'metadata', {})
-                    },
-                    'error': None
-                }
-            else:
-                return {
-                    'url': url,
-                    'content': None,
-                    'error': 'No content extracted'
-                }
+            await self._acquire_rate_limit('firecrawl', url)
+            
+            # Scrape with Firecrawl off the event loop
+            with self.metrics.time('scrape', self._domain(url)):
+                scraped = await self.firecrawl.scrape(url, params)
+            complete = await self.wait_profiles.observe(
+                url, content_type, wait_ms,
+                getattr(scraped, 'markdown', None),
+                getattr(scraped, 'raw_html', None) if probe else None
+            )
+            
+            # A wait that missed content is retried with the lengthened one; the
+            # retry also tells the profile whether waiting longer helped at all
+            if not complete:
+                retry_wait, _ = await self.wait_profiles.plan(url, content_type)
+                if retry_wait > wait_ms:
+                    self.wait_profiles.record_retry()
+                    first_markdown = getattr(scraped, 'markdown', None)
+                    await self._acquire_rate_limit('firecrawl', url)
+                    with self.metrics.time('scrape', self._domain(url)):
+                        scraped = await self.firecrawl.scrape(
+                            url, self._get_educational_scrape_params(content_type, retry_wait)
+                        )
+                    await self.wait_profiles.observe(
+                        url, content_type, retry_wait, getattr(scraped, 'markdown', None),
+                        previous_wait_ms=wait_ms, previous_markdown=first_markdown
+                    )
+            
+            return self._page_result(url, scraped)
                 
         except Exception as e:
             logger.error(f"Scraping error for {url}: {e}")
@@ -205,11 +573,107 @@ class EducationalScraper:
                 'error': str(e)
             }
     
-    def _get_educational_scrape_params(self, content_type: str) -> Dict:
-        """Get optimized scraping parameters for educational content"""
+    async def _scrape_educational_pages(
+        self,
+        urls: List[str],
+        content_type: str,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Scrape several pages as one Firecrawl batch job
+        
+        Yields the same per-page results as _scrape_educational_page, in
+        completion order. The whole batch costs one rate-limiter token and
+        one submission request; pages the batch could not deliver are
+        yielded with an error once the job finishes.
+        """
+        
+        # One job shares one wait, so use the longest any of its domains needs
+        plans = [await self.wait_profiles.plan(url, content_type) for url in urls]
+        wait_ms = max((wait for wait, _ in plans), default=0)
+        probe = any(probe for _, probe in plans)
+        params = self._get_educational_scrape_params(content_type, wait_ms, probe)
+        pending = {canonicalize_url(url): url for url in urls}
+        
+        try:
+            await self._acquire_rate_limit('firecrawl', urls[0] if urls else None)
+            
+            # Time spent waiting on the job for each page, excluding the consumer's work
+            resumed = time.perf_counter()
+            async for scraped in self.firecrawl.batch_scrape(urls, params, timeout=timeout):
+                source_url = document_source_url(scraped)
+                url = pending.pop(canonicalize_url(source_url), None) if source_url else None
+                if url is None:
+                    logger.warning(f"Batch scrape returned unrequested page {source_url}")
+                    continue
+                self.metrics.record('batch_scrape', time.perf_counter() - resumed, self._domain(url))
+                await self.wait_profiles.observe(
+                    url, content_type, wait_ms,
+                    getattr(scraped, 'markdown', None),
+                    getattr(scraped, 'raw_html', None) if probe else None
+                )
+                yield self._page_result(url, scraped)
+                resumed = time.perf_counter()
+            
+            error = 'No content extracted'
+                
+        except Exception as e:
+            logger.error(f"Batch scraping error for {len(urls)} URLs: {e}")
+            error = str(e)
+        
+        for url in pending.values():
+            yield {
+                'url': url,
+                'content': None,
+                'error': error
+            }
+    
+    def _page_result(self, url: str, scraped: Any) -> Dict[str, Any]:
+        """Map a Firecrawl document onto the per-page result shape"""
+        
+        if hasattr(scraped, 'markdown') and scraped.markdown:
+            metadata = getattr(scraped, 'metadata', None) or {}
+            if hasattr(metadata, 'model_dump'):
+                metadata = metadata.model_dump(exclude_none=True)
+            elif not isinstance(metadata, dict):
+                metadata = {}
+            
+            return {
+                'url': url,
+                'content': {
+                    'markdown': scraped.markdown,
+                    'title': getattr(scraped, 'title', '') or metadata.get('title', ''),
+                    'description': (
+                        getattr(scraped, 'description', '') or metadata.get('description', '')
+                    ),
+                    'metadata': metadata
+                },
+                'error': None
+            }
+        
+        return {
+            'url': url,
+            'content': None,
+            'error': 'No content extracted'
+        }
+    
+    def _get_educational_scrape_params(
+        self, 
+        content_type: str,
+        wait_ms: Optional[int] = None,
+        probe: bool = False
+    ) -> Dict:
+        """
+        Get optimized scraping parameters for educational content
+        
+        Args:
+            content_type: Type of content being scraped
+            wait_ms: waitFor in ms; defaults to the content type's fixed wait
+            probe: Also fetch raw HTML so static pages can be detected
+        """
         
         base_params = {
-            'formats': ['markdown'],
+            'formats': ['markdown', 'rawHtml'] if probe else ['markdown'],
             'onlyMainContent': True,
             'removeBase64Images': True
         }
@@ -217,73 +681,143 @@ class EducationalScraper:
         if content_type == "tutorial":
             base_params.update({
                 'includeTags': ['article', 'main', 'section', 'pre', 'code', 'h1', 'h2', 'h3', 'p', 'ol', 'ul'],
-                'excludeTags': ['nav', 'footer', 'aside', 'advertisement'],
-                'waitFor': 1000
+                'excludeTags': ['nav', 'footer', 'aside', 'advertisement']
             })
         elif content_type == "documentation":
             base_params.update({
                 'includeTags': ['article', 'main', 'section', 'pre', 'code', 'table', 'dl'],
-                'excludeTags': ['nav', 'footer', 'script', 'style'],
-                'waitFor': 500
+                'excludeTags': ['nav', 'footer', 'script', 'style']
             })
         elif content_type == "course":
             base_params.update({
                 'includeTags': ['article', 'main', 'section', 'video', 'h1', 'h2', 'h3'],
-                'excludeTags': ['nav', 'footer', 'ads'],
-                'waitFor': 2000
+                'excludeTags': ['nav', 'footer', 'ads']
             })
         
+        if wait_ms is None:
+            wait_ms = default_wait(content_type)
+        if wait_ms:
+            base_params['waitFor'] = wait_ms
+        
         return base_params
     
     async def _extract_educational_metadata(
         self, 
         content: Dict, 
-        content_type: str
-    ) -> Dict[str, Any]:
-        """Extract educational metadata using Claude AI"""
+        content_type: str,
+        url: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], float]:
+        """
+        Extract educational metadata using Claude AI
+        
+        Returns:
+            (analysis, cost of this call); reused and gated analyses cost nothing
+        """
+        
+        raw_content = content.get('markdown', '')
+        
+        # Off-language, thin and off-topic pages are not worth a Claude call
+        if settings.content_gate_enabled:
+            measurement = await self.process_pool.run(
+                measure_page, raw_content, self.gate.keywords, size=len(raw_content)
+            )
+            decision = self.gate.decide(measurement)
+            if not decision.passed:
+                logger.info(f"🚧 Skipping analysis of {url or 'page'}: failed {decision.reason} gate")
+                return self._low_quality_analysis(decision), 0.0
         
-        markdown_content = content.get('markdown', '')
+        # Keep headings, lead sentences, code and lists within the token budget,
+        # fingerprinting the page in the same (possibly out-of-process) step
+        markdown_content, raw_tokens, compressed_tokens, fingerprint = await self.process_pool.run(
+            _prepare_analysis_input, raw_content, settings.analysis_token_budget,
+            size=len(raw_content)
+        )
+        self.stats['analysis_tokens_raw'] += raw_tokens
+        self.stats['analysis_tokens_compressed'] += compressed_tokens
         
-        # Compress content if too long
-        if len(markdown_content) > 8000:
-            markdown_content = markdown_content[:8000] + "\n\n[Content truncated for analysis]"
+        # Reuse the analysis of byte-identical content seen under another URL
+        memo_key = self.memo.make_key(markdown_content, content_type, ANALYSIS_PROMPT_VERSION)
+        memoized = await self.memo.get(memo_key)
+        if memoized is not None:
+            logger.info("♻️ Reusing memoized educational analysis")
+            return dict(memoized), 0.0
+        
+        # Reuse the analysis of a lightly edited copy (syndicated tutorials)
+        index_scope = f"{content_type}:{ANALYSIS_PROMPT_VERSION}"
+        near_duplicate = await self.dedup.find(fingerprint, index_scope)
+        if near_duplicate is not None:
+            logger.info(f"♻️ Reusing analysis of near-duplicate {near_duplicate['url']}")
+            return dict(near_duplicate['analysis']), 0.0
         
         # Create educational analysis prompt
         prompt = self._create_educational_analysis_prompt(markdown_content, content_type)
         
         try:
             # Apply rate limiting for Claude
-            await self.rate_limiter.acquire('anthropic')
+            await self._acquire_rate_limit('anthropic', url)
             
             # Analyze with Claude
-            response = self.anthropic.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.metrics.time('analysis', self._domain(url)):
+                response = await self.anthropic.messages.create(
+                    model="claude-3-5-sonnet-20241022",
+                    max_tokens=1000,
+                    messages=[{"role": "user", "content": prompt}]
+                )
             
             # Parse Claude's structured response
             analysis = self._parse_educational_analysis(response.content[0].text)
             
-            # Calculate cost
-            input_tokens = len(self.tokenizer.encode(prompt))
-            output_tokens = len(self.tokenizer.encode(response.content[0].text))
-            cost = (input_tokens * 0.003 + output_tokens * 0.015) / 1000
-            
+            # Calculate cost from the token counts Claude reports
+            cost = self._calculate_analysis_cost(response.usage)
             self.stats['total_cost'] += cost
+            self.metrics.add_cost('analysis', cost, self._domain(url))
             
-            return analysis
+            await self.memo.set(
+                memo_key, analysis, content_type, ANALYSIS_PROMPT_VERSION, cost
+            )
+            await self.dedup.add(url or memo_key, fingerprint, index_scope, analysis, cost)
+            
+            return analysis, cost
             
         except Exception as e:
             logger.error(f"Educational analysis error: {e}")
-            return {
-                'code_examples': [],
-                'learning_objectives': [],
-                'prerequisites': [],
-                'difficulty_level': 'unknown',
-                'estimated_time': None,
-                'related_topics': []
-            }
+            return self._empty_analysis(), 0.0
+    
+    def _empty_analysis(self) -> Dict[str, Any]:
+        """Analysis fields of a page that could not be analyzed"""
+        
+        return {
+            'code_examples': [],
+            'learning_objectives': [],
+            'prerequisites': [],
+            'difficulty_level': 'unknown',
+            'estimated_time': None,
+            'related_topics': []
+        }
+    
+    def _low_quality_analysis(self, decision: GateDecision) -> Dict[str, Any]:
+        """Analysis fields of a page rejected by the content gate"""
+        
+        return {
+            **self._empty_analysis(),
+            'low_quality': True,
+            'gate_rejection': decision.reason,
+            'language': decision.language
+        }
+    
+    def _calculate_analysis_cost(self, usage: Any) -> float:
+        """Calculate the cost of a Claude call from its reported usage"""
+        
+        if usage is None:
+            return 0.0
+        
+        input_tokens = getattr(usage, 'input_tokens', 0) or 0
+        output_tokens = getattr(usage, 'output_tokens', 0) or 0
+        
+        return (
+            input_tokens * ANTHROPIC_INPUT_COST_PER_1K +
+            output_tokens * ANTHROPIC_OUTPUT_COST_PER_1K
+        ) / 1000
     
     def _create_educational_analysis_prompt(
         self, 
@@ -316,40 +850,43 @@ class EducationalScraper:
     def _parse_educational_analysis(self, analysis_text: str) -> Dict:
         """Parse Claude's educational analysis response"""
         
-        try:
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
-            if json_match:
-                parsed = json.loads(json_match.group())
-                return parsed
-        except Exception as e:
-            logger.warning(f"Failed to parse educational analysis: {e}")
+        # Extract the JSON object from the response
+        parsed = find_json_object(analysis_text)
+        if parsed is not None:
+            return parsed
+        
+        logger.warning("No JSON object in educational analysis, falling back to text parsing")
         
-        # Fallback parsing
+        # Fallback parsing over a single scan of the response
+        scan = scan_markdown(analysis_text)
         return {
-            'learning_objectives': self._extract_list_from_text(analysis_text, 'objectives?'),
-            'prerequisites': self._extract_list_from_text(analysis_text, 'prerequisites?'),
+            'learning_objectives': self._extract_list_from_text(analysis_text, 'objectives?', scan),
+            'prerequisites': self._extract_list_from_text(analysis_text, 'prerequisites?', scan),
             'difficulty_level': self._extract_difficulty(analysis_text),
             'estimated_time': self._extract_time_estimate(analysis_text),
-            'code_examples': self._extract_code_examples(analysis_text),
-            'related_topics': self._extract_list_from_text(analysis_text, 'topics?'),
+            'code_examples': self._extract_code_examples(analysis_text, scan),
+            'related_topics': self._extract_list_from_text(analysis_text, 'topics?', scan),
             'key_concepts': [],
             'target_audience': 'general'
         }
     
-    def _extract_list_from_text(self, text: str, pattern: str) -> List[str]:
-        """Extract list items from text using regex"""
+    def _extract_list_from_text(
+        self, 
+        text: str, 
+        pattern: str, 
+        scan: Optional[MarkdownScan] = None
+    ) -> List[str]:
+        """Extract list items mentioning a pattern or listed under a matching heading"""
         
-        items = []
-        lines = text.split('\n')
+        scan = scan or scan_markdown(text)
+        matcher = re.compile(pattern, re.IGNORECASE)
         
-        for line in lines:
-            if re.search(pattern, line, re.IGNORECASE):
-                # Extract bullet points or numbered items
-                if any(marker in line for marker in ['-', '*', '•']):
-                    item = re.sub(r'^[\s\-\*\•\d\.]+', '', line).strip()
-                    if item:
-                        items.append(item)
+        items = [
+            item.text for item in scan.list_items
+            if item.text and (
+                matcher.search(item.text) or (item.section and matcher.search(item.section))
+            )
+        ]
         
         return items[:5]  # Limit to 5 items
     
@@ -378,15 +915,18 @@ class EducationalScraper:
         
         return None
     
-    def _extract_code_examples(self, text: str) -> List[str]:
+    def _extract_code_examples(
+        self, 
+        text: str, 
+        scan: Optional[MarkdownScan] = None
+    ) -> List[str]:
         """Extract code examples from markdown"""
         
-        code_blocks = re.findall(r'```[\w]*\n(.*?)\n```', text, re.DOTALL)
-        inline_code = re.findall(r'`([^`]+)`', text)
+        scan = scan or scan_markdown(text)
         
         examples = []
-        examples.extend([block.strip() for block in code_blocks if len(block.strip()) > 10])
-        examples.extend([code.strip() for code in inline_code if len(code.strip()) > 5])
+        examples.extend([block.code.strip() for block in scan.code_blocks if len(block.code.strip()) > 10])
+        examples.extend([code.strip() for code in scan.inline_code if len(code.strip()) > 5])
         
         return examples[:10]  # Limit to 10 examples
     
@@ -397,28 +937,43 @@ class EducationalScraper:
     ) -> List[str]:
         """Discover related educational URLs from content"""
         
+        with self.metrics.time('link_discovery', self._domain(base_url)):
+            return self._find_related_educational_urls(content, base_url)
+    
+    def _find_related_educational_urls(
+        self, 
+        content: Dict, 
+        base_url: str
+    ) -> List[str]:
+        """Pick links to educational pages out of a page's markdown"""
+        
         markdown = content.get('markdown', '')
-        base_domain = urlparse(base_url).netloc
         
-        # Extract all URLs from markdown
-        url_pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-        links = re.findall(url_pattern, markdown)
+        # Relative links resolve against the page's final URL after redirects
+        metadata = content.get('metadata') or {}
+        page_url = metadata.get('url') if isinstance(metadata.get('url'), str) else base_url
+        base_domain = urlparse(canonicalize_url(page_url)).netloc
         
         educational_urls = []
+        seen = {canonicalize_url(page_url), canonicalize_url(base_url)}
         
-        for link_text, url in links:
+        # Extract all links from markdown
+        for link in scan_markdown(markdown).links:
+            link_text = link.text
+            # Resolve relative links, then collapse fragment/tracking variants
+            url = resolve_url(link.url, page_url)
+            key = canonicalize_url(url)
+            if not is_http_url(url) or key in seen:
+                continue
+            
             # Skip external links unless from known educational domains
-            if url.startswith('http') and base_domain not in url:
-                if not any(domain in url for domain in self.educational_patterns['educational_sites']):
+            if base_domain not in urlparse(key).netloc:
+                if not self.keyword_matcher.find(url, ('educational_sites',)):
                     continue
             
-            # Convert relative URLs to absolute
-            if not url.startswith('http'):
-                url = urljoin(base_url, url)
-            
             # Check if link text suggests educational content
-            link_text_lower = link_text.lower()
-            if any(indicator in link_text_lower for indicator in self.educational_patterns['tutorial_indicators']):
+            if self.keyword_matcher.find(link_text, ('tutorial_indicators',)):
+                seen.add(key)
                 educational_urls.append(url)
         
         return educational_urls[:5]  # Limit to 5 related URLs
@@ -427,7 +982,8 @@ class EducationalScraper:
         self, 
         topic: str,
         content_types: List[str] = ["tutorial", "documentation"],
-        max_results: int = 10
+        max_results: int = 10,
+        providers: Sequence[str] = SEARCH_PROVIDERS
     ) -> List[Dict[str, Any]]:
         """
         Search for educational content on a specific topic
@@ -436,6 +992,7 @@ class EducationalScraper:
             topic: Topic to search for
             content_types: Types of content to find
             max_results: Maximum number of results
+            providers: Search providers to query (tavily, exa, firecrawl)
         
         Returns:
             List of educational content results
@@ -445,36 +1002,48 @@ class EducationalScraper:
         
         results = []
         
-        # Use existing data collector for web search
-        from src.tools.data_collector import DataCollector
-        
-        collector = DataCollector()
-        
         try:
             # Search with educational focus
+            collector = self._get_search_collector()
             search_query = f"{topic} tutorial programming education learn"
-            search_results = await collector.collect_web_data(search_query, max_results)
-            
-            # Process and filter results for educational content
-            for source_type, data in search_results.items():
-                if source_type == 'tavily_data':
-                    for item in data[:max_results]:
-                        # Score educational relevance
-                        relevance_score = self._calculate_educational_relevance(item)
-                        
-                        if relevance_score > 0.5:  # Filter by relevance threshold
-                            educational_result = {
-                                'title': item.get('title', ''),
-                                'url': item.get('url', ''),
-                                'description': item.get('content', '')[:200],
-                                'source': 'tavily',
-                                'relevance_score': relevance_score,
-                                'estimated_type': self._estimate_content_type(item)
-                            }
-                            results.append(educational_result)
+            search_results = await collector.collect_web_data(search_query, max_results, providers)
+            items = collector.unified_content_extraction(search_results)
+            
+            # Score every provider's results for educational relevance in one batch
+            best = {}
+            for item, scores in zip(items, self.score_educational_items(items)):
+                if scores['relevance_score'] <= 0.5 or not item.get('url'):  # Filter by relevance threshold
+                    continue
+                
+                content = item.get('content') or ''
+                educational_result = {
+                    'title': item.get('title', ''),
+                    'url': item['url'],
+                    'description': content[:200],
+                    'source': item['source'],
+                    'sources': [item['source']],
+                    'relevance_score': scores['relevance_score'],
+                    'estimated_type': scores['estimated_type']
+                }
+                
+                # Providers often return the same page; keep its best-scored entry
+                url = canonicalize_url(item['url'])
+                previous = best.get(url)
+                if previous is not None:
+                    sources = previous[0]['sources']
+                    if item['source'] not in sources:
+                        sources.append(item['source'])
+                    if educational_result['relevance_score'] <= previous[0]['relevance_score']:
+                        continue
+                    educational_result['sources'] = sources
+                
+                best[url] = (educational_result, simhash(content))
             
             # Sort by relevance score
-            results.sort(key=lambda x: x['relevance_score'], reverse=True)
+            scored = sorted(best.values(), key=lambda x: x[0]['relevance_score'], reverse=True)
+            
+            # Fold syndicated copies into their best-ranked version
+            results = self._merge_near_duplicate_results(scored)
             
             logger.info(f"✅ Found {len(results)} educational resources for {topic}")
             
@@ -483,60 +1052,176 @@ class EducationalScraper:
         
         return results[:max_results]
     
-    def _calculate_educational_relevance(self, item: Dict) -> float:
+    def _get_search_collector(self):
+        """Get the shared search client, created on first use"""
+        
+        # Imported here as the collector itself depends on src.scraping
+        from src.tools.data_collector import get_data_collector
+        
+        if self.search_collector is None:
+            self.search_collector = get_data_collector()
+        return self.search_collector
+    
+    def _merge_near_duplicate_results(self, scored: List[tuple]) -> List[Dict[str, Any]]:
+        """Drop near-duplicate search results, listing them as mirrors of the kept one"""
+        
+        kept = []
+        index = SimHashIndex(self.dedup.max_distance)
+        
+        for result, fingerprint in scored:
+            duplicate_of = index.find(fingerprint) if fingerprint is not None else None
+            
+            if duplicate_of is not None:
+                kept[duplicate_of]['mirrors'].append(result['url'])
+                self.dedup.record_merged()
+                continue
+            
+            result['mirrors'] = []
+            if fingerprint is not None:
+                index.add(len(kept), fingerprint)
+            kept.append(result)
+        
+        return kept
+    
+    def score_educational_items(self, items: List[Dict]) -> List[Dict[str, Any]]:
+        """
+        Score a batch of search results for educational relevance
+        
+        Each item's text is scanned once and the keyword hits are shared
+        by relevance scoring and content type estimation.
+        
+        Returns:
+            One {'relevance_score', 'estimated_type'} dict per item, in order
+        """
+        
+        text_hits = self.keyword_matcher.match_batch(
+            (f"{item.get('title', '')} {item.get('content', '')}" for item in items),
+            ITEM_KEYWORD_GROUPS
+        )
+        url_hits = self.keyword_matcher.match_batch(
+            (item.get('url', '') for item in items),
+            ('educational_sites',)
+        )
+        
+        scores = []
+        
+        for item, hits, site_hits in zip(items, text_hits, url_hits):
+            hits.update(site_hits)
+            scores.append({
+                'relevance_score': self._calculate_educational_relevance(item, hits),
+                'estimated_type': self._estimate_content_type(item, hits)
+            })
+        
+        return scores
+    
+    def _match_item_keywords(self, item: Dict) -> Dict[str, set]:
+        """Match keywords in an item's title/content, and known domains in its URL"""
+        
+        hits = self.keyword_matcher.match(
+            f"{item.get('title', '')} {item.get('content', '')}",
+            ITEM_KEYWORD_GROUPS
+        )
+        hits.update(self.keyword_matcher.match(item.get('url', ''), ('educational_sites',)))
+        
+        return hits
+    
+    def _calculate_educational_relevance(
+        self, 
+        item: Dict, 
+        hits: Optional[Dict[str, set]] = None
+    ) -> float:
         """Calculate how relevant content is for education"""
         
+        if hits is None:
+            hits = self._match_item_keywords(item)
+        
         score = 0.0
-        text = f"{item.get('title', '')} {item.get('content', '')}".lower()
         
         # Check for educational indicators
-        for indicator in self.educational_patterns['tutorial_indicators']:
-            if indicator in text:
-                score += 0.1
+        score += 0.1 * len(hits['tutorial_indicators'])
         
         # Check for code-related content
-        if any(term in text for term in ['code', 'programming', 'python', 'javascript', 'tutorial']):
+        if hits['code_terms']:
             score += 0.2
         
         # Check for educational domains
-        url = item.get('url', '')
-        for domain in self.educational_patterns['educational_sites']:
-            if domain in url:
-                score += 0.3
-                break
+        if hits['educational_sites']:
+            score += 0.3
         
         # Check for learning-related keywords
-        learning_keywords = ['learn', 'course', 'lesson', 'guide', 'example', 'practice']
-        for keyword in learning_keywords:
-            if keyword in text:
-                score += 0.05
+        score += 0.05 * len(hits['learning_keywords'])
         
         return min(score, 1.0)  # Cap at 1.0
     
-    def _estimate_content_type(self, item: Dict) -> str:
+    def _estimate_content_type(
+        self, 
+        item: Dict, 
+        hits: Optional[Dict[str, set]] = None
+    ) -> str:
         """Estimate the type of educational content"""
         
-        text = f"{item.get('title', '')} {item.get('content', '')}".lower()
+        if hits is None:
+            hits = self._match_item_keywords(item)
         
-        if any(term in text for term in ['course', 'class', 'curriculum']):
+        if hits['course_terms']:
             return 'course'
-        elif any(term in text for term in ['docs', 'documentation', 'reference', 'api']):
+        elif hits['documentation_terms']:
             return 'documentation'
-        elif any(term in text for term in ['tutorial', 'guide', 'how-to', 'walkthrough']):
+        elif hits['tutorial_terms']:
             return 'tutorial'
-        elif any(term in text for term in ['example', 'demo', 'sample']):
+        elif hits['example_terms']:
             return 'example'
         else:
             return 'general'
     
+    async def _acquire_rate_limit(self, api: str, url: Optional[str] = None):
+        """Wait for a rate-limiter token, timing the wait"""
+        
+        with self.metrics.time('rate_limit_wait', self._domain(url)):
+            await self.rate_limiter.acquire(api)
+    
+    @staticmethod
+    def _domain(url: Optional[str]) -> Optional[str]:
+        """Domain that per-domain metrics of a URL are kept under"""
+        
+        return urlparse(url).netloc.lower() if url else None
+    
+    async def close(self):
+        """Persist queued cache writes; call before shutting down"""
+        
+        await self.cache.close()
+    
+    def export_metrics(self) -> str:
+        """Export per-stage latency and cost in Prometheus text format"""
+        
+        return self.metrics.to_prometheus()
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get scraper statistics"""
         
         cache_stats = self.cache.get_stats()
         rate_stats = self.rate_limiter.get_stats()
         
+        compression_ratio = (
+            self.stats['analysis_tokens_compressed'] / self.stats['analysis_tokens_raw']
+            if self.stats['analysis_tokens_raw'] else 1.0
+        )
+        
         return {
-            'scraper_stats': self.stats,
+            'scraper_stats': {
+                **self.stats,
+                'compression_ratio': round(compression_ratio, 3)
+            },
             'cache_stats': cache_stats,
-            'rate_limiter_stats': rate_stats
+            'rate_limiter_stats': rate_stats,
+            'transport_stats': self.firecrawl.get_stats(),
+            'memo_stats': self.memo.get_stats(),
+            'fingerprint_stats': self.fingerprints.get_stats(),
+            'single_flight_stats': self.single_flight.get_stats(),
+            'dedup_stats': self.dedup.get_stats(),
+            'wait_profile_stats': self.wait_profiles.get_stats(),
+            'gate_stats': self.gate.get_stats(),
+            'stage_metrics': self.metrics.get_stats(),
+            'process_pool_stats': self.process_pool.get_stats(),
+            'search_stats': self.search_collector.get_stats() if self.search_collector else {}
         }
\ No newline at end of file
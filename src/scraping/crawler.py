@@ -0,0 +1,329 @@
+"""
+Breadth-first crawl frontier for multi-level educational scraping
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Any
+from urllib.parse import urlparse
+
+from src.scraping.urls import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Estimated Firecrawl spend per scraped page in USD
+FIRECRAWL_COST_PER_PAGE = 0.001
+
+class EducationalCrawler:
+    """
+    Breadth-first crawler driven by the scraper's link discovery
+
+    Pages are expanded level by level from a FIFO frontier. A visited set
+    of canonical URLs prevents re-scraping variants of a page, each level can be capped, and per-domain
+    semaphores keep a single site from absorbing the whole fan-out. The
+    crawl stops when it reaches ``max_pages`` or exhausts its time or
+    cost budget.
+
+    With ``batch`` enabled each level is submitted as a single Firecrawl
+    batch job instead of one request per page. Firecrawl then schedules
+    the pages itself, so the per-domain limit does not apply.
+    """
+
+    def __init__(
+        self,
+        scraper,
+        content_type: str = "tutorial",
+        max_depth: int = 2,
+        max_pages: int = 10,
+        max_concurrency: int = 3,
+        per_domain_limit: int = 2,
+        per_depth_limit: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        cost_budget: Optional[float] = None,
+        cost_per_page: float = FIRECRAWL_COST_PER_PAGE,
+        batch: bool = False
+    ):
+        self.scraper = scraper
+        self.content_type = content_type
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_domain_limit = max(1, per_domain_limit)
+        self.per_depth_limit = per_depth_limit
+        self.time_budget = time_budget
+        self.cost_budget = cost_budget
+        self.cost_per_page = cost_per_page
+        self.batch = batch
+
+        self.visited = set()
+        self._domain_semaphores = {}
+        self._started_at = None
+
+        self.stats = {
+            'pages_scraped': 0,
+            'pages_failed': 0,
+            'pages_skipped': 0,
+            'max_depth_reached': 1,
+            'cost_spent': 0.0,
+            'stop_reason': None
+        }
+
+    async def crawl(
+        self,
+        root_url: str,
+        root_content: Dict[str, Any],
+        initial_cost: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Crawl outward from an already scraped root page
+
+        Args:
+            root_url: URL of the root page (depth 1)
+            root_content: Scraped content of the root page
+            initial_cost: Spend already incurred, counted against cost_budget
+
+        Returns:
+            Successfully scraped pages in breadth-first discovery order
+        """
+
+        pages = [
+            page async for page in self.iter_pages(root_url, root_content, initial_cost)
+        ]
+        pages.sort(key=lambda page: page['index'])
+        return pages
+
+    async def iter_pages(
+        self,
+        root_url: str,
+        root_content: Dict[str, Any],
+        initial_cost: float = 0.0
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Crawl outward from a root page, yielding each page as it completes
+
+        Levels are still expanded strictly breadth-first, but pages within
+        a level are yielded in completion order. Each page carries an
+        ``index`` giving its breadth-first discovery position (the root
+        is 0) so callers can restore a deterministic order.
+        """
+
+        self._started_at = time.monotonic()
+        self.stats['cost_spent'] = initial_cost
+        self.visited.add(canonicalize_url(root_url))
+
+        next_index = 1
+        frontier = deque(
+            (url, 2) for url in self._discover(root_content, root_url)
+        )
+
+        while frontier:
+            current_depth = frontier[0][1]
+            if current_depth > self.max_depth:
+                break
+
+            # Pop one full level so it can be fetched concurrently
+            level_urls = []
+            while frontier and frontier[0][1] == current_depth:
+                url, _ = frontier.popleft()
+                key = canonicalize_url(url)
+                if key in self.visited:
+                    continue
+                self.visited.add(key)
+                level_urls.append(url)
+
+            if self.per_depth_limit is not None:
+                level_urls = level_urls[:self.per_depth_limit]
+
+            remaining = self.max_pages - self.stats['pages_scraped']
+            if remaining <= 0:
+                self.stats['stop_reason'] = 'max_pages'
+                break
+            level_urls = level_urls[:remaining]
+
+            if self.batch and len(level_urls) > 1:
+                level = self._fetch_level_batch(level_urls, current_depth, next_index)
+            else:
+                level = self._fetch_level(level_urls, current_depth, next_index)
+            next_index += len(level_urls)
+
+            level_pages = []
+            try:
+                async for page in level:
+                    level_pages.append(page)
+                    yield page
+            finally:
+                await level.aclose()
+
+            if level_pages:
+                self.stats['max_depth_reached'] = max(
+                    self.stats['max_depth_reached'], current_depth
+                )
+
+            # Expand the next level in discovery order, independent of timing
+            if current_depth < self.max_depth:
+                for page in sorted(level_pages, key=lambda page: page['index']):
+                    for url in self._discover(page['content'], page['url']):
+                        if canonicalize_url(url) not in self.visited:
+                            frontier.append((url, current_depth + 1))
+
+            if self.stats['stop_reason']:
+                break
+
+        if self.stats['stop_reason'] is None:
+            self.stats['stop_reason'] = 'exhausted'
+
+        logger.info(
+            f"🕸️ Crawl of {root_url} finished: {self.stats['pages_scraped']} pages, "
+            f"depth {self.stats['max_depth_reached']}, stop: {self.stats['stop_reason']}"
+        )
+
+    async def _fetch_level(
+        self,
+        urls: List[str],
+        depth: int,
+        first_index: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Scrape a level page by page, yielding pages as they complete"""
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [
+            asyncio.ensure_future(
+                self._fetch_page(url, depth, first_index + position, semaphore)
+            )
+            for position, url in enumerate(urls)
+        ]
+
+        try:
+            for completed in asyncio.as_completed(tasks):
+                page = await completed
+                if page is not None:
+                    yield page
+        finally:
+            # The consumer may stop early; don't leave scrapes running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _fetch_level_batch(
+        self,
+        urls: List[str],
+        depth: int,
+        first_index: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Scrape a level as one batch job, yielding pages as they complete"""
+
+        stop_reason = self._budget_exhausted()
+        if stop_reason:
+            self.stats['stop_reason'] = stop_reason
+            self.stats['pages_skipped'] += len(urls)
+            return
+
+        # The whole batch is paid up front, so trim it to what the budget allows
+        if self.cost_budget is not None:
+            affordable = math.floor(
+                (self.cost_budget - self.stats['cost_spent']) / self.cost_per_page + 1e-9
+            )
+            if affordable < len(urls):
+                self.stats['stop_reason'] = 'cost_budget'
+                self.stats['pages_skipped'] += len(urls) - affordable
+                urls = urls[:affordable]
+
+        timeout = None
+        if self.time_budget is not None:
+            timeout = max(0.0, self.time_budget - (time.monotonic() - self._started_at))
+
+        self.stats['cost_spent'] += self.cost_per_page * len(urls)
+        indexes = {url: first_index + position for position, url in enumerate(urls)}
+
+        scraped_pages = self.scraper._scrape_educational_pages(urls, self.content_type, timeout=timeout)
+        try:
+            async for scraped in scraped_pages:
+                if scraped['error']:
+                    self.stats['pages_failed'] += 1
+                    continue
+
+                self.stats['pages_scraped'] += 1
+                yield {**scraped, 'depth': depth, 'index': indexes[scraped['url']]}
+        finally:
+            await scraped_pages.aclose()
+
+    async def _fetch_page(
+        self,
+        url: str,
+        depth: int,
+        index: int,
+        semaphore: asyncio.Semaphore
+    ) -> Optional[Dict[str, Any]]:
+        """Scrape one page within the crawl's concurrency and budget limits"""
+
+        async with self._domain_semaphore(url):
+            async with semaphore:
+                stop_reason = self._budget_exhausted()
+                if stop_reason:
+                    self.stats['stop_reason'] = stop_reason
+                    self.stats['pages_skipped'] += 1
+                    return None
+
+                # Reserve the page's cost before awaiting the scrape
+                self.stats['cost_spent'] += self.cost_per_page
+
+                try:
+                    scraped = await self.scraper._scrape_educational_page(
+                        url, self.content_type
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to scrape related URL {url}: {e}")
+                    scraped = {'url': url, 'content': None, 'error': str(e)}
+
+        if scraped['error']:
+            self.stats['pages_failed'] += 1
+            return None
+
+        self.stats['pages_scraped'] += 1
+        return {**scraped, 'depth': depth, 'index': index}
+
+    def _discover(self, content: Dict[str, Any], base_url: str) -> List[str]:
+        """Discover candidate URLs on a page"""
+
+        if not content:
+            return []
+        return self.scraper._discover_related_educational_urls(content, base_url)
+
+    def _domain_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Get the concurrency cap for a URL's domain"""
+
+        domain = urlparse(url).netloc
+        if domain not in self._domain_semaphores:
+            self._domain_semaphores[domain] = asyncio.Semaphore(self.per_domain_limit)
+        return self._domain_semaphores[domain]
+
+    def _budget_exhausted(self) -> Optional[str]:
+        """Return the reason the crawl must stop, if any"""
+
+        if self.stats['pages_scraped'] >= self.max_pages:
+            return 'max_pages'
+
+        if self.time_budget is not None:
+            if time.monotonic() - self._started_at >= self.time_budget:
+                return 'time_budget'
+
+        if self.cost_budget is not None:
+            if self.stats['cost_spent'] + self.cost_per_page > self.cost_budget:
+                return 'cost_budget'
+
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get crawl statistics"""
+
+        return {
+            **self.stats,
+            'urls_visited': len(self.visited),
+            'elapsed_seconds': (
+                round(time.monotonic() - self._started_at, 3)
+                if self._started_at else 0.0
+            )
+        }
@@ -0,0 +1,299 @@
+"""
+Near-duplicate page detection with SimHash and banded LSH
+"""
+
+import hashlib
+import json
+import logging
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Any
+
+from config.settings import settings
+from src.scraping.lru import BoundedLRUCache
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+
+# Words per shingle; short enough to survive small edits between copies
+SHINGLE_SIZE = 3
+
+# Default near-duplicate threshold in differing bits
+MAX_DISTANCE = 7
+
+# Fewest LSH bands a fingerprint is split into (at most 16 bits each)
+MIN_BANDS = 4
+
+WORD_PATTERN = re.compile(r'\w+')
+
+def simhash(text: str) -> Optional[int]:
+    """
+    Compute a 64-bit SimHash of a text's word shingles
+
+    Returns:
+        The fingerprint, or None if the text has no words
+    """
+
+    words = WORD_PATTERN.findall((text or '').lower())
+    if not words:
+        return None
+
+    shingles = {
+        ' '.join(words[i:i + SHINGLE_SIZE])
+        for i in range(max(1, len(words) - SHINGLE_SIZE + 1))
+    }
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'
+        )
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+
+    return bin(a ^ b).count("1")
+
+def band_count(max_distance: int) -> int:
+    """
+    Number of LSH bands needed for a distance threshold
+
+    Splitting a fingerprint into max_distance + 1 bands guarantees that two
+    fingerprints within max_distance bits agree on at least one band.
+    """
+
+    return max(MIN_BANDS, max_distance + 1)
+
+def lsh_bands(fingerprint: int, bands: int) -> List[int]:
+    """
+    Split a fingerprint into LSH band values
+
+    Each value is tagged with its band number in the upper bits so bands
+    of all positions can share one bucket space.
+    """
+
+    values = []
+    start = 0
+    for band in range(bands):
+        # Spread the bits as evenly as possible; earlier bands take the remainder
+        width = SIMHASH_BITS // bands + (1 if band < SIMHASH_BITS % bands else 0)
+        value = (fingerprint >> start) & ((1 << width) - 1)
+        values.append(band << 16 | value)
+        start += width
+    return values
+
+class SimHashIndex:
+    """
+    In-memory LSH index over SimHash fingerprints
+
+    Fingerprints are bucketed by each of their bands, so a lookup only
+    compares against entries sharing at least one band instead of the
+    whole index.
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.bands = band_count(max_distance)
+        self.fingerprints: Dict[Hashable, int] = {}
+        self._buckets = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def add(self, key: Hashable, fingerprint: int) -> None:
+        """Index a fingerprint under a key"""
+
+        self.remove(key)
+        self.fingerprints[key] = fingerprint
+        for value in lsh_bands(fingerprint, self.bands):
+            self._buckets[value].add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """Drop a key from the index, if present"""
+
+        fingerprint = self.fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+
+        for value in lsh_bands(fingerprint, self.bands):
+            bucket = self._buckets.get(value)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[value]
+
+    def find(self, fingerprint: int) -> Optional[Hashable]:
+        """Return the key of the closest near-duplicate, if any"""
+
+        candidates = set()
+        for value in lsh_bands(fingerprint, self.bands):
+            candidates.update(self._buckets.get(value, ()))
+
+        best_key, best_distance = None, self.max_distance + 1
+        for key in candidates:
+            distance = hamming_distance(fingerprint, self.fingerprints[key])
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+
+        return best_key
+
+class NearDuplicateDetector:
+    """
+    Persistent index of analyzed pages for near-duplicate reuse
+
+    Syndicated tutorials reappear on Medium, dev.to and personal blogs
+    with small edits, which defeats exact content hashing. Each analyzed
+    page is indexed by the SimHash of its markdown so a lightly edited
+    copy can reuse the original analysis instead of a new Claude call.
+
+    The memory tier is a bounded LRU of entries; an entry leaving it is
+    dropped from the LSH index too.
+
+    Priority: memory → database
+    """
+
+    def __init__(self, db_manager=None, max_distance: int = MAX_DISTANCE):
+        self.db = db_manager
+        self.max_distance = max_distance
+        self.bands = band_count(max_distance)
+        self.indexes = defaultdict(lambda: SimHashIndex(self.max_distance))
+        self.entries = BoundedLRUCache(
+            max_entries=settings.near_duplicate_memory_max_entries,
+            max_bytes=settings.near_duplicate_memory_max_bytes,
+            ttl=settings.near_duplicate_memory_ttl_seconds,
+            on_remove=self._forget
+        )
+
+        self.stats = {
+            "duplicates_avoided": 0,
+            "pages_merged": 0,
+            "estimated_savings": 0.0
+        }
+
+    async def find(self, fingerprint: Optional[int], content_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Find an analyzed page that is a near-duplicate of a fingerprint
+
+        Returns:
+            The original page's entry (url, analysis, cost), or None
+        """
+
+        if fingerprint is None:
+            return None
+
+        # 1. Check memory index (an expired entry leaves the index on lookup)
+        key = self.indexes[content_type].find(fingerprint)
+        if key is not None:
+            entry = self.entries.get(key)
+            if entry is not None:
+                return self._avoided(entry)
+
+        # 2. Check database index
+        if self.db:
+            try:
+                # Distances are filtered in the database; only the best match comes back
+                row = await self.db.find_near_duplicate(
+                    content_type, _to_signed(fingerprint),
+                    lsh_bands(fingerprint, self.bands), self.max_distance
+                )
+                if row:
+                    entry = self._remember(
+                        row["url"], _to_unsigned(row["simhash"]), content_type,
+                        row["analysis"], row["cost"]
+                    )
+                    return self._avoided(entry)
+            except Exception as e:
+                logger.warning(f"Database near-duplicate lookup error: {e}")
+
+        return None
+
+    async def add(
+        self,
+        key: str,
+        fingerprint: Optional[int],
+        content_type: str,
+        analysis: Dict[str, Any],
+        cost: float = 0.0
+    ) -> None:
+        """Index an analyzed page"""
+
+        if fingerprint is None:
+            return
+
+        self._remember(key, fingerprint, content_type, analysis, cost)
+
+        if self.db:
+            try:
+                await self.db.add_near_duplicate(
+                    url=key,
+                    content_type=content_type,
+                    simhash=_to_signed(fingerprint),
+                    bands=lsh_bands(fingerprint, self.bands),
+                    analysis=analysis,
+                    cost=cost
+                )
+            except Exception as e:
+                logger.warning(f"Database near-duplicate save error: {e}")
+
+    def record_merged(self, count: int = 1) -> None:
+        """Count pages dropped as near-duplicates of pages already kept"""
+
+        self.stats["pages_merged"] += count
+
+    def _remember(
+        self,
+        key: str,
+        fingerprint: int,
+        content_type: str,
+        analysis: Dict[str, Any],
+        cost: float
+    ) -> Dict[str, Any]:
+        """Add an entry to the memory index"""
+
+        entry = {"url": key, "analysis": analysis, "cost": cost or 0.0}
+        size = len(json.dumps(analysis, default=str))
+        if self.entries.put((content_type, key), entry, size):
+            self.indexes[content_type].add((content_type, key), fingerprint)
+        return entry
+
+    def _forget(self, key: tuple, entry: Dict[str, Any]) -> None:
+        """Drop an entry leaving the memory tier from its LSH index"""
+
+        self.indexes[key[0]].remove(key)
+
+    def _avoided(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Record an analysis skipped thanks to a near-duplicate"""
+
+        self.stats["duplicates_avoided"] += 1
+        self.stats["estimated_savings"] += entry["cost"]
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get near-duplicate statistics"""
+
+        return {
+            "duplicates_avoided": self.stats["duplicates_avoided"],
+            "pages_merged": self.stats["pages_merged"],
+            "indexed_pages": len(self.entries),
+            "memory_evictions": self.entries.stats["evictions"],
+            "estimated_savings": f"${self.stats['estimated_savings']:.4f}"
+        }
+
+def _to_signed(fingerprint: int) -> int:
+    """Map an unsigned 64-bit fingerprint onto Postgres BIGINT"""
+
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+def _to_unsigned(value: int) -> int:
+    """Map a stored BIGINT back onto an unsigned fingerprint"""
+
+    return value & ((1 << SIMHASH_BITS) - 1)
@@ -0,0 +1,279 @@
+"""
+Content fingerprints and HTTP validators for incremental re-crawls
+"""
+
+import asyncio
+import hashlib
+import ipaddress
+import logging
+import re
+import socket
+import urllib.error
+import urllib.request
+from typing import Dict, Optional, Any
+from urllib.parse import urlsplit
+
+from config.settings import settings
+from src.scraping.lru import BoundedLRUCache
+from src.scraping.urls import is_http_url
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a conditional HEAD request
+REVALIDATION_TIMEOUT = 10
+
+class FingerprintStore:
+    """
+    Remembers what each scraped page looked like last time
+
+    For every URL and content type the store keeps a fingerprint of the
+    page's normalized markdown, the ETag and Last-Modified validators when
+    the page exposed them, and the assembled scrape result. When a cache
+    entry expires the page can then be revalidated: a conditional request
+    or an unchanged fingerprint means the previous result (and its Claude
+    analysis) is still current, so only its cache lifetime is extended.
+
+    The memory tier is a bounded LRU of fingerprints and validators only;
+    results live in the database and are loaded when one is reused.
+
+    Priority: memory → database
+    """
+
+    def __init__(self, db_manager=None):
+        self.db = db_manager
+        self.memory_fingerprints = BoundedLRUCache(
+            max_entries=settings.fingerprint_memory_max_entries,
+            max_bytes=settings.fingerprint_memory_max_bytes,
+            ttl=settings.fingerprint_memory_ttl_seconds
+        )
+
+        self.stats = {
+            "revalidations": 0,
+            "not_modified": 0,
+            "unchanged": 0,
+            "changed": 0,
+            "estimated_savings": 0.0
+        }
+
+    @staticmethod
+    def make_fingerprint(markdown: str) -> str:
+        """Hash page markdown, ignoring whitespace-only differences"""
+
+        normalized = re.sub(r'\s+', ' ', markdown or '').strip()
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def extract_validators(metadata: Optional[Dict]) -> Dict[str, Optional[str]]:
+        """Pick ETag and Last-Modified out of scraped page metadata"""
+
+        headers = {str(key).lower().replace('_', '-'): value for key, value in (metadata or {}).items()}
+        return {
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified")
+        }
+
+    async def get(self, url: str, content_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the last recorded fingerprint of a page
+
+        Records read from the database carry their result; records from
+        memory do not, see load_result.
+        """
+
+        key = (url, content_type)
+        record = self.memory_fingerprints.get(key)
+
+        if record is None and self.db:
+            try:
+                record = await self.db.get_page_fingerprint(url, content_type)
+                if record:
+                    self._remember(key, record)
+            except Exception as e:
+                logger.warning(f"Database fingerprint get error: {e}")
+
+        return record
+
+    async def load_result(
+        self,
+        url: str,
+        content_type: str,
+        record: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Get the scrape result a fingerprint was recorded with, if still stored"""
+
+        if record.get("result") is not None:
+            return record["result"]
+
+        if self.db:
+            try:
+                stored = await self.db.get_page_fingerprint(url, content_type)
+                if stored and stored["fingerprint"] == record["fingerprint"]:
+                    return stored["result"]
+            except Exception as e:
+                logger.warning(f"Database fingerprint result error: {e}")
+
+        return None
+
+    def _remember(self, key: tuple, record: Dict[str, Any]) -> None:
+        """Keep a record in the memory tier without its result"""
+
+        light = {field: value for field, value in record.items() if field != "result"}
+        size = sum(len(str(value)) for value in light.values())
+        self.memory_fingerprints.put(key, light, size)
+
+    async def record(
+        self,
+        url: str,
+        content_type: str,
+        markdown: str,
+        result: Dict[str, Any],
+        metadata: Optional[Dict] = None,
+        analysis_cost: float = 0.0
+    ) -> None:
+        """Store the fingerprint, validators and result of a fresh scrape"""
+
+        record = {
+            "fingerprint": self.make_fingerprint(markdown),
+            **self.extract_validators(metadata),
+            "analysis_cost": analysis_cost
+        }
+
+        self._remember((url, content_type), record)
+
+        if self.db:
+            try:
+                await self.db.set_page_fingerprint(
+                    url=url,
+                    content_type=content_type,
+                    fingerprint=record["fingerprint"],
+                    result=result,
+                    etag=record["etag"],
+                    last_modified=record["last_modified"],
+                    analysis_cost=analysis_cost
+                )
+                await self.db.mark_lead_scraped(url)
+            except Exception as e:
+                logger.warning(f"Database fingerprint save error: {e}")
+
+    async def is_not_modified(self, url: str, record: Dict[str, Any]) -> bool:
+        """
+        Ask the origin whether a page changed since it was recorded
+
+        Sends a conditional HEAD request with the recorded validators.
+        Only http(s) URLs on public addresses are contacted and redirects
+        are not followed. Returns False when there are no validators or
+        the check fails, so the caller falls back to scraping and
+        comparing fingerprints.
+        """
+
+        if not (record.get("etag") or record.get("last_modified")):
+            return False
+
+        loop = asyncio.get_running_loop()
+        try:
+            not_modified = await loop.run_in_executor(
+                None, _conditional_head, url, record.get("etag"), record.get("last_modified")
+            )
+        except Exception as e:
+            logger.debug(f"Conditional request failed for {url}: {e}")
+            return False
+
+        if not_modified:
+            self.stats["not_modified"] += 1
+        return not_modified
+
+    def matches(self, record: Optional[Dict[str, Any]], markdown: str) -> bool:
+        """Check a freshly scraped page against its recorded fingerprint"""
+
+        if not record:
+            return False
+
+        self.stats["revalidations"] += 1
+        if record["fingerprint"] == self.make_fingerprint(markdown):
+            self.stats["unchanged"] += 1
+            return True
+
+        self.stats["changed"] += 1
+        return False
+
+    async def mark_unchanged(self, url: str, content_type: str, record: Dict[str, Any]) -> None:
+        """Record that a revalidated page still matches its fingerprint"""
+
+        self.stats["estimated_savings"] += record.get("analysis_cost") or 0.0
+
+        if self.db:
+            try:
+                await self.db.touch_page_fingerprint(url, content_type)
+            except Exception as e:
+                logger.warning(f"Database fingerprint touch error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get revalidation statistics"""
+
+        skipped = self.stats["not_modified"] + self.stats["unchanged"]
+        checks = self.stats["not_modified"] + self.stats["revalidations"]
+        skip_rate = (skipped / max(1, checks)) * 100
+
+        return {
+            "revalidations": checks,
+            "not_modified": self.stats["not_modified"],
+            "unchanged": self.stats["unchanged"],
+            "changed": self.stats["changed"],
+            "analysis_skip_rate": f"{skip_rate:.1f}%",
+            "memory_entries": len(self.memory_fingerprints),
+            "memory_evictions": self.memory_fingerprints.stats["evictions"],
+            "estimated_savings": f"${self.stats['estimated_savings']:.4f}"
+        }
+
+class _RefuseRedirects(urllib.request.HTTPRedirectHandler):
+    """Treat redirects as changes instead of following them to another host"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+_opener = urllib.request.build_opener(_RefuseRedirects)
+
+def _check_target(url: str) -> None:
+    """
+    Reject URLs a revalidation request must not reach
+
+    Raises:
+        ValueError: for non-http(s) URLs and hosts resolving to private,
+            loopback, link-local or otherwise non-public addresses
+    """
+
+    if not is_http_url(url):
+        raise ValueError(f"Not an http(s) URL: {url}")
+
+    host = urlsplit(url.strip()).hostname
+    if not host:
+        raise ValueError(f"No host in {url}")
+
+    if settings.revalidation_allow_private_hosts:
+        return
+
+    for _, _, _, _, sockaddr in socket.getaddrinfo(host, None):
+        address = ipaddress.ip_address(sockaddr[0].split('%')[0])
+        if not address.is_global:
+            raise ValueError(f"{host} resolves to non-public address {address}")
+
+def _conditional_head(url: str, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """Send a conditional HEAD request and report whether the page is unchanged"""
+
+    _check_target(url)
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    request = urllib.request.Request(url, method="HEAD", headers=headers)
+    try:
+        with _opener.open(request, timeout=REVALIDATION_TIMEOUT) as response:
+            # Servers that ignore conditionals still echo the current validators
+            if etag and response.headers.get("ETag") == etag:
+                return True
+            return False
+    except urllib.error.HTTPError as e:
+        return e.code == 304
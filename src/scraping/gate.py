@@ -0,0 +1,161 @@
+"""
+Local language, length and relevance gate ahead of Claude analysis
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple
+
+# Frequent function words; their share of a text identifies its language
+STOPWORDS = {
+    "english": {
+        "the", "and", "of", "to", "is", "in", "that", "it", "you", "for",
+        "with", "this", "are", "on", "be", "as", "can", "we", "your", "an"
+    },
+    "spanish": {
+        "el", "la", "de", "que", "y", "en", "los", "las", "se", "del",
+        "es", "por", "con", "para", "una", "un", "su", "al", "como", "puedes"
+    }
+}
+
+# Fewest stopword hits needed before a language is claimed at all
+MIN_LANGUAGE_EVIDENCE = 5
+
+# Share of the stopword hits the leading language needs
+LANGUAGE_CONFIDENCE = 0.7
+
+# Spanish counterparts of the scraper's educational keywords
+SPANISH_KEYWORDS = (
+    "tutorial", "guía", "guia", "aprender", "aprende", "curso", "lección",
+    "leccion", "ejemplo", "ejemplos", "ejercicio", "práctica", "practica",
+    "código", "codigo", "programación", "programacion", "documentación",
+    "documentacion", "principiantes", "paso", "clase", "explicación"
+)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Only the start of a page is read; it is representative and keeps the gate cheap
+SAMPLE_WORDS = 2000
+
+@dataclass
+class GateDecision:
+    """Outcome of gating one page"""
+    passed: bool
+    reason: Optional[str]
+    language: str
+    word_count: int
+    relevance: float
+
+def detect_language(words: List[str]) -> str:
+    """
+    Tell English from Spanish by stopword frequency
+
+    Returns:
+        'english', 'spanish', or 'unknown' when there is too little prose
+        (code-heavy pages) or no clear winner
+    """
+
+    hits = Counter()
+    for word in words:
+        for language, stopwords in STOPWORDS.items():
+            if word in stopwords:
+                hits[language] += 1
+
+    total = sum(hits.values())
+    if total < MIN_LANGUAGE_EVIDENCE:
+        return "unknown"
+
+    language, count = hits.most_common(1)[0]
+    return language if count / total >= LANGUAGE_CONFIDENCE else "unknown"
+
+def measure_page(markdown: str, keywords: Set[str]) -> Tuple[str, int, float, bool]:
+    """
+    Measure what the gate decides on: language, word count, keyword
+    density and whether the page has fenced code
+
+    A pure function of its arguments, so large pages can be measured in
+    a worker process.
+    """
+
+    words = WORD_PATTERN.findall((markdown or '').lower())
+    sample = words[:SAMPLE_WORDS]
+    relevance = (
+        sum(1 for word in sample if word in keywords) / len(sample)
+        if sample else 0.0
+    )
+
+    return detect_language(sample), len(words), relevance, '```' in (markdown or '')
+
+class ContentGate:
+    """
+    Rejects pages not worth a Claude call
+
+    A page fails if its prose is confidently in a language outside
+    ``languages``, if it has fewer than ``min_words`` words, or if fewer
+    than ``min_relevance`` of its words are educational keywords. Pages
+    with fenced code count as relevant regardless of keyword density.
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str],
+        languages: Iterable[str] = ("english", "spanish"),
+        min_words: int = 100,
+        min_relevance: float = 0.005
+    ):
+        self.keywords = {
+            keyword.lower() for keyword in list(keywords) + list(SPANISH_KEYWORDS)
+            if WORD_PATTERN.fullmatch(keyword)
+        }
+        self.languages = set(languages)
+        self.min_words = min_words
+        self.min_relevance = min_relevance
+
+        self.stats = {
+            "checked": 0,
+            "passed": 0,
+            "rejected_language": 0,
+            "rejected_length": 0,
+            "rejected_relevance": 0
+        }
+
+    def check(self, markdown: str) -> GateDecision:
+        """Decide whether a page goes on to Claude analysis"""
+
+        return self.decide(measure_page(markdown, self.keywords))
+
+    def decide(self, measurement: Tuple[str, int, float, bool]) -> GateDecision:
+        """Decide on a page from its measure_page() measurement"""
+
+        language, word_count, relevance, has_code = measurement
+        self.stats["checked"] += 1
+
+        reason = None
+        if language != "unknown" and language not in self.languages:
+            reason = "language"
+        elif word_count < self.min_words:
+            reason = "length"
+        elif relevance < self.min_relevance and not has_code:
+            reason = "relevance"
+
+        if reason:
+            self.stats[f"rejected_{reason}"] += 1
+        else:
+            self.stats["passed"] += 1
+
+        return GateDecision(reason is None, reason, language, word_count, round(relevance, 4))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get gate statistics with rejection rates"""
+
+        checked = max(1, self.stats["checked"])
+        rejected = self.stats["checked"] - self.stats["passed"]
+
+        return {
+            **self.stats,
+            "rejection_rate": f"{rejected / checked * 100:.1f}%",
+            "language_rejection_rate": f"{self.stats['rejected_language'] / checked * 100:.1f}%",
+            "length_rejection_rate": f"{self.stats['rejected_length'] / checked * 100:.1f}%",
+            "relevance_rejection_rate": f"{self.stats['rejected_relevance'] / checked * 100:.1f}%"
+        }
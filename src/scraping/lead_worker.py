@@ -0,0 +1,183 @@
+"""
+Database-backed work queue of educational leads for bulk scraping
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Dict, Optional, Any
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class LeadWorker:
+    """
+    Scrapes educational leads claimed from the educational_leads table
+
+    Each worker runs ``concurrency`` loops that claim one pending lead at
+    a time, best quality_score first, and scrape and analyze it through
+    an EducationalScraper. Claims use ``FOR UPDATE SKIP LOCKED``, so any
+    number of workers in any number of processes share the queue without
+    claiming the same lead twice. A claim is a lease that the worker
+    renews while it scrapes, so long crawls keep their lead; if the worker
+    dies, the lead is claimed again once the lease expires, which makes
+    bulk crawls resumable after a crash. Failed leads, and leads whose
+    lease keeps expiring, return to pending until they have used up their
+    attempts and are archived.
+    """
+
+    def __init__(
+        self,
+        scraper,
+        db_manager,
+        concurrency: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        scrape_options: Optional[Dict[str, Any]] = None
+    ):
+        self.scraper = scraper
+        self.db = db_manager
+        self.concurrency = concurrency or settings.lead_worker_concurrency
+        self.lease_seconds = lease_seconds or settings.lead_worker_lease_seconds
+        self.max_attempts = max_attempts or settings.lead_worker_max_attempts
+        self.poll_interval = poll_interval if poll_interval is not None else settings.lead_worker_poll_interval
+        self.scrape_options = scrape_options or {}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._stopping = asyncio.Event()
+
+        self.stats = {
+            "claimed": 0,
+            "processed": 0,
+            "failed": 0,
+            "archived": 0,
+            "reclaimed": 0,
+            "lost_claims": 0,
+            "lease_renewals": 0
+        }
+
+    async def run(self, stop_when_empty: bool = False) -> Dict[str, Any]:
+        """
+        Work the queue until stopped
+
+        Args:
+            stop_when_empty: Return once no lead can be claimed instead of
+                polling for new ones
+
+        Returns:
+            Worker statistics
+        """
+
+        logger.info(f"🧵 Lead worker {self.worker_id} starting {self.concurrency} loops")
+
+        await asyncio.gather(*(
+            self._work_loop(stop_when_empty) for _ in range(self.concurrency)
+        ))
+
+        logger.info(f"✅ Lead worker {self.worker_id} stopped: {self.stats}")
+        return self.get_stats()
+
+    def stop(self) -> None:
+        """Stop claiming leads; leads in progress are finished first"""
+
+        self._stopping.set()
+
+    async def _work_loop(self, stop_when_empty: bool) -> None:
+        """Claim and process leads one at a time"""
+
+        while not self._stopping.is_set():
+            try:
+                leads = await self.db.claim_leads(
+                    self.worker_id, 1, self.lease_seconds, self.max_attempts
+                )
+            except Exception as e:
+                logger.error(f"Lead claim error: {e}")
+                leads = []
+
+            if not leads:
+                if stop_when_empty:
+                    return
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.process_lead(leads[0])
+
+    async def process_lead(self, lead: Dict[str, Any]) -> None:
+        """Scrape and analyze one claimed lead and record the outcome"""
+
+        self.stats["claimed"] += 1
+        if lead.get("attempts", 1) > 1:
+            self.stats["reclaimed"] += 1
+
+        heartbeat = asyncio.ensure_future(self._renew_lease(lead))
+        try:
+            result = await self.scraper.scrape_educational_content(
+                lead["url"],
+                content_type=lead.get("content_type") or "tutorial",
+                **self.scrape_options
+            )
+            error = result.get("error")
+            if not error and not result.get("pages_scraped"):
+                error = "No content extracted"
+        except Exception as e:
+            result, error = {}, str(e)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        try:
+            if error:
+                status = await self.db.fail_lead(lead["id"], self.worker_id, error, self.max_attempts)
+                if status is None:
+                    self.stats["lost_claims"] += 1
+                else:
+                    self.stats["failed"] += 1
+                    if status == "archived":
+                        self.stats["archived"] += 1
+                logger.warning(f"Lead {lead['url']} failed ({status}): {error}")
+            else:
+                # Pages the content gate rejected are kept but ranked last
+                completed = await self.db.complete_lead(
+                    lead["id"],
+                    self.worker_id,
+                    difficulty_estimate=result.get("difficulty_level"),
+                    language=result.get("language"),
+                    quality_score=0.0 if result.get("low_quality") else None
+                )
+                if completed:
+                    self.stats["processed"] += 1
+                else:
+                    self.stats["lost_claims"] += 1
+        except Exception as e:
+            # The lease expires and another worker picks the lead up again
+            logger.error(f"Lead status update error for {lead['url']}: {e}")
+
+    async def _renew_lease(self, lead: Dict[str, Any]) -> None:
+        """Keep renewing a lead's lease, three times per lease, while it is processed"""
+
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await self.db.renew_lead_lease(lead["id"], self.worker_id):
+                    logger.warning(f"Lost the claim on lead {lead['url']} while processing it")
+                    return
+                self.stats["lease_renewals"] += 1
+            except Exception as e:
+                # Keep trying; the lease only lapses if renewals fail for a whole lease
+                logger.warning(f"Lease renewal error for {lead['url']}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue worker statistics"""
+
+        return {
+            **self.stats,
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency
+        }
@@ -0,0 +1,184 @@
+"""
+Bounded LRU memory tier with TTL and byte accounting
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+class BoundedLRUCache:
+    """
+    In-memory cache bounded by entry count and total size
+
+    Entries are kept in recency order in an OrderedDict, so get, put and
+    eviction are O(1). When either ``max_entries`` or ``max_bytes`` would
+    be exceeded, least recently used entries are evicted; an entry larger
+    than ``max_bytes`` on its own is not admitted. Ages are measured on
+    the monotonic clock, so wall-clock jumps neither expire nor revive
+    entries; an entry older than ``ttl`` seconds, or past its own
+    expiry, is never returned.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        on_remove: Optional[Callable[[Hashable, Any], None]] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+
+        # Called with (key, value) whenever an entry is evicted, expires or is removed
+        self.on_remove = on_remove
+
+        # key -> (value, size, monotonic creation time, monotonic expiry time)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+        self.stats = {
+            "evictions": 0,
+            "evicted_bytes": 0,
+            "expirations": 0,
+            "rejected_oversize": 0
+        }
+
+    def get(self, key: Hashable, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Get a value and mark it most recently used
+
+        Args:
+            max_age: Maximum age in seconds, further capped by ttl
+
+        Returns:
+            The value, or None if absent or expired (expired entries are removed)
+        """
+
+        item = self._entries.get(key)
+        if item is None:
+            return None
+
+        value, size, created, expires = item
+        limit = self.ttl if max_age is None else min(max_age, self.ttl)
+        now = time.monotonic()
+        if now - created >= limit or now >= expires:
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        size: int,
+        age: float = 0.0,
+        expires_in: Optional[float] = None
+    ) -> bool:
+        """
+        Store a value, evicting least recently used entries to make room
+
+        Args:
+            size: Size of the value in bytes
+            age: Seconds the value had already aged in a slower tier
+            expires_in: Seconds until the value expires regardless of age
+
+        Returns:
+            False if the value is larger than max_bytes and was not stored
+        """
+
+        if key in self._entries:
+            self._remove(key)
+
+        if size > self.max_bytes:
+            self.stats["rejected_oversize"] += 1
+            return False
+
+        while self._entries and (
+            len(self._entries) >= self.max_entries or self.bytes + size > self.max_bytes
+        ):
+            evicted_key, (evicted, evicted_size, _, _) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.stats["evictions"] += 1
+            self.stats["evicted_bytes"] += evicted_size
+            if self.on_remove is not None:
+                self.on_remove(evicted_key, evicted)
+
+        now = time.monotonic()
+        expires = now + expires_in if expires_in is not None else float("inf")
+        self._entries[key] = (value, size, now - age, expires)
+        self.bytes += size
+        return True
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove an entry and return its value"""
+
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        self._remove(key)
+        return item[0]
+
+    def purge_expired(self, max_age: Optional[float] = None) -> int:
+        """
+        Remove every entry older than max_age (or ttl)
+
+        Returns:
+            Number of entries removed
+        """
+
+        limit = self.ttl if max_age is None else min(max_age, self.ttl)
+        now = time.monotonic()
+        expired = [
+            key for key, (_, _, created, expires) in self._entries.items()
+            if now - created >= limit or now >= expires
+        ]
+        for key in expired:
+            self._remove(key)
+
+        self.stats["expirations"] += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+
+        entries = list(self._entries.items())
+        self._entries.clear()
+        self.bytes = 0
+        if self.on_remove is not None:
+            for key, (value, _, _, _) in entries:
+                self.on_remove(key, value)
+
+    def values(self) -> Iterator[Any]:
+        """Iterate over stored values, least recently used first"""
+
+        return (value for value, _, _, _ in self._entries.values())
+
+    def _remove(self, key: Hashable) -> None:
+        """Drop an entry and release its bytes"""
+
+        value, size, _, _ = self._entries.pop(key)
+        self.bytes -= size
+        if self.on_remove is not None:
+            self.on_remove(key, value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get occupancy and eviction statistics"""
+
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl
+        }
@@ -0,0 +1,169 @@
+"""
+Single-pass markdown scanner for code, link, heading and list extraction
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+LIST_MARKERS = ('- ', '* ', '+ ', '• ')
+
+@dataclass
+class CodeBlock:
+    """Fenced code block"""
+    language: str
+    code: str
+
+@dataclass
+class Link:
+    """Inline link with its anchor text"""
+    text: str
+    url: str
+
+@dataclass
+class Heading:
+    """ATX heading"""
+    level: int
+    text: str
+
+@dataclass
+class ListItem:
+    """Bullet or numbered list item and the heading it sits under"""
+    text: str
+    section: Optional[str] = None
+
+@dataclass
+class MarkdownScan:
+    """Everything extracted from one pass over a markdown document"""
+    code_blocks: List[CodeBlock] = field(default_factory=list)
+    inline_code: List[str] = field(default_factory=list)
+    links: List[Link] = field(default_factory=list)
+    headings: List[Heading] = field(default_factory=list)
+    list_items: List[ListItem] = field(default_factory=list)
+
+def scan_markdown(text: str) -> MarkdownScan:
+    """
+    Extract fenced code, inline code, links, headings and list items
+
+    The text is read once, line by line. Inline constructs are found
+    with forward-only ``str.find`` scans, so the cost stays linear in the
+    length of the text even for pathological input (unclosed brackets or
+    backticks) that makes backtracking regexes blow up. Links and inline
+    code inside fenced blocks are not reported.
+    """
+
+    scan = MarkdownScan()
+    fence = None
+    fence_language = ''
+    fence_lines = []
+    section = None
+
+    for line in (text or '').split('\n'):
+        stripped = line.lstrip()
+
+        # Inside a fenced block only a closing fence matters
+        if fence is not None:
+            if stripped.startswith(fence):
+                scan.code_blocks.append(CodeBlock(fence_language, '\n'.join(fence_lines)))
+                fence = None
+            else:
+                fence_lines.append(line)
+            continue
+
+        if stripped.startswith('```') or stripped.startswith('~~~'):
+            fence = stripped[:3]
+            info = stripped[3:].strip()
+            fence_language = info.split()[0] if info else ''
+            fence_lines = []
+            continue
+
+        if stripped.startswith('#'):
+            level = len(stripped) - len(stripped.lstrip('#'))
+            if level <= 6 and stripped[level:level + 1] in (' ', ''):
+                section = stripped[level:].strip().strip('#').strip()
+                scan.headings.append(Heading(level, section))
+        else:
+            item = _list_item_text(stripped)
+            if item:
+                scan.list_items.append(ListItem(item, section))
+
+        if '`' in line:
+            _scan_inline_code(line, scan.inline_code)
+        if '[' in line:
+            _scan_links(line, scan.links)
+
+    # An unterminated fence still holds code
+    if fence is not None and fence_lines:
+        scan.code_blocks.append(CodeBlock(fence_language, '\n'.join(fence_lines)))
+
+    return scan
+
+def find_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the first JSON object embedded in free text, such as model output
+
+    Each ``{`` is tried with ``json.JSONDecoder.raw_decode``, which stops
+    at the end of the object (or the first syntax error) instead of
+    searching for the last closing brace.
+    """
+
+    decoder = json.JSONDecoder()
+    start = text.find('{')
+
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(text, start)
+            if isinstance(value, dict):
+                return value
+        except ValueError:
+            pass
+        start = text.find('{', start + 1)
+
+    return None
+
+def _list_item_text(line: str) -> Optional[str]:
+    """Return the text of a bullet or numbered list item line"""
+
+    if line.startswith(LIST_MARKERS):
+        return line[2:].strip()
+
+    digits = len(line) - len(line.lstrip('0123456789'))
+    if 0 < digits <= 9 and line[digits:digits + 2] in ('. ', ') '):
+        return line[digits + 2:].strip()
+
+    return None
+
+def _scan_inline_code(line: str, found: List[str]) -> None:
+    """Collect `code` spans of a line"""
+
+    start = line.find('`')
+    while start != -1:
+        end = line.find('`', start + 1)
+        if end == -1:
+            return
+        if end > start + 1:
+            found.append(line[start + 1:end])
+            start = line.find('`', end + 1)
+        else:
+            start = end
+
+def _scan_links(line: str, found: List[Link]) -> None:
+    """Collect [text](url) links of a line"""
+
+    start = line.find('[')
+    while start != -1:
+        close = line.find(']', start + 1)
+        if close == -1:
+            return
+
+        if close > start + 1 and line.startswith('(', close + 1):
+            end = line.find(')', close + 2)
+            if end == -1:
+                return
+            if end > close + 2:
+                found.append(Link(line[start + 1:close], line[close + 2:end]))
+                start = line.find('[', end + 1)
+                continue
+
+        # Every '[' before this ']' would end at the same bracket
+        start = line.find('[', close + 1)
@@ -0,0 +1,127 @@
+"""
+Content-hash memoization of Claude educational analysis
+"""
+
+import hashlib
+import json
+import logging
+import re
+from typing import Dict, Optional, Any
+
+from config.settings import settings
+from src.scraping.lru import BoundedLRUCache
+
+logger = logging.getLogger(__name__)
+
+class AnalysisMemo:
+    """
+    Persistent memo of educational metadata keyed by analyzed content
+
+    Mirrors, syndicated tutorials and query-string variants often yield
+    byte-identical markdown under different URLs. Keying the analysis by
+    a hash of the normalized content (plus content type and prompt
+    version) lets every copy reuse the first Claude analysis.
+
+    Priority: memory (bounded LRU) → database
+    """
+
+    def __init__(self, db_manager=None):
+        self.db = db_manager
+        self.memory_memo = BoundedLRUCache(
+            max_entries=settings.memo_memory_max_entries,
+            max_bytes=settings.memo_memory_max_bytes,
+            ttl=settings.memo_memory_ttl_seconds
+        )
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "saves": 0,
+            "estimated_savings": 0.0
+        }
+
+    @staticmethod
+    def make_key(content: str, content_type: str, prompt_version: str) -> str:
+        """Hash normalized content together with what shapes the analysis"""
+
+        normalized = re.sub(r'\s+', ' ', content).strip()
+        memo_input = f"{prompt_version}:{content_type}:{normalized}"
+        return hashlib.sha256(memo_input.encode('utf-8')).hexdigest()
+
+    async def get(self, memo_key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a memoized analysis"""
+
+        # 1. Check memory memo
+        entry = self.memory_memo.get(memo_key)
+
+        # 2. Check database memo
+        if entry is None and self.db:
+            try:
+                entry = await self.db.get_analysis_memo(memo_key)
+                if entry:
+                    self._remember(memo_key, entry)
+            except Exception as e:
+                logger.warning(f"Database memo get error: {e}")
+
+        if entry:
+            self.stats["hits"] += 1
+            self.stats["estimated_savings"] += entry.get("cost") or 0.0
+            return entry["analysis"]
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(
+        self,
+        memo_key: str,
+        analysis: Dict[str, Any],
+        content_type: str,
+        prompt_version: str,
+        cost: float = 0.0
+    ) -> None:
+        """Store an analysis under its content key"""
+
+        entry = {
+            "analysis": analysis,
+            "content_type": content_type,
+            "prompt_version": prompt_version,
+            "cost": cost
+        }
+
+        self._remember(memo_key, entry)
+
+        if self.db:
+            try:
+                await self.db.set_analysis_memo(
+                    content_hash=memo_key,
+                    content_type=content_type,
+                    prompt_version=prompt_version,
+                    analysis=analysis,
+                    cost=cost
+                )
+            except Exception as e:
+                logger.warning(f"Database memo save error: {e}")
+
+        self.stats["saves"] += 1
+
+    def _remember(self, memo_key: str, entry: Dict[str, Any]) -> None:
+        """Put an entry in the memory tier, sized by its serialized analysis"""
+
+        size = len(json.dumps(entry["analysis"], default=str))
+        self.memory_memo.put(memo_key, entry, size)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memo statistics"""
+
+        total_lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] / max(1, total_lookups)) * 100
+
+        return {
+            "hits": self.stats["hits"],
+            "misses": self.stats["misses"],
+            "saves": self.stats["saves"],
+            "hit_rate": f"{hit_rate:.1f}%",
+            "memory_entries": len(self.memory_memo),
+            "memory_evictions": self.memory_memo.stats["evictions"],
+            "estimated_savings": f"${self.stats['estimated_savings']:.4f}"
+        }
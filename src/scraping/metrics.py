@@ -0,0 +1,230 @@
+"""
+Per-stage latency histograms and cost counters for the scraping pipeline
+"""
+
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Any, Tuple
+
+# Bucket upper bounds in seconds: 1 ms to ~131 s, four buckets per doubling
+BUCKET_BOUNDS = tuple(0.001 * 2 ** (i / 4) for i in range(69))
+
+# Positions in BUCKET_BOUNDS exported to Prometheus: one bucket per doubling
+EXPORTED_BUCKETS = tuple(range(0, len(BUCKET_BOUNDS), 4))
+
+# Distinct domains tracked per stage before the rest fold into "other"
+MAX_DOMAINS = 200
+
+OTHER_DOMAIN = "other"
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram
+
+    Bucket counts live in a list allocated once, so recording a value is
+    a binary search over the bounds and an integer increment; quantiles
+    are interpolated within the bucket they fall in.
+    """
+
+    __slots__ = ("counts", "count", "sum", "max", "cost")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.cost = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one observation"""
+
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile in seconds"""
+
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = BUCKET_BOUNDS[index - 1] if index else 0.0
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, p50/p95/p99 and max in milliseconds, plus cost"""
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.50) * 1000, 2),
+            "p95_ms": round(self.quantile(0.95) * 1000, 2),
+            "p99_ms": round(self.quantile(0.99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "cost": round(self.cost, 6)
+        }
+
+class _StageTimer:
+    """Context manager recording the duration of a block"""
+
+    __slots__ = ("metrics", "stage", "domain", "start")
+
+    def __init__(self, metrics, stage: str, domain: Optional[str]):
+        self.metrics = metrics
+        self.stage = stage
+        self.domain = domain
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.stage, time.perf_counter() - self.start, self.domain)
+        return False
+
+class StageMetrics:
+    """
+    Latency and cost per pipeline stage, overall and per domain
+
+    Usage:
+        with metrics.time("scrape", domain):
+            ...
+        metrics.add_cost("analysis", cost, domain)
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Histogram] = {}
+        self.domains: Dict[str, Dict[str, Histogram]] = {}
+
+    def time(self, stage: str, domain: Optional[str] = None) -> _StageTimer:
+        """Time a block as one observation of a stage"""
+
+        return _StageTimer(self, stage, domain)
+
+    def record(self, stage: str, seconds: float, domain: Optional[str] = None) -> None:
+        """Record a stage duration in seconds"""
+
+        for histogram in self._histograms(stage, domain):
+            histogram.record(seconds)
+
+    def add_cost(self, stage: str, amount: float, domain: Optional[str] = None) -> None:
+        """Attribute spend in dollars to a stage"""
+
+        for histogram in self._histograms(stage, domain):
+            histogram.cost += amount
+
+    def _histograms(self, stage: str, domain: Optional[str]) -> List[Histogram]:
+        """Get the stage histogram and, if a domain is given, its domain histogram"""
+
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram()
+            self.domains[stage] = {}
+
+        if not domain:
+            return [histogram]
+
+        by_domain = self.domains[stage]
+        domain_histogram = by_domain.get(domain)
+        if domain_histogram is None:
+            if len(by_domain) >= MAX_DOMAINS:
+                domain = OTHER_DOMAIN
+            domain_histogram = by_domain.setdefault(domain, Histogram())
+
+        return [histogram, domain_histogram]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-stage summaries with per-domain breakdowns"""
+
+        return {
+            stage: {
+                **histogram.summary(),
+                "domains": {
+                    domain: domain_histogram.summary()
+                    for domain, domain_histogram in self.domains[stage].items()
+                }
+            }
+            for stage, histogram in self.stages.items()
+        }
+
+    def to_prometheus(self, prefix: str = "educational_scraper") -> str:
+        """
+        Render the metrics in the Prometheus text exposition format
+
+        Stages are exported as histograms with one bucket per doubling.
+        Domains are exported as separate metrics with only a count, a sum
+        and cost, so aggregating the stage metrics never counts an
+        observation twice and each domain adds three series per stage.
+        """
+
+        lines = [
+            f"# HELP {prefix}_stage_seconds Latency of scraping pipeline stages",
+            f"# TYPE {prefix}_stage_seconds histogram"
+        ]
+        for stage, histogram in self.stages.items():
+            labels = f'stage="{_escape(stage)}"'
+            counts = histogram.counts
+            cumulative = 0
+            previous = 0
+            for index in EXPORTED_BUCKETS:
+                cumulative += sum(counts[previous:index + 1])
+                previous = index + 1
+                lines.append(
+                    f'{prefix}_stage_seconds_bucket{{{labels},le="{BUCKET_BOUNDS[index]:.6g}"}} {cumulative}'
+                )
+            lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{prefix}_stage_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"{prefix}_stage_seconds_count{{{labels}}} {histogram.count}")
+
+        lines.extend([
+            f"# HELP {prefix}_stage_cost_dollars_total Spend attributed to scraping pipeline stages",
+            f"# TYPE {prefix}_stage_cost_dollars_total counter"
+        ])
+        for stage, histogram in self.stages.items():
+            if histogram.cost:
+                lines.append(
+                    f'{prefix}_stage_cost_dollars_total{{stage="{_escape(stage)}"}} {histogram.cost:.6f}'
+                )
+
+        lines.extend([
+            f"# HELP {prefix}_domain_stage_seconds Latency of scraping pipeline stages per domain",
+            f"# TYPE {prefix}_domain_stage_seconds summary"
+        ])
+        for labels, histogram in self._domain_labelled():
+            lines.append(f"{prefix}_domain_stage_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"{prefix}_domain_stage_seconds_count{{{labels}}} {histogram.count}")
+
+        lines.extend([
+            f"# HELP {prefix}_domain_stage_cost_dollars_total Spend attributed to scraping pipeline stages per domain",
+            f"# TYPE {prefix}_domain_stage_cost_dollars_total counter"
+        ])
+        for labels, histogram in self._domain_labelled():
+            if histogram.cost:
+                lines.append(f"{prefix}_domain_stage_cost_dollars_total{{{labels}}} {histogram.cost:.6f}")
+
+        return "\n".join(lines) + "\n"
+
+    def _domain_labelled(self) -> List[Tuple[str, Histogram]]:
+        """Every per-domain histogram with its Prometheus label set"""
+
+        return [
+            (f'stage="{_escape(stage)}",domain="{_escape(domain)}"', domain_histogram)
+            for stage in self.stages
+            for domain, domain_histogram in self.domains[stage].items()
+        ]
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value"""
+
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
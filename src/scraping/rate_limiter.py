@@ -46,6 +46,9 @@ class EducationalRateLimiter:
             }
         }
         
+        # Serialize acquisitions per API so concurrent callers see each other's requests
+        self._locks = {api: asyncio.Lock() for api in self.limits}
+        
         # Statistics
         self.stats = {
             'firecrawl': {
@@ -74,21 +77,22 @@ class EducationalRateLimiter:
         if api not in self.limits:
             raise ValueError(f"Unknown API: {api}")
         
-        wait_time = await self._calculate_wait_time(api)
-        
-        if wait_time > 0:
-            logger.info(f"Rate limiting {api}: waiting {wait_time:.1f}s")
-            await asyncio.sleep(wait_time)
-            self.stats[api]['rate_limited'] += 1
-            self.stats[api]['total_wait_time'] += wait_time
-        
-        # Record this request
-        now = datetime.now()
-        self.request_logs[api]['minute'].append(now)
-        self.request_logs[api]['hour'].append(now)
-        self.request_logs[api]['burst'].append(now)
-        
-        self.stats[api]['total_requests'] += 1
+        async with self._locks[api]:
+            wait_time = await self._calculate_wait_time(api)
+            
+            if wait_time > 0:
+                logger.info(f"Rate limiting {api}: waiting {wait_time:.1f}s")
+                await asyncio.sleep(wait_time)
+                self.stats[api]['rate_limited'] += 1
+                self.stats[api]['total_wait_time'] += wait_time
+            
+            # Record this request
+            now = datetime.now()
+            self.request_logs[api]['minute'].append(now)
+            self.request_logs[api]['hour'].append(now)
+            self.request_logs[api]['burst'].append(now)
+            
+            self.stats[api]['total_requests'] += 1
         
         return wait_time
     
@@ -0,0 +1,404 @@
+"""
+Append-only segment log store for the file cache tier
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from src.scraping.cache_format import decode_entry, encode_entry
+
+logger = logging.getLogger(__name__)
+
+# crc32, operation, cache type length, key length, value length, timestamp
+RECORD_HEADER = struct.Struct("<IBBHId")
+
+OP_PUT = 1
+OP_DELETE = 2
+
+SEGMENT_SUFFIX = ".seg"
+COMPACTING_SUFFIX = ".compacting"
+
+@dataclass
+class IndexEntry:
+    """Location of a live record plus the metadata cleanup and summaries need"""
+    __slots__ = ("segment", "offset", "length", "timestamp", "cache_type")
+
+    segment: int
+    offset: int
+    length: int
+    timestamp: float
+    cache_type: str
+
+class SegmentLogStore:
+    """
+    Cache entries in append-only segment files with an in-memory index
+
+    Every put or delete appends one record to the active segment; the
+    segment is sealed and a new one started once it exceeds
+    ``segment_max_bytes``. The index maps each key to the segment,
+    offset and length of its latest record together with its timestamp
+    and cache type, so a lookup is one seek and one read, and expiry
+    cleanup and summaries work from the index alone. The index is
+    rebuilt at startup from the record headers, skipping over payloads.
+
+    Overwritten and deleted records are dead bytes. Once they make up
+    ``compaction_threshold`` of the sealed segments, the live records of
+    all sealed segments are copied into one new segment in a worker
+    thread while the store keeps serving.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        compaction_threshold: float = 0.5,
+        compression_level: int = 3
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.compaction_threshold = compaction_threshold
+        self.compression_level = compression_level
+
+        self.index: Dict[str, IndexEntry] = {}
+        self.segment_bytes: Dict[int, int] = {}
+        self.segment_dead: Dict[int, int] = {}
+
+        self._readers: Dict[int, BinaryIO] = {}
+        self._writer: Optional[BinaryIO] = None
+        self._active = 0
+        self._compacting = False
+        self._compaction_task: Optional[asyncio.Task] = None
+
+        # Writes may come from worker threads; appends and index updates take turns
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "reads": 0,
+            "writes": 0,
+            "deletes": 0,
+            "expirations": 0,
+            "corrupt_records": 0,
+            "compactions": 0,
+            "reclaimed_bytes": 0
+        }
+
+        self._load()
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"{segment:08d}{SEGMENT_SUFFIX}"
+
+    def _load(self) -> None:
+        """Rebuild the index from the segment files"""
+
+        # A compaction interrupted by a crash; its segments are still intact
+        for leftover in self.directory.glob(f"*{COMPACTING_SUFFIX}"):
+            leftover.unlink()
+
+        segments = sorted(int(path.stem) for path in self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+        for segment in segments:
+            self._scan(segment)
+
+        self._active = segments[-1] if segments else 1
+        self.segment_bytes.setdefault(self._active, 0)
+        self.segment_dead.setdefault(self._active, 0)
+        self._writer = open(self._segment_path(self._active), "ab")
+
+        if self.index:
+            logger.info(f"Loaded segment log index: {len(self.index)} entries in {len(segments)} segments")
+
+    def _scan(self, segment: int) -> None:
+        """Index one segment's records by reading their headers and keys only"""
+
+        path = self._segment_path(segment)
+        size = path.stat().st_size
+        offset = 0
+
+        self.segment_bytes[segment] = 0
+        self.segment_dead[segment] = 0
+
+        with open(path, "rb") as f:
+            while offset + RECORD_HEADER.size <= size:
+                f.seek(offset)
+                _, op, type_len, key_len, value_len, timestamp = RECORD_HEADER.unpack(
+                    f.read(RECORD_HEADER.size)
+                )
+                length = RECORD_HEADER.size + type_len + key_len + value_len
+                if op not in (OP_PUT, OP_DELETE) or offset + length > size:
+                    break
+                try:
+                    meta = f.read(type_len + key_len)
+                    cache_type = meta[:type_len].decode("utf-8")
+                    key = meta[type_len:].decode("utf-8")
+                except UnicodeDecodeError:
+                    break
+
+                self.segment_bytes[segment] = offset + length
+                self._apply(key, op, IndexEntry(segment, offset, length, timestamp, cache_type))
+                offset += length
+
+        if offset < size:
+            # A write torn by a crash; everything after it is unreadable
+            logger.warning(f"Truncating segment {path.name} from {size} to {offset} bytes")
+            os.truncate(path, offset)
+
+    def _apply(self, key: str, op: int, entry: IndexEntry) -> None:
+        """Point the index at a new record and account for the one it replaces"""
+
+        old = self.index.pop(key, None)
+        if old is not None:
+            self.segment_dead[old.segment] += old.length
+
+        if op == OP_PUT:
+            self.index[key] = entry
+        else:
+            self.segment_dead[entry.segment] += entry.length
+
+    def _append(self, op: int, key: str, cache_type: str, value: bytes, timestamp: float) -> IndexEntry:
+        """Append one record to the active segment"""
+
+        if self.segment_bytes[self._active] >= self.segment_max_bytes:
+            self._writer.close()
+            self._active += 1
+            self.segment_bytes[self._active] = 0
+            self.segment_dead[self._active] = 0
+            self._writer = open(self._segment_path(self._active), "ab")
+
+        type_bytes = cache_type.encode("utf-8")
+        key_bytes = key.encode("utf-8")
+        body = RECORD_HEADER.pack(
+            0, op, len(type_bytes), len(key_bytes), len(value), timestamp
+        )[4:] + type_bytes + key_bytes + value
+        record = struct.pack("<I", zlib.crc32(body)) + body
+
+        offset = self.segment_bytes[self._active]
+        self._writer.write(record)
+        self._writer.flush()
+        self.segment_bytes[self._active] += len(record)
+
+        return IndexEntry(self._active, offset, len(record), timestamp, cache_type)
+
+    def put(self, key: str, entry: Dict[str, Any], cache_type: str, timestamp: Optional[float] = None) -> None:
+        """Store an entry under key"""
+
+        value, _ = encode_entry(entry, self.compression_level)
+        with self._lock:
+            record = self._append(OP_PUT, key, cache_type, value, time.time() if timestamp is None else timestamp)
+            self._apply(key, OP_PUT, record)
+            self.stats["writes"] += 1
+        self.maybe_compact()
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read the entry stored under key
+
+        Args:
+            max_age: Maximum age in seconds; older entries are deleted
+
+        Raises:
+            ValueError: if the record fails its checksum
+        """
+
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+
+        if max_age is not None and time.time() - entry.timestamp >= max_age:
+            self.delete(key)
+            self.stats["expirations"] += 1
+            return None
+
+        reader = self._readers.get(entry.segment)
+        if reader is None:
+            reader = self._readers[entry.segment] = open(self._segment_path(entry.segment), "rb")
+        reader.seek(entry.offset)
+        record = reader.read(entry.length)
+
+        if len(record) != entry.length or zlib.crc32(record[4:]) != struct.unpack_from("<I", record)[0]:
+            self.stats["corrupt_records"] += 1
+            raise ValueError(f"Corrupt segment log record for {key}")
+
+        _, _, type_len, key_len, _, _ = RECORD_HEADER.unpack_from(record)
+        self.stats["reads"] += 1
+        return decode_entry(record[RECORD_HEADER.size + type_len + key_len:])[0]
+
+    def delete(self, key: str) -> bool:
+        """Delete the entry under key; returns whether there was one"""
+
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return False
+
+            tombstone = self._append(OP_DELETE, key, entry.cache_type, b"", time.time())
+            self._apply(key, OP_DELETE, tombstone)
+            self.stats["deletes"] += 1
+        self.maybe_compact()
+        return True
+
+    def purge_expired(self, max_age: float) -> int:
+        """
+        Delete every entry older than max_age seconds, using the index only
+
+        Returns:
+            Number of entries deleted
+        """
+
+        cutoff = time.time() - max_age
+        expired = [key for key, entry in self.index.items() if entry.timestamp <= cutoff]
+        for key in expired:
+            self.delete(key)
+
+        self.stats["expirations"] += len(expired)
+        return len(expired)
+
+    def summary(self) -> Dict[str, int]:
+        """Number of live entries per cache type"""
+
+        return dict(Counter(entry.cache_type for entry in self.index.values()))
+
+    def maybe_compact(self) -> None:
+        """
+        Start a background compaction once sealed segments are mostly dead
+
+        Only has an effect on the event loop; callers writing from a worker
+        thread call it again once they are back on the loop.
+        """
+
+        if self._compacting:
+            return
+
+        sealed = [segment for segment in self.segment_bytes if segment != self._active]
+        sealed_bytes = sum(self.segment_bytes[segment] for segment in sealed)
+        sealed_dead = sum(self.segment_dead[segment] for segment in sealed)
+        if not sealed or sealed_dead < self.compaction_threshold * sealed_bytes:
+            return
+
+        try:
+            self._compaction_task = asyncio.get_running_loop().create_task(self.compact())
+        except RuntimeError:
+            pass  # No event loop; compact() can still be awaited explicitly
+
+    async def compact(self) -> int:
+        """
+        Rewrite the live records of all sealed segments into one segment
+
+        The copy runs in a worker thread. The new segment takes the id of
+        the newest sealed segment; the older ones are deleted before it is
+        renamed into place, so a crash part-way loses cache entries but
+        never resurrects deleted ones.
+
+        Returns:
+            Bytes reclaimed
+        """
+
+        sealed = sorted(segment for segment in self.segment_bytes if segment != self._active)
+        if self._compacting or not sealed:
+            return 0
+
+        self._compacting = True
+        try:
+            sealed_set = set(sealed)
+            with self._lock:
+                live = sorted(
+                    ((key, entry) for key, entry in self.index.items() if entry.segment in sealed_set),
+                    key=lambda item: (item[1].segment, item[1].offset)
+                )
+            target = sealed[-1]
+            temp_path = self.directory / f"{target:08d}{COMPACTING_SUFFIX}"
+
+            moved, size = await asyncio.to_thread(self._copy_records, live, temp_path)
+
+            # Back on the event loop; writers wait until the swap is done
+            with self._lock:
+                for segment in sealed:
+                    reader = self._readers.pop(segment, None)
+                    if reader is not None:
+                        reader.close()
+                for segment in sealed[:-1]:
+                    self._segment_path(segment).unlink()
+                os.replace(temp_path, self._segment_path(target))
+
+                reclaimed = sum(self.segment_bytes.pop(segment) for segment in sealed) - size
+                for segment in sealed:
+                    del self.segment_dead[segment]
+
+                # Records overwritten or deleted while the copy ran are dead on arrival
+                dead = 0
+                for key, old, offset in moved:
+                    if self.index.get(key) is old:
+                        self.index[key] = IndexEntry(target, offset, old.length, old.timestamp, old.cache_type)
+                    else:
+                        dead += old.length
+
+                self.segment_bytes[target] = size
+                self.segment_dead[target] = dead
+
+            self.stats["compactions"] += 1
+            self.stats["reclaimed_bytes"] += reclaimed
+            logger.info(f"Compacted {len(sealed)} segments, reclaimed {reclaimed} bytes")
+            return reclaimed
+
+        except Exception as e:
+            logger.error(f"Segment log compaction error: {e}")
+            return 0
+        finally:
+            self._compacting = False
+
+    def _copy_records(self, live: List[Tuple[str, IndexEntry]], temp_path: Path) -> Tuple[list, int]:
+        """Copy records verbatim into a new segment file (runs in a worker thread)"""
+
+        moved = []
+        readers: Dict[int, BinaryIO] = {}
+        try:
+            with open(temp_path, "wb") as out:
+                offset = 0
+                for key, entry in live:
+                    reader = readers.get(entry.segment)
+                    if reader is None:
+                        reader = readers[entry.segment] = open(self._segment_path(entry.segment), "rb")
+                    reader.seek(entry.offset)
+                    out.write(reader.read(entry.length))
+                    moved.append((key, entry, offset))
+                    offset += entry.length
+                out.flush()
+                os.fsync(out.fileno())
+        finally:
+            for reader in readers.values():
+                reader.close()
+
+        return moved, offset
+
+    def close(self) -> None:
+        """Close all segment files"""
+
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get segment log statistics"""
+
+        total = sum(self.segment_bytes.values())
+        dead = sum(self.segment_dead.values())
+
+        return {
+            **self.stats,
+            "entries": len(self.index),
+            "segments": len(self.segment_bytes),
+            "total_bytes": total,
+            "dead_bytes": dead,
+            "dead_ratio": f"{dead / max(1, total) * 100:.1f}%"
+        }
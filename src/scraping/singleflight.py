@@ -0,0 +1,75 @@
+"""
+In-process single-flight coalescing of concurrent identical requests
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time
+
+    The first caller for a key becomes the leader and runs the call;
+    callers arriving while it is in flight await the leader's outcome
+    instead of repeating the work. Once the call finishes the key is
+    released, so later callers start a fresh call.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+        self.stats = {
+            "leaders": 0,
+            "followers": 0
+        }
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func for key, or join the call already in flight for it
+
+        Returns:
+            The leader's result; exceptions are raised to every caller
+        """
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.stats["followers"] += 1
+            logger.debug(f"Joining in-flight call for {key}")
+            # Shield so a cancelled follower doesn't cancel the shared call
+            return await asyncio.shield(flight)
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.stats["leaders"] += 1
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Mark it retrieved so a flight without followers doesn't log a warning
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+
+    def in_flight(self) -> int:
+        """Number of keys with a call in progress"""
+
+        return len(self._flights)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+
+        return {
+            **self.stats,
+            "in_flight": self.in_flight()
+        }
@@ -0,0 +1,183 @@
+"""
+Non-blocking Firecrawl transport for async scraping code
+"""
+
+import asyncio
+import functools
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from firecrawl import FirecrawlApp
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Batch job states after which no further documents arrive
+BATCH_FINAL_STATES = {'completed', 'failed', 'cancelled'}
+
+class FirecrawlTransport:
+    """
+    Runs the synchronous Firecrawl SDK on a bounded thread pool
+
+    The SDK performs blocking HTTP calls, so awaiting it directly inside
+    an ``async def`` stalls the event loop (and every FastAPI request
+    served by it) for the full scrape. Calls are offloaded to a small
+    dedicated pool instead; one client is reused so its HTTP session
+    keeps connections alive between scrapes.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        client: Optional[Any] = None
+    ):
+        self.client = client or FirecrawlApp(api_key=api_key or settings.firecrawl_api_key)
+        self.max_workers = max_workers or settings.firecrawl_max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="firecrawl"
+        )
+
+        self.stats = {
+            'requests': 0,
+            'in_flight': 0,
+            'errors': 0,
+            'batch_jobs': 0,
+            'batch_urls': 0
+        }
+
+    async def scrape(self, url: str, params: Optional[Dict] = None) -> Any:
+        """Scrape a URL without blocking the event loop"""
+
+        return await self._run(functools.partial(self.client.scrape, url, **_sdk_options(params)))
+
+    async def batch_scrape(
+        self,
+        urls: List[str],
+        params: Optional[Dict] = None,
+        poll_interval: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Scrape several URLs as one Firecrawl batch job
+
+        The job is submitted with a single request and then polled;
+        documents are yielded as soon as a poll reports them, so callers
+        can process early completions while the rest of the batch runs.
+        URLs that fail are simply never yielded.
+
+        Args:
+            urls: URLs to scrape
+            params: Scrape parameters in the same form as for scrape()
+            poll_interval: Seconds between status polls
+            timeout: Seconds to wait for the job before giving up
+        """
+
+        if not urls:
+            return
+
+        if poll_interval is None:
+            poll_interval = settings.firecrawl_batch_poll_interval
+        if timeout is None:
+            timeout = settings.firecrawl_batch_timeout
+
+        start = functools.partial(
+            self.client.start_batch_scrape, list(urls), **_sdk_options(params)
+        )
+        job = await self._run(start)
+        self.stats['batch_jobs'] += 1
+        self.stats['batch_urls'] += len(urls)
+
+        deadline = time.monotonic() + timeout
+        delivered = 0
+
+        while True:
+            status = await self._run(self.client.get_batch_scrape_status, job.id)
+
+            # Status responses list every document completed so far
+            documents = status.data or []
+            for document in documents[delivered:]:
+                yield document
+            delivered = max(delivered, len(documents))
+
+            if status.status in BATCH_FINAL_STATES:
+                return
+
+            if time.monotonic() >= deadline:
+                logger.warning(
+                    f"Batch scrape {job.id} timed out with {delivered}/{len(urls)} pages"
+                )
+                return
+
+            await asyncio.sleep(poll_interval)
+
+    async def _run(self, func, *args) -> Any:
+        """Execute a blocking SDK call on the transport's thread pool"""
+
+        loop = asyncio.get_running_loop()
+
+        self.stats['requests'] += 1
+        self.stats['in_flight'] += 1
+        try:
+            return await loop.run_in_executor(self._executor, func, *args)
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        finally:
+            self.stats['in_flight'] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get transport statistics"""
+
+        return {
+            **self.stats,
+            'max_workers': self.max_workers
+        }
+
+    def close(self) -> None:
+        """Shut down the worker threads"""
+
+        self._executor.shutdown(wait=False)
+
+def document_source_url(document: Any) -> Optional[str]:
+    """Get the URL a scraped Firecrawl document was requested for"""
+
+    metadata = getattr(document, 'metadata', None)
+    if metadata is None and isinstance(document, dict):
+        metadata = document.get('metadata')
+    if metadata is None:
+        return None
+
+    if isinstance(metadata, dict):
+        return metadata.get('source_url') or metadata.get('sourceURL') or metadata.get('url')
+    return getattr(metadata, 'source_url', None) or getattr(metadata, 'url', None)
+
+def _sdk_options(params: Optional[Dict]) -> Dict[str, Any]:
+    """Convert camelCase scrape parameters into SDK keyword arguments"""
+
+    return {
+        re.sub(r'(?<!^)(?=[A-Z])', '_', key).lower(): value
+        for key, value in (params or {}).items()
+    }
+
+# Global transport instance shared by all Firecrawl callers
+firecrawl_transport = None
+
+def get_firecrawl_transport() -> FirecrawlTransport:
+    """Get or create the shared Firecrawl transport"""
+    global firecrawl_transport
+    if firecrawl_transport is None:
+        firecrawl_transport = FirecrawlTransport()
+    return firecrawl_transport
+
+def close_firecrawl_transport() -> None:
+    """Shut down the shared Firecrawl transport, if one was created"""
+    global firecrawl_transport
+    if firecrawl_transport is not None:
+        firecrawl_transport.close()
+        firecrawl_transport = None
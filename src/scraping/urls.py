@@ -0,0 +1,91 @@
+"""
+URL canonicalization for scraping, deduplication and cache keying
+"""
+
+import posixpath
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+
+# Query parameters that only track campaigns and never change page content
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'dclid', 'yclid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'igshid', 'ref_src', 'ref_url'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+def resolve_url(url: str, base_url: Optional[str] = None) -> str:
+    """
+    Make a link absolute so it can be fetched
+
+    Resolves ``url`` against the URL of the page it appears on and drops
+    the fragment, leaving scheme, path and query as the site wrote them.
+    """
+
+    url = url.strip()
+    if base_url:
+        url = urljoin(base_url, url)
+    return urldefrag(url)[0]
+
+def canonicalize_url(url: str, base_url: Optional[str] = None) -> str:
+    """
+    Normalize a URL so variants of the same page share one identity
+
+    Resolves relative links against ``base_url``, upgrades http to https,
+    lowercases the host, drops default ports, fragments and tracking
+    parameters, sorts the remaining query and removes trailing slashes.
+    Non-HTTP URLs (mailto:, javascript:, ...) are returned unchanged.
+
+    The result is a key for caching, deduplication and comparison, not
+    an address: fetch the URL as resolved by ``resolve_url`` instead,
+    and resolve links against that, never against the canonical form.
+    """
+
+    url = url.strip()
+    if base_url:
+        url = urljoin(base_url, url)
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url
+
+    try:
+        port = parts.port
+    except ValueError:
+        return url
+
+    host = (parts.hostname or '').rstrip('.')
+    netloc = host
+    if port and str(port) not in DEFAULT_PORTS.values():
+        netloc = f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if path != '/':
+        # Resolve dot segments while keeping a leading slash
+        path = posixpath.normpath(path)
+        if not path.startswith('/'):
+            path = '/' + path
+        path = path.rstrip('/') or '/'
+
+    query_pairs = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(key)
+    ]
+    query = urlencode(sorted(query_pairs))
+
+    return urlunsplit(('https', netloc, path, query, ''))
+
+def is_http_url(url: str) -> bool:
+    """Check whether a URL can be scraped over HTTP(S)"""
+
+    return urlsplit(url.strip()).scheme.lower() in DEFAULT_PORTS
+
+def _is_tracking_param(key: str) -> bool:
+    """Check whether a query parameter is a tracking parameter"""
+
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
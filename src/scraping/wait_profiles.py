@@ -0,0 +1,281 @@
+"""
+Adaptive per-domain waitFor profiles for Firecrawl scrapes
+"""
+
+import logging
+import re
+from typing import Dict, Optional, Any, Tuple
+from urllib.parse import urlparse
+
+from config.settings import settings
+from src.scraping.lru import BoundedLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Starting waitFor (ms) per content type before anything is learned
+DEFAULT_WAITS = {
+    "tutorial": 1000,
+    "documentation": 500,
+    "course": 2000
+}
+
+# Longest wait a profile can grow to, and the shortest non-zero wait
+MAX_WAIT_MS = 8000
+MIN_WAIT_MS = 250
+
+# Consecutive complete scrapes before a shorter wait is tried
+SHORTEN_AFTER = 3
+
+# Consecutive complete scrapes after which a wait known to be too short is retried
+FORGET_FAILED_AFTER = 5 * SHORTEN_AFTER
+
+# Markdown shorter than this is treated as a page that had not rendered yet
+MIN_COMPLETE_CHARS = 200
+
+# Characters a retry at a longer wait must add to show the first scrape was cut short
+MIN_GROWTH_CHARS = 100
+
+# Retries that added nothing after which the completeness check is not trusted for a domain
+MAX_FALSE_ALARMS = 2
+
+# Scrapes between database writes of a profile whose wait did not change
+PERSIST_COUNTERS_EVERY = 10
+
+# Fields whose change is written to the database right away
+LEARNED_FIELDS = ("wait_ms", "is_static", "failed_ms", "false_alarms")
+
+# Approximate memory footprint of one profile in bytes
+PROFILE_SIZE = 256
+
+# Placeholders left behind when client-side rendering had not finished
+INCOMPLETE_MARKERS = re.compile(
+    r'loading\.\.\.|please enable javascript|javascript is required|'
+    r'you need to enable javascript',
+    re.IGNORECASE
+)
+
+# Markup left by client-side frameworks that render after page load
+FRAMEWORK_MARKERS = re.compile(
+    r'__NEXT_DATA__|__NUXT__|id="__nuxt"|id="___gatsby"|data-reactroot|'
+    r'ng-version=|data-v-app|data-server-rendered|data-svelte|ember-application|'
+    r'window\.__INITIAL_STATE__|<script[^>]+type="module"',
+    re.IGNORECASE
+)
+
+def default_wait(content_type: str) -> int:
+    """Get the fixed waitFor used for a content type before any learning"""
+
+    return DEFAULT_WAITS.get(content_type, 0)
+
+def is_complete(markdown: Optional[str]) -> bool:
+    """Check whether scraped markdown looks fully rendered"""
+
+    if not markdown or len(markdown.strip()) < MIN_COMPLETE_CHARS:
+        return False
+    return not INCOMPLETE_MARKERS.search(markdown[:2000])
+
+def _length(markdown: Optional[str]) -> int:
+    """Length of scraped markdown without surrounding whitespace"""
+
+    return len(markdown.strip()) if markdown else 0
+
+def is_static_html(raw_html: Optional[str]) -> bool:
+    """Check whether a page's HTML carries no client-side framework markers"""
+
+    return bool(raw_html) and not FRAMEWORK_MARKERS.search(raw_html)
+
+class WaitProfileStore:
+    """
+    Learns how long Firecrawl has to wait for each domain to render
+
+    The first scrape of a domain also fetches its raw HTML; pages without
+    client-side framework markers are static and get no wait at all.
+    Otherwise the content type's default wait is halved after
+    SHORTEN_AFTER complete scrapes in a row, and doubled as soon as a
+    scrape comes back incomplete.
+
+    Completeness is only a heuristic, and short pages or pages that
+    mention "Loading..." trip it. So a wait is only marked as too short
+    when a retry of the same page at a longer wait returned more content.
+    A retry that added nothing reverts the lengthened wait. After
+    MAX_FALSE_ALARMS such retries in a row, the domain's pages are taken
+    as they come. A wait marked too short is not tried again until
+    FORGET_FAILED_AFTER complete scrapes have passed, so profiles settle
+    instead of oscillating but do not stay inflated forever.
+
+    Profiles are written to the database when what was learned changes;
+    the streak and sample counters alone are written every
+    PERSIST_COUNTERS_EVERY scrapes.
+
+    Priority: memory → database
+    """
+
+    def __init__(self, db_manager=None):
+        self.db = db_manager
+        self.memory_profiles = BoundedLRUCache(
+            max_entries=settings.wait_profile_memory_max_entries,
+            max_bytes=settings.wait_profile_memory_max_bytes,
+            ttl=settings.wait_profile_memory_ttl_seconds
+        )
+
+        self.stats = {
+            "probes": 0,
+            "static_domains": 0,
+            "shortened": 0,
+            "lengthened": 0,
+            "incomplete": 0,
+            "retries": 0,
+            "false_alarms": 0,
+            "wait_saved_ms": 0
+        }
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        """Get the domain a URL's profile is kept under"""
+
+        return urlparse(url).netloc.lower()
+
+    async def get(self, domain: str, content_type: str) -> Optional[Dict[str, Any]]:
+        """Get the learned profile of a domain"""
+
+        key = (domain, content_type)
+        profile = self.memory_profiles.get(key)
+
+        if profile is None and self.db:
+            try:
+                profile = await self.db.get_wait_profile(domain, content_type)
+                if profile:
+                    self.memory_profiles.put(key, profile, PROFILE_SIZE)
+            except Exception as e:
+                logger.warning(f"Database wait profile get error: {e}")
+
+        return profile
+
+    async def plan(self, url: str, content_type: str) -> Tuple[int, bool]:
+        """
+        Choose the waitFor for scraping a URL
+
+        Returns:
+            (wait in ms, whether to fetch raw HTML to probe for a static page)
+        """
+
+        profile = await self.get(self.domain_of(url), content_type)
+        if profile is None:
+            return default_wait(content_type), True
+
+        return profile["wait_ms"], False
+
+    async def observe(
+        self,
+        url: str,
+        content_type: str,
+        wait_ms: int,
+        markdown: Optional[str],
+        raw_html: Optional[str] = None,
+        previous_wait_ms: Optional[int] = None,
+        previous_markdown: Optional[str] = None
+    ) -> bool:
+        """
+        Learn from a finished scrape
+
+        Args:
+            previous_wait_ms: For a retry, the shorter wait of the first attempt
+            previous_markdown: For a retry, the markdown of the first attempt
+
+        Returns:
+            Whether the scraped markdown was complete
+        """
+
+        domain = self.domain_of(url)
+        default = default_wait(content_type)
+        stored = await self.get(domain, content_type)
+        profile = dict(stored) if stored else {
+            "wait_ms": default,
+            "is_static": False,
+            "failed_ms": -1,
+            "streak": 0,
+            "samples": 0,
+            "false_alarms": 0
+        }
+        profile.setdefault("false_alarms", 0)
+
+        complete = is_complete(markdown)
+        profile["samples"] += 1
+        if raw_html is not None:
+            self.stats["probes"] += 1
+
+        if previous_wait_ms is not None:
+            if _length(markdown) >= _length(previous_markdown) + MIN_GROWTH_CHARS:
+                # Waiting longer rendered more: the shorter wait really is too short
+                profile["failed_ms"] = max(profile["failed_ms"], previous_wait_ms)
+                profile["false_alarms"] = 0
+            else:
+                # Waiting longer added nothing: the page is just short
+                profile["false_alarms"] += 1
+                profile["wait_ms"] = min(profile["wait_ms"], max(previous_wait_ms, 0))
+                self.stats["false_alarms"] += 1
+                complete = True
+        elif not complete and profile["false_alarms"] >= MAX_FALSE_ALARMS:
+            complete = True
+
+        if not complete:
+            self.stats["incomplete"] += 1
+            profile["streak"] = 0
+            if wait_ms >= profile["wait_ms"]:
+                profile["wait_ms"] = min(MAX_WAIT_MS, max(MIN_WAIT_MS, wait_ms * 2))
+                profile["is_static"] = False
+                self.stats["lengthened"] += 1
+
+        elif raw_html is not None and is_static_html(raw_html) and profile["failed_ms"] < 0:
+            if not profile["is_static"]:
+                self.stats["static_domains"] += 1
+            profile["wait_ms"] = 0
+            profile["is_static"] = True
+
+        elif wait_ms == profile["wait_ms"] and wait_ms > 0:
+            profile["streak"] += 1
+            shorter = wait_ms // 2 if wait_ms // 2 >= MIN_WAIT_MS else 0
+            if profile["streak"] >= FORGET_FAILED_AFTER:
+                profile["failed_ms"] = -1
+            if profile["streak"] >= SHORTEN_AFTER and shorter > profile["failed_ms"]:
+                profile["wait_ms"] = shorter
+                profile["streak"] = 0
+                self.stats["shortened"] += 1
+
+        if complete:
+            self.stats["wait_saved_ms"] += max(0, default - wait_ms)
+
+        self.memory_profiles.put((domain, content_type), profile, PROFILE_SIZE)
+
+        learned = stored is None or any(
+            profile[field] != stored.get(field) for field in LEARNED_FIELDS
+        )
+        if self.db and (learned or profile["samples"] % PERSIST_COUNTERS_EVERY == 0):
+            try:
+                await self.db.set_wait_profile(
+                    domain=domain,
+                    content_type=content_type,
+                    wait_ms=profile["wait_ms"],
+                    is_static=profile["is_static"],
+                    failed_ms=profile["failed_ms"],
+                    streak=profile["streak"],
+                    samples=profile["samples"],
+                    false_alarms=profile["false_alarms"]
+                )
+            except Exception as e:
+                logger.warning(f"Database wait profile save error: {e}")
+
+        return complete
+
+    def record_retry(self) -> None:
+        """Count a page re-scraped after a shortened wait came back incomplete"""
+
+        self.stats["retries"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get wait adaptation statistics"""
+
+        return {
+            **self.stats,
+            "profiles": len(self.memory_profiles)
+        }
@@ -1,75 +1,126 @@
 import asyncio
-from typing import List, Dict, Any
-from firecrawl import FirecrawlApp
+from typing import Iterable, List, Dict, Any, Optional
 from exa_py import Exa
 from tavily import TavilyClient
 from config.settings import settings
+from src.scraping.transport import document_source_url, get_firecrawl_transport
+
+PROVIDERS = ("tavily", "exa", "firecrawl")
 
 class DataCollector:
     def __init__(self):
-        self.firecrawl = FirecrawlApp(api_key=settings.firecrawl_api_key)
+        self.firecrawl = get_firecrawl_transport()
         self.exa = Exa(api_key=settings.exa_api_key)
         self.tavily = TavilyClient(api_key=settings.tavily_api_key)
+        
+        self.stats = {
+            "requests": {provider: 0 for provider in PROVIDERS},
+            "errors": {provider: 0 for provider in PROVIDERS}
+        }
     
-    async def collect_web_data(self, query: str, max_results: int = 10) -> Dict[str, Any]:
-        """Collect data using all three tools"""
+    async def collect_web_data(
+        self,
+        query: str,
+        max_results: int = 10,
+        providers: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """Collect data using the requested tools (all three by default)"""
+        providers = set(providers or PROVIDERS)
         results = {
             "firecrawl_data": [],
             "exa_data": [],
             "tavily_data": []
         }
         
-        # Tavily Research (best for current/comprehensive info)
+        # Tavily and Exa are independent, so query them concurrently
+        searches = []
+        if "tavily" in providers:
+            searches.append(self._search_tavily(query, max_results))
+        if "exa" in providers:
+            searches.append(self._search_exa(query, max_results))
+        
+        for key, data in await asyncio.gather(*searches):
+            results[key] = data
+        
+        if "firecrawl" in providers:
+            results["firecrawl_data"] = await self._scrape_top_urls(results)
+        
+        return results
+    
+    async def _search_tavily(self, query: str, max_results: int):
+        """Tavily Research (best for current/comprehensive info)"""
+        self.stats["requests"]["tavily"] += 1
         try:
-            tavily_response = self.tavily.search(
+            tavily_response = await asyncio.to_thread(
+                self.tavily.search,
                 query=query,
                 search_depth="advanced",
                 max_results=max_results
             )
-            results["tavily_data"] = tavily_response.get("results", [])
+            return "tavily_data", tavily_response.get("results", [])
         except Exception as e:
+            self.stats["errors"]["tavily"] += 1
             print(f"Tavily error: {e}")
-        
-        # Exa Semantic Search (best for finding similar content)
+            return "tavily_data", []
+    
+    async def _search_exa(self, query: str, max_results: int):
+        """Exa Semantic Search (best for finding similar content)"""
+        self.stats["requests"]["exa"] += 1
         try:
-            exa_response = self.exa.search(
+            exa_response = await asyncio.to_thread(
+                self.exa.search,
                 query=query,
-                num_results=max_results,
-                include_text=["summary"]
+                num_results=max_results
             )
-            results["exa_data"] = [
+            return "exa_data", [
                 {
                     "url": result.url,
                     "title": result.title,
-                    "text": result.summary,
-                    "summary": result.summary
+                    "text": getattr(result, "summary", None) or getattr(result, "text", None) or "",
+                    "summary": getattr(result, "summary", None)
                 }
                 for result in exa_response.results
             ]
         except Exception as e:
+            self.stats["errors"]["exa"] += 1
             print(f"Exa error: {e}")
-        
-        # Firecrawl for specific URLs (best for deep scraping)
+            return "exa_data", []
+    
+    async def _scrape_top_urls(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Firecrawl for specific URLs (best for deep scraping)"""
         urls_to_scrape = []
         for source in [results["tavily_data"], results["exa_data"]]:
             for item in source[:3]:  # Top 3 from each
                 if isinstance(item, dict) and "url" in item:
                     urls_to_scrape.append(item["url"])
         
-        for url in urls_to_scrape[:5]:  # Limit to 5 URLs
-            try:
-                scraped = self.firecrawl.scrape(url)
+        if not urls_to_scrape:
+            return []
+        
+        # Scrape the top URLs (limit 5) as a single batch job
+        scraped_pages = []
+        self.stats["requests"]["firecrawl"] += 1
+        try:
+            async for scraped in self.firecrawl.batch_scrape(urls_to_scrape[:5]):
                 if hasattr(scraped, 'markdown') and scraped.markdown:
-                    results["firecrawl_data"].append({
-                        "url": url,
+                    scraped_pages.append({
+                        "url": document_source_url(scraped),
                         "markdown": scraped.markdown,
-                        "title": getattr(scraped, 'title', ''),
+                        "title": getattr(scraped.metadata, 'title', '') or '',
                         "content": scraped.markdown
                     })
-            except Exception as e:
-                print(f"Firecrawl error for {url}: {e}")
+        except Exception as e:
+            self.stats["errors"]["firecrawl"] += 1
+            print(f"Firecrawl batch error: {e}")
         
-        return results
+        return scraped_pages
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-provider request statistics"""
+        return {
+            "requests": dict(self.stats["requests"]),
+            "errors": dict(self.stats["errors"])
+        }
 
     def unified_content_extraction(self, collected_data: Dict[str, Any]) -> List[Dict[str, str]]:
         """Extract and unify content from all sources"""
@@ -97,12 +148,21 @@ class DataCollector:
         
         # Process Firecrawl data
         for item in collected_data["firecrawl_data"]:
-            if item.get("success"):
-                unified_content.append({
-                    "source": "firecrawl",
-                    "title": item.get("metadata", {}).get("title", ""),
-                    "content": item.get("markdown", ""),
-                    "url": item.get("metadata", {}).get("sourceURL", "")
-                })
+            unified_content.append({
+                "source": "firecrawl",
+                "title": item.get("title", ""),
+                "content": item.get("markdown", ""),
+                "url": item.get("url", "")
+            })
         
-        return unified_content
\ No newline at end of file
+        return unified_content
+
+# Global collector instance
+data_collector = None
+
+def get_data_collector() -> DataCollector:
+    """Get or create the shared data collector"""
+    global data_collector
+    if data_collector is None:
+        data_collector = DataCollector()
+    return data_collector
@@ -0,0 +1,119 @@
+"""
+Shared process pool for CPU-bound text processing off the event loop
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class ProcessPool:
+    """
+    Runs CPU-bound functions in worker processes
+
+    Regex scans, hashing and chunking of large pages hold the GIL, so a
+    thread pool would not keep the event loop responsive; a process pool
+    does. Inputs smaller than ``inline_threshold`` characters run inline,
+    where the work is cheaper than pickling it to a worker. Workers are
+    spawned on first use and the pool is shared by all callers.
+
+    Functions must be module-level (picklable) and pure.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, inline_threshold: Optional[int] = None):
+        self.max_workers = max_workers or settings.process_pool_max_workers or os.cpu_count() or 1
+        self.inline_threshold = (
+            settings.process_pool_inline_chars if inline_threshold is None else inline_threshold
+        )
+        self._executor = None
+
+        self.stats = {
+            "inline": 0,
+            "offloaded": 0,
+            "in_flight": 0,
+            "errors": 0,
+            "restarts": 0
+        }
+
+    async def run(self, func: Callable, *args, size: int = 0) -> Any:
+        """
+        Run func(*args), in a worker process if the input is large
+
+        Args:
+            func: Module-level function to call
+            size: Input size in characters, compared to inline_threshold
+        """
+
+        if size < self.inline_threshold:
+            self.stats["inline"] += 1
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+
+        self.stats["offloaded"] += 1
+        self.stats["in_flight"] += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool and do this call inline
+            logger.warning("Process pool broke, restarting it")
+            self.stats["restarts"] += 1
+            self._executor = None
+            return func(*args)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.stats["in_flight"] -= 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the worker processes on first use"""
+
+        if self._executor is None:
+            # Spawn rather than fork: the parent runs threads (Firecrawl
+            # transport, asyncpg) that must not be forked mid-operation
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get process pool statistics"""
+
+        return {
+            **self.stats,
+            "max_workers": self.max_workers,
+            "inline_threshold": self.inline_threshold
+        }
+
+    def close(self) -> None:
+        """Shut down the worker processes"""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Global pool instance shared by all CPU-bound callers
+process_pool = None
+
+def get_process_pool() -> ProcessPool:
+    """Get or create the shared process pool"""
+    global process_pool
+    if process_pool is None:
+        process_pool = ProcessPool()
+    return process_pool
+
+def close_process_pool() -> None:
+    """Shut down the shared process pool, if one was created"""
+    global process_pool
+    if process_pool is not None:
+        process_pool.close()
+        process_pool = None
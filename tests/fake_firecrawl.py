@@ -0,0 +1,90 @@
+"""
+Local stand-in for the Firecrawl v2 batch scrape API
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeFirecrawlServer:
+    """
+    Serves POST /v2/batch/scrape and GET /v2/batch/scrape/<id> over HTTP
+
+    Each status poll completes one more page of the job, in submission
+    order, so clients see documents arrive incrementally. URLs missing
+    from ``pages`` fail and never appear in the job's data.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.jobs = {}
+        self.requests = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                server.requests.append(('POST', self.path, body))
+
+                if self.path != '/v2/batch/scrape':
+                    return self.reply(404, {'success': False, 'error': 'Not found'})
+
+                job_id = f"job-{len(server.jobs) + 1}"
+                server.jobs[job_id] = {'urls': body['urls'], 'polls': 0}
+                self.reply(200, {'success': True, 'id': job_id, 'url': f"/v2/batch/scrape/{job_id}"})
+
+            def do_GET(self):
+                server.requests.append(('GET', self.path, None))
+
+                job = server.jobs.get(self.path.rsplit('/', 1)[-1])
+                if job is None:
+                    return self.reply(404, {'success': False, 'error': 'Unknown job'})
+
+                job['polls'] += 1
+                finished = job['urls'][:job['polls']]
+                data = [
+                    {
+                        'markdown': server.pages[url],
+                        'metadata': {'sourceURL': url, 'title': url, 'statusCode': 200}
+                    }
+                    for url in finished if url in server.pages
+                ]
+                done = len(finished) == len(job['urls'])
+
+                self.reply(200, {
+                    'success': True,
+                    'status': 'completed' if done else 'scraping',
+                    'completed': len(finished),
+                    'total': len(job['urls']),
+                    'creditsUsed': len(data),
+                    'data': data
+                })
+
+            def reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def count(self, method):
+        """Number of requests received with an HTTP method"""
+        return sum(1 for request in self.requests if request[0] == method)
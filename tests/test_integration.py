@@ -29,8 +29,15 @@ class TestDataCollector:
         assert isinstance(data["exa_data"], list)
         assert isinstance(data["firecrawl_data"], list)
     
-    def test_content_extraction(self):
-        """Test unified content extraction"""
+    @pytest.mark.asyncio
+    async def test_content_extraction(self, monkeypatch):
+        """Test unified content extraction, with Firecrawl pages as the transport returns them"""
+        from firecrawl import FirecrawlApp
+        from config.settings import settings
+        from src.scraping.transport import FirecrawlTransport
+        from tests.fake_firecrawl import FakeFirecrawlServer
+        monkeypatch.setattr(settings, "firecrawl_batch_poll_interval", 0.01)
+        
         collector = DataCollector()
         
         # Mock data
@@ -40,22 +47,27 @@ class TestDataCollector:
             ],
             "exa_data": [
                 {"title": "Exa Title", "text": "Exa content", "url": "http://exa.com"}
-            ],
-            "firecrawl_data": [
-                {
-                    "success": True,
-                    "markdown": "Firecrawl content",
-                    "metadata": {"title": "FC Title", "sourceURL": "http://fc.com"}
-                }
             ]
         }
         
+        # Firecrawl v2 documents from a batch job over the top search results
+        with FakeFirecrawlServer({"http://test.com": "Firecrawl content"}) as server:
+            client = FirecrawlApp(api_key="fc-test", api_url=server.url)
+            collector.firecrawl = FirecrawlTransport(client=client, max_workers=1)
+            sample_data["firecrawl_data"] = await collector._scrape_top_urls(sample_data)
+            collector.firecrawl.close()
+        
         unified = collector.unified_content_extraction(sample_data)
         
         assert len(unified) == 3
         assert unified[0]["source"] == "tavily"
         assert unified[1]["source"] == "exa"
-        assert unified[2]["source"] == "firecrawl"
+        assert unified[2] == {
+            "source": "firecrawl",
+            "title": "http://test.com",
+            "content": "Firecrawl content",
+            "url": "http://test.com"
+        }
 
 class TestKnowledgeBase:
     """Test the KnowledgeBase functionality"""
@@ -0,0 +1,2090 @@
+import pytest
+import asyncio
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.scraping.core import EducationalScraper
+
+
+@pytest.fixture
+def scraper(monkeypatch, tmp_path):
+    """EducationalScraper with its file cache isolated in a temp directory"""
+    monkeypatch.chdir(tmp_path)
+    return EducationalScraper()
+
+
+def make_site(links):
+    """Build a fake _scrape_educational_page over a {url: [linked urls]} graph"""
+
+    async def fake_scrape(url, content_type):
+        if url not in links:
+            return {'url': url, 'content': None, 'error': 'No content extracted'}
+        markdown = "\n".join(f"[Tutorial {target}]({target})" for target in links[url])
+        return {'url': url, 'content': {'markdown': markdown}, 'error': None}
+
+    return fake_scrape
+
+
+class FakeFingerprintDatabase:
+    """In-memory stand-in for the page_fingerprints methods of DatabaseManager"""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def set_page_fingerprint(self, url, content_type, fingerprint, result, etag, last_modified, analysis_cost):
+        self.rows[(url, content_type)] = {
+            'fingerprint': fingerprint, 'etag': etag, 'last_modified': last_modified,
+            'result': result, 'analysis_cost': analysis_cost
+        }
+
+    async def get_page_fingerprint(self, url, content_type):
+        row = self.rows.get((url, content_type))
+        return dict(row) if row else None
+
+    async def touch_page_fingerprint(self, url, content_type):
+        pass
+
+    async def mark_lead_scraped(self, url):
+        pass
+
+
+class TestEducationalCrawler:
+    """Test the breadth-first crawl frontier"""
+
+    SITE = {
+        "https://example.com/": ["https://example.com/a", "https://example.com/b"],
+        "https://example.com/a": ["https://example.com/a1", "https://example.com/b"],
+        "https://example.com/b": ["https://example.com/b1", "https://example.com/"],
+        "https://example.com/a1": ["https://example.com/deep"],
+        "https://example.com/b1": [],
+        "https://example.com/deep": [],
+    }
+
+    async def crawl(self, scraper, monkeypatch, **kwargs):
+        from src.scraping.crawler import EducationalCrawler
+
+        fake_scrape = make_site(self.SITE)
+        monkeypatch.setattr(scraper, "_scrape_educational_page", fake_scrape)
+        root = await fake_scrape("https://example.com/", "tutorial")
+
+        crawler = EducationalCrawler(scraper, **kwargs)
+        pages = await crawler.crawl("https://example.com/", root['content'])
+        return crawler, pages
+
+    @pytest.mark.asyncio
+    async def test_breadth_first_order_honors_depth(self, scraper, monkeypatch):
+        """Each level is finished before the next, and depth bounds the crawl"""
+        crawler, pages = await self.crawl(scraper, monkeypatch, max_depth=3, max_pages=10)
+
+        assert [page['url'] for page in pages] == [
+            "https://example.com/a", "https://example.com/b",
+            "https://example.com/a1", "https://example.com/b1",
+        ]
+        assert [page['depth'] for page in pages] == [2, 2, 3, 3]
+        assert crawler.stats['stop_reason'] == 'exhausted'
+
+    @pytest.mark.asyncio
+    async def test_max_pages_stops_crawl(self, scraper, monkeypatch):
+        crawler, pages = await self.crawl(scraper, monkeypatch, max_depth=4, max_pages=3)
+
+        assert len(pages) == 3
+        assert crawler.stats['stop_reason'] == 'max_pages'
+
+    @pytest.mark.asyncio
+    async def test_cost_budget_stops_crawl(self, scraper, monkeypatch):
+        crawler, pages = await self.crawl(
+            scraper, monkeypatch, max_depth=4, max_pages=10,
+            cost_budget=0.0025, cost_per_page=0.001
+        )
+
+        assert len(pages) == 2
+        assert crawler.stats['stop_reason'] == 'cost_budget'
+
+    @pytest.mark.asyncio
+    async def test_per_domain_limit_caps_concurrency(self, scraper, monkeypatch):
+        """Later URLs finishing first must not reorder the crawl results"""
+        from src.scraping.crawler import EducationalCrawler
+
+        urls = [f"https://example.com/lesson-{i}" for i in range(5)]
+        in_flight = 0
+        peak = 0
+
+        async def fake_scrape(url, content_type):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            # Earlier URLs take longer so completion order is reversed
+            await asyncio.sleep(0.01 * (len(urls) - urls.index(url)))
+            in_flight -= 1
+            return {'url': url, 'content': {'markdown': ''}, 'error': None}
+
+        monkeypatch.setattr(scraper, "_scrape_educational_page", fake_scrape)
+        root = {'markdown': "\n".join(f"[Lesson {url}]({url})" for url in urls)}
+
+        crawler = EducationalCrawler(scraper, max_concurrency=5, per_domain_limit=2)
+        streamed = [page['url'] async for page in crawler.iter_pages("https://example.com/", root)]
+
+        crawler = EducationalCrawler(scraper, max_concurrency=5, per_domain_limit=2)
+        pages = await crawler.crawl("https://example.com/", root)
+
+        assert streamed != urls
+        assert [page['url'] for page in pages] == urls
+        assert [page['index'] for page in pages] == [1, 2, 3, 4, 5]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_stopping_early_cancels_and_awaits_pending_scrapes(self, scraper, monkeypatch):
+        from src.scraping.crawler import EducationalCrawler
+
+        urls = [f"https://example.com/lesson-{i}" for i in range(4)]
+        cancelled = []
+
+        async def fake_scrape(url, content_type):
+            try:
+                await asyncio.sleep(0 if url == urls[0] else 10)
+            except asyncio.CancelledError:
+                cancelled.append(url)
+                raise
+            return {'url': url, 'content': {'markdown': ''}, 'error': None}
+
+        monkeypatch.setattr(scraper, "_scrape_educational_page", fake_scrape)
+        root = {'markdown': "\n".join(f"[Lesson {url}]({url})" for url in urls)}
+
+        crawler = EducationalCrawler(scraper, max_concurrency=4, per_domain_limit=4)
+        pages = crawler.iter_pages("https://example.com/", root)
+        assert (await pages.__anext__())['url'] == urls[0]
+        await pages.aclose()
+
+        assert sorted(cancelled) == urls[1:]
+
+
+class TestStreamingScrape:
+    """Test the page-by-page streaming scrape API"""
+
+    @pytest.fixture
+    def site_scraper(self, scraper, monkeypatch):
+        async def fake_metadata(content, content_type, url=None):
+            scraper.stats['total_cost'] += 0.005
+            return {'difficulty_level': 'beginner', 'related_topics': ['python']}, 0.005
+
+        monkeypatch.setattr(
+            scraper, "_scrape_educational_page", make_site(TestEducationalCrawler.SITE)
+        )
+        monkeypatch.setattr(scraper, "_extract_educational_metadata", fake_metadata)
+        return scraper
+
+    @pytest.mark.asyncio
+    async def test_root_page_is_yielded_first_with_metadata(self, site_scraper):
+        pages = [
+            page async for page in site_scraper.iter_educational_content(
+                "https://example.com/", depth=3
+            )
+        ]
+
+        assert pages[0]['index'] == 0
+        assert pages[0]['metadata']['difficulty_level'] == 'beginner'
+        assert pages[0]['cost'] == pytest.approx(0.005)
+        assert sorted(page['index'] for page in pages) == [0, 1, 2, 3, 4]
+        assert all(page['metadata'] is None for page in pages[1:])
+
+    @pytest.mark.asyncio
+    async def test_per_depth_limit_and_root_scrape_cost_reach_the_crawl(self, site_scraper):
+        limited = [
+            page['url'] async for page in site_scraper.iter_educational_content(
+                "https://example.com/", depth=3, per_depth_limit=1
+            )
+        ]
+        assert limited == ["https://example.com/", "https://example.com/a", "https://example.com/a1"]
+
+        # Analysis (0.005) and the root scrape (0.001) leave room for one more page
+        budgeted = [
+            page['url'] async for page in site_scraper.iter_educational_content(
+                "https://example.com/b", depth=3, cost_budget=0.0075, max_concurrency=1
+            )
+        ]
+        assert budgeted == ["https://example.com/b", "https://example.com/b1"]
+
+    @pytest.mark.asyncio
+    async def test_collected_result_matches_stream_and_replays_from_cache(self, site_scraper):
+        result = await site_scraper.scrape_educational_content("https://example.com/", depth=3)
+
+        assert result['pages_scraped'] == 5
+        assert result['crawled_urls'][:3] == [
+            "https://example.com/", "https://example.com/a", "https://example.com/b"
+        ]
+        assert result['difficulty_level'] == 'beginner'
+        assert result['total_cost'] == pytest.approx(0.009)
+
+        replayed = [
+            page async for page in site_scraper.iter_educational_content(
+                "https://example.com/", depth=3
+            )
+        ]
+        assert all(page['cached'] for page in replayed)
+        assert [page['url'] for page in replayed] == result['crawled_urls']
+
+        cached = await site_scraper.scrape_educational_content("https://example.com/", depth=3)
+        assert cached == result
+        assert site_scraper.stats['cache_hits'] == 1
+
+
+class TestIncrementalRecrawl:
+    """Test fingerprint and validator based revalidation"""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_page_skips_analysis_and_extends_cache(self, scraper, monkeypatch):
+        markdown = {'text': "# Loops\nLoops repeat code."}
+        analyses = 0
+
+        async def fake_scrape(url, content_type):
+            return {'url': url, 'content': {'markdown': markdown['text']}, 'error': None}
+
+        async def fake_metadata(content, content_type, url=None):
+            nonlocal analyses
+            analyses += 1
+            scraper.stats['total_cost'] += 0.004
+            return {'difficulty_level': 'beginner'}, 0.004
+
+        monkeypatch.setattr(scraper, "_scrape_educational_page", fake_scrape)
+        monkeypatch.setattr(scraper, "_extract_educational_metadata", fake_metadata)
+        scraper.fingerprints.db = FakeFingerprintDatabase()
+        url = "https://example.com/loops"
+
+        first = await scraper.scrape_educational_content(url)
+
+        # Expire the cache; whitespace-only edits keep the fingerprint
+        await scraper.cache.invalidate(url, "educational_tutorial")
+        markdown['text'] = "# Loops\n\nLoops  repeat code.\n"
+        second = await scraper.scrape_educational_content(url)
+
+        assert analyses == 1
+        assert second == first
+        assert await scraper.cache.get(url, "educational_tutorial") == first
+        stats = scraper.get_stats()['fingerprint_stats']
+        assert stats['unchanged'] == 1
+        assert stats['estimated_savings'] == "$0.0040"
+
+        await scraper.cache.invalidate(url, "educational_tutorial")
+        markdown['text'] = "# Loops\nLoops repeat code. Now with while loops."
+        await scraper.scrape_educational_content(url)
+
+        assert analyses == 2
+        assert scraper.get_stats()['fingerprint_stats']['changed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_memory_keeps_fingerprints_without_results(self, monkeypatch):
+        from config.settings import settings
+        from src.scraping.fingerprint import FingerprintStore
+        monkeypatch.setattr(settings, "fingerprint_memory_max_entries", 2)
+
+        store = FingerprintStore()
+        for page in ("a", "b", "c"):
+            await store.record(f"https://example.com/{page}", "tutorial", page, {'page': page})
+
+        assert await store.get("https://example.com/a", "tutorial") is None
+        record = await store.get("https://example.com/c", "tutorial")
+        assert "result" not in record
+        assert store.get_stats()['memory_evictions'] == 1
+
+        # Without a database the previous result is gone, so nothing is reused
+        assert await store.load_result("https://example.com/c", "tutorial", record) is None
+        store.db = FakeFingerprintDatabase()
+        await store.record("https://example.com/c", "tutorial", "c", {'page': 'c'})
+        assert await store.load_result("https://example.com/c", "tutorial", record) == {'page': 'c'}
+
+    @pytest.mark.asyncio
+    async def test_conditional_request_detects_not_modified(self, monkeypatch):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from config.settings import settings
+        from src.scraping.fingerprint import FingerprintStore
+        monkeypatch.setattr(settings, "revalidation_allow_private_hosts", True)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                unchanged = self.headers.get('If-None-Match') == '"v1"'
+                self.send_response(304 if unchanged else 200)
+                self.send_header('ETag', '"v2"')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{httpd.server_address[1]}/page"
+        store = FingerprintStore()
+
+        try:
+            validators = store.extract_validators({'ETag': '"v1"'})
+            assert await store.is_not_modified(url, validators)
+            assert not await store.is_not_modified(url, {'etag': '"v0"', 'last_modified': None})
+            assert not await store.is_not_modified(url, {'etag': None, 'last_modified': None})
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+        assert store.get_stats()['not_modified'] == 1
+
+    @pytest.mark.asyncio
+    async def test_conditional_request_refuses_internal_targets(self, monkeypatch):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from config.settings import settings
+        from src.scraping.fingerprint import FingerprintStore
+
+        requests = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                requests.append(self.path)
+                if self.path == '/moved':
+                    self.send_response(302)
+                    self.send_header('Location', '/page')
+                else:
+                    self.send_response(304)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        store = FingerprintStore()
+        validators = {'etag': '"v1"', 'last_modified': None}
+
+        try:
+            # Loopback and non-http(s) targets are never contacted
+            assert not await store.is_not_modified(f"{base}/page", validators)
+            assert not await store.is_not_modified("file:///etc/passwd", validators)
+            assert requests == []
+
+            # Redirects are not followed
+            monkeypatch.setattr(settings, "revalidation_allow_private_hosts", True)
+            assert not await store.is_not_modified(f"{base}/moved", validators)
+            assert requests == ['/moved']
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent scrapes"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_scrapes_of_one_url_share_a_single_call(self, scraper, monkeypatch):
+        scrapes = 0
+        analyses = 0
+
+        async def fake_scrape(url, content_type):
+            nonlocal scrapes
+            scrapes += 1
+            await asyncio.sleep(0.02)
+            return {'url': url, 'content': {'markdown': '# Loops'}, 'error': None}
+
+        async def fake_metadata(content, content_type, url=None):
+            nonlocal analyses
+            analyses += 1
+            return {'difficulty_level': 'beginner'}, 0.0
+
+        monkeypatch.setattr(scraper, "_scrape_educational_page", fake_scrape)
+        monkeypatch.setattr(scraper, "_extract_educational_metadata", fake_metadata)
+
+        results = await asyncio.gather(
+            scraper.scrape_educational_content("https://example.com/loops"),
+            scraper.scrape_educational_content("https://example.com/loops#intro"),
+            scraper.scrape_educational_content("http://example.com/loops/"),
+        )
+
+        assert scrapes == analyses == 1
+        assert results[0] == results[1] == results[2]
+        # Followers get their own copy of the shared result
+        results[1]['related_topics'].append('mutated')
+        assert results[0]['related_topics'] == []
+        assert scraper.single_flight.get_stats() == {'leaders': 1, 'followers': 2, 'in_flight': 0}
+
+    @pytest.mark.asyncio
+    async def test_leader_errors_reach_followers_and_release_the_key(self):
+        from src.scraping.singleflight import SingleFlight
+
+        flight = SingleFlight()
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        outcomes = await asyncio.gather(
+            flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+        )
+
+        assert calls == 1
+        assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+        assert flight.in_flight() == 0
+
+        async def succeeding():
+            return "ok"
+
+        assert await flight.do("key", succeeding) == "ok"
+
+
+class FakeLockPool:
+    """Stand-in for the asyncpg lock pools of every process sharing one database"""
+
+    def __init__(self, size):
+        self.free = size
+        # lock_id -> [session holding it, re-entrant hold count]
+        self.held = {}
+
+    async def acquire(self, timeout=None):
+        if not self.free:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        self.free -= 1
+        return FakeLockConnection(self)
+
+    async def release(self, conn):
+        # Resetting a session drops its advisory locks
+        for lock_id, (holder, _) in list(self.held.items()):
+            if holder is conn:
+                del self.held[lock_id]
+        self.free += 1
+
+    async def close(self):
+        pass
+
+
+class FakeLockConnection:
+    """Session with Postgres' re-entrant advisory lock semantics"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def fetchval(self, query, lock_id):
+        await asyncio.sleep(0)
+        holder, count = self.pool.held.get(lock_id, (self, 0))
+        if "unlock" in query:
+            if holder is not self or not count:
+                return False
+            if count == 1:
+                del self.pool.held[lock_id]
+            else:
+                self.pool.held[lock_id] = [self, count - 1]
+            return True
+        if holder is not self:
+            return False
+        self.pool.held[lock_id] = [self, count + 1]
+        return True
+
+
+class TestAdvisoryLock:
+    """Test cross-process coalescing through Postgres advisory locks"""
+
+    @pytest.fixture
+    def make_db(self, monkeypatch):
+        from config.settings import settings
+        from src.database.connection import DatabaseManager
+        monkeypatch.setattr(settings, "db_advisory_lock_poll_interval", 0.01)
+        pool = FakeLockPool(size=2)
+
+        def make_db():
+            db = DatabaseManager()
+            db.lock_pool = pool
+            return db
+
+        return make_db
+
+    @pytest.mark.asyncio
+    async def test_locks_of_one_process_share_a_single_session(self, make_db):
+        first_process, second_process = make_db(), make_db()
+        order = []
+
+        async def worker(db, name, key, hold):
+            async with db.advisory_lock(key) as locked:
+                order.append((name, locked))
+                await asyncio.sleep(hold)
+
+        # One process scrapes many pages at once; another waits for one of them
+        holders = [
+            asyncio.create_task(worker(first_process, f"first-{i}", f"page-{i}", 0.1))
+            for i in range(6)
+        ]
+        await asyncio.sleep(0.02)
+        waiter = asyncio.create_task(worker(second_process, "second", "page-0", 0))
+        await asyncio.sleep(0.05)
+
+        assert len(order) == 6 and all(locked for _, locked in order)
+        assert first_process.lock_pool.free == 0
+        await asyncio.gather(*holders, waiter)
+
+        assert order[-1] == ("second", True)
+        assert not first_process.lock_pool.held
+
+    @pytest.mark.asyncio
+    async def test_same_key_waits_within_a_process(self, make_db):
+        db = make_db()
+        order = []
+
+        async def worker(name, hold):
+            async with db.advisory_lock("page") as locked:
+                order.append((name, "start", locked))
+                await asyncio.sleep(hold)
+                order.append((name, "end", locked))
+
+        await asyncio.gather(worker("first", 0.05), worker("second", 0))
+
+        assert order == [
+            ("first", "start", True), ("first", "end", True),
+            ("second", "start", True), ("second", "end", True)
+        ]
+        assert not db.lock_pool.held
+
+    @pytest.mark.asyncio
+    async def test_timeout_runs_unlocked_and_body_errors_propagate(self, make_db):
+        db = make_db()
+        async with db.advisory_lock("page") as locked:
+            async with db.advisory_lock("page", timeout=0.05) as contended:
+                assert locked and not contended
+
+        with pytest.raises(RuntimeError):
+            async with db.advisory_lock("page"):
+                raise RuntimeError("scrape failed")
+
+        assert not db.lock_pool.held
+
+        await db.disconnect()
+        assert db.lock_pool.free == 2
+
+    @pytest.mark.asyncio
+    async def test_scrape_runs_once_whether_or_not_the_lock_is_taken(self, scraper, monkeypatch):
+        from contextlib import asynccontextmanager
+        scrapes = []
+
+        async def fake_collect(url, content_type, crawl_options):
+            scrapes.append(url)
+            raise RuntimeError("Firecrawl unavailable")
+
+        class FakeDatabase:
+            def __init__(self, acquired):
+                self.acquired = acquired
+
+            @asynccontextmanager
+            async def advisory_lock(self, key):
+                yield self.acquired
+
+        monkeypatch.setattr(scraper, "_collect_educational_content", fake_collect)
+        for acquired in (True, False):
+            scraper.db = FakeDatabase(acquired)
+            with pytest.raises(RuntimeError):
+                await scraper.scrape_educational_content("https://example.com/loops")
+
+        assert len(scrapes) == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_entry_is_persisted_before_the_lock_is_released(self, monkeypatch, tmp_path):
+        from contextlib import asynccontextmanager
+        monkeypatch.chdir(tmp_path)
+        scrapes = 0
+
+        class SharedDatabase(FakeFingerprintDatabase):
+            """One database behind two processes' scrapers"""
+
+            def __init__(self):
+                super().__init__()
+                self.lock = asyncio.Lock()
+                self.cache = {}
+
+            @asynccontextmanager
+            async def advisory_lock(self, key):
+                async with self.lock:
+                    yield True
+
+            async def set_cache_many(self, entries):
+                for entry in entries:
+                    self.cache[entry['cache_key']] = entry['data']
+
+            async def get_cache_entry(self, cache_key):
+                if cache_key not in self.cache:
+                    return None
+                return {'data': self.cache[cache_key], 'age_seconds': 0, 'expires_in_seconds': 3600}
+
+        async def fake_scrape(url, content_type):
+            nonlocal scrapes
+            scrapes += 1
+            await asyncio.sleep(0.02)
+            return {'url': url, 'content': {'markdown': '# Loops'}, 'error': None}
+
+        async def fake_metadata(content, content_type, url=None):
+            return {'difficulty_level': 'beginner'}, 0.0
+
+        db = SharedDatabase()
+        scrapers = [EducationalScraper(db), EducationalScraper(db)]
+        for each in scrapers:
+            monkeypatch.setattr(each, "_scrape_educational_page", fake_scrape)
+            monkeypatch.setattr(each, "_extract_educational_metadata", fake_metadata)
+
+        first, second = await asyncio.gather(*(
+            each.scrape_educational_content("https://example.com/loops") for each in scrapers
+        ))
+
+        assert scrapes == 1
+        assert second == first
+        assert scrapers[1].cache.stats['hits'] == 1
+        for each in scrapers:
+            await each.close()
+
+
+class TestNearDuplicateDetection:
+    """Test SimHash near-duplicate detection"""
+
+    ARTICLE = " ".join(
+        f"Step {i}: in Python a for loop walks over item {i} of the list and "
+        f"prints it, which teaches beginners how iteration number {i} works."
+        for i in range(40)
+    )
+    EDITED = ARTICLE.replace("Step 3:", "Paso 3:").replace("item 17 ", "element 17 ") + " Originally on dev.to"
+    OTHER = " ".join(
+        f"Lesson {i} explains how a neural network adjusts weight {i} with gradient descent."
+        for i in range(40)
+    )
+
+    def test_light_edits_stay_within_distance(self):
+        from src.scraping.dedup import SimHashIndex, hamming_distance, simhash
+
+        assert hamming_distance(simhash(self.ARTICLE), simhash(self.EDITED)) <= 7
+        assert hamming_distance(simhash(self.ARTICLE), simhash(self.OTHER)) > 7
+
+        index = SimHashIndex()
+        index.add("medium", simhash(self.ARTICLE))
+        assert index.find(simhash(self.EDITED)) == "medium"
+        assert index.find(simhash(self.OTHER)) is None
+
+    @pytest.mark.asyncio
+    async def test_memory_index_is_bounded(self, monkeypatch):
+        """Entries evicted from the memory tier leave the LSH index with them"""
+        from config.settings import settings
+        from src.scraping.dedup import NearDuplicateDetector, simhash
+        monkeypatch.setattr(settings, "near_duplicate_memory_max_entries", 1)
+
+        detector = NearDuplicateDetector()
+        await detector.add("https://medium.com/loops", simhash(self.ARTICLE), "tutorial", {"topic": "loops"})
+        await detector.add("https://example.com/nn", simhash(self.OTHER), "tutorial", {"topic": "nn"})
+
+        assert await detector.find(simhash(self.EDITED), "tutorial") is None
+        assert (await detector.find(simhash(self.OTHER), "tutorial"))["analysis"] == {"topic": "nn"}
+        assert len(detector.indexes["tutorial"]) == 1
+        assert detector.get_stats()["memory_evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_database_lookup_asks_for_the_best_match_only(self):
+        from src.scraping.dedup import NearDuplicateDetector, lsh_bands, simhash
+        original = simhash(self.ARTICLE)
+        queries = []
+
+        class FakeDatabase:
+            async def find_near_duplicate(self, content_type, fingerprint, bands, max_distance):
+                queries.append((content_type, fingerprint, bands, max_distance))
+                return {'url': "https://medium.com/loops", 'simhash': original - 2 ** 64,
+                        'analysis': {"topic": "loops"}, 'cost': 0.004}
+
+        detector = NearDuplicateDetector(FakeDatabase())
+        fingerprint = simhash(self.EDITED)
+        entry = await detector.find(fingerprint, "tutorial")
+
+        assert entry["analysis"] == {"topic": "loops"}
+        assert queries == [(
+            "tutorial", fingerprint - 2 ** 64 if fingerprint >= 2 ** 63 else fingerprint,
+            lsh_bands(fingerprint, detector.bands), detector.max_distance
+        )]
+        # Later lookups are answered from memory
+        assert (await detector.find(fingerprint, "tutorial"))["analysis"] == {"topic": "loops"}
+        assert len(queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_syndicated_copy_reuses_analysis(self, scraper, monkeypatch):
+        from types import SimpleNamespace
+        calls = 0
+
+        async def fake_create(**kwargs):
+            nonlocal calls
+            calls += 1
+            return SimpleNamespace(
+                content=[SimpleNamespace(text='{"difficulty_level": "beginner"}')],
+                usage=SimpleNamespace(input_tokens=1000, output_tokens=100)
+            )
+
+        monkeypatch.setattr(scraper.anthropic.messages, "create", fake_create)
+
+        original, _ = await scraper._extract_educational_metadata(
+            {'markdown': self.ARTICLE}, "tutorial", "https://medium.com/loops"
+        )
+        copy, _ = await scraper._extract_educational_metadata(
+            {'markdown': self.EDITED}, "tutorial", "https://dev.to/loops"
+        )
+        await scraper._extract_educational_metadata(
+            {'markdown': self.OTHER}, "tutorial", "https://example.com/nn"
+        )
+
+        assert copy == original
+        assert calls == 2
+        dedup_stats = scraper.get_stats()['dedup_stats']
+        assert dedup_stats['duplicates_avoided'] == 1
+        assert dedup_stats['estimated_savings'] == "$0.0045"
+
+    @pytest.mark.asyncio
+    async def test_crawl_merges_mirrored_pages(self, scraper, monkeypatch):
+        pages = {
+            "https://example.com/": ("# Home", ["https://example.com/loops", "https://example.com/blog/loops-copy"]),
+            "https://example.com/loops": (self.ARTICLE, []),
+            "https://example.com/blog/loops-copy": (self.EDITED, []),
+        }
+
+        async def fake_scrape(url, content_type):
+            markdown, links = pages[url]
+            markdown += "\n" + "\n".join(f"[Tutorial]({target})" for target in links)
+            return {'url': url, 'content': {'markdown': markdown}, 'error': None}
+
+        async def fake_metadata(content, content_type, url=None):
+            return {}, 0.0
+
+        monkeypatch.setattr(scraper, "_scrape_educational_page", fake_scrape)
+        monkeypatch.setattr(scraper, "_extract_educational_metadata", fake_metadata)
+
+        result = await scraper.scrape_educational_content("https://example.com/", depth=2)
+
+        assert result['crawled_urls'] == ["https://example.com/", "https://example.com/loops"]
+        assert result['duplicate_urls'] == ["https://example.com/blog/loops-copy"]
+        assert result['pages_scraped'] == 2
+        assert scraper.get_stats()['dedup_stats']['pages_merged'] == 1
+
+    @pytest.mark.asyncio
+    async def test_replayed_results_keep_merged_pages(self, scraper, monkeypatch):
+        """Cache replays and unchanged re-crawls report the same duplicates as the live crawl"""
+        pages = {
+            "https://example.com/": ("# Home", ["https://example.com/loops", "https://example.com/blog/loops-copy"]),
+            "https://example.com/loops": (self.ARTICLE, []),
+            "https://example.com/blog/loops-copy": (self.EDITED, []),
+        }
+
+        async def fake_scrape(url, content_type):
+            markdown, links = pages[url]
+            markdown += "\n" + "\n".join(f"[Tutorial]({target})" for target in links)
+            return {'url': url, 'content': {'markdown': markdown}, 'error': None}
+
+        async def fake_metadata(content, content_type, url=None):
+            return {}, 0.0
+
+        monkeypatch.setattr(scraper, "_scrape_educational_page", fake_scrape)
+        monkeypatch.setattr(scraper, "_extract_educational_metadata", fake_metadata)
+        scraper.fingerprints.db = FakeFingerprintDatabase()
+        url = "https://example.com/"
+
+        live = [page async for page in scraper.iter_educational_content(url, depth=2)]
+        result = await scraper.scrape_educational_content(url, depth=2)
+        replayed = [page async for page in scraper.iter_educational_content(url, depth=2)]
+
+        def duplicates(stream):
+            return {page['url']: page['duplicate_of'] for page in stream if page['duplicate_of']}
+
+        assert duplicates(replayed) == duplicates(live) == {
+            "https://example.com/blog/loops-copy": "https://example.com/loops"
+        }
+        assert await scraper.scrape_educational_content(url, depth=2) == result
+
+        # Unchanged root page: the previous result is reused without the cache
+        await scraper.cache.invalidate(url, "educational_tutorial")
+        assert await scraper.scrape_educational_content(url, depth=2) == result
+
+
+class TestEducationalSearch:
+    """Test provider fan-out and merging in educational search"""
+
+    TEXT = "Learn Python loops in this step-by-step tutorial guide with code examples and practice."
+
+    @pytest.mark.asyncio
+    async def test_providers_run_concurrently_and_results_merge(self, scraper, monkeypatch):
+        import time
+        from types import SimpleNamespace
+        from src.tools import data_collector
+
+        def tavily_search(**kwargs):
+            time.sleep(0.2)
+            return {"results": [
+                {"title": "Loops", "url": "https://example.com/loops", "content": self.TEXT},
+                {"title": "Cooking", "url": "https://example.com/soup", "content": "A soup recipe."},
+            ]}
+
+        def exa_search(**kwargs):
+            time.sleep(0.2)
+            return SimpleNamespace(results=[
+                SimpleNamespace(url="https://example.com/loops?utm_source=exa", title="Loops",
+                                summary=None, text=self.TEXT + " Try it."),
+                SimpleNamespace(url="https://example.org/functions", title="Functions",
+                                summary="Learn Python functions: a tutorial guide with code examples.", text=None),
+            ])
+
+        collector = data_collector.DataCollector()
+        monkeypatch.setattr(collector.tavily, "search", tavily_search)
+        monkeypatch.setattr(collector.exa, "search", exa_search)
+        monkeypatch.setattr(data_collector, "data_collector", collector)
+
+        started = time.perf_counter()
+        results = await scraper.search_educational_content("python loops")
+        elapsed = time.perf_counter() - started
+        await scraper.search_educational_content("python functions")
+
+        assert elapsed < 0.35
+        assert [result['url'] for result in results] == [
+            "https://example.com/loops", "https://example.org/functions"
+        ]
+        assert results[0]['sources'] == ["tavily", "exa"]
+        assert results[1]['source'] == "exa"
+        search_stats = scraper.get_stats()['search_stats']
+        assert search_stats['requests'] == {"tavily": 2, "exa": 2, "firecrawl": 0}
+
+
+class TestWaitProfiles:
+    """Test adaptive waitFor learning per domain"""
+
+    PAGE = "# Loops\n" + "A for loop repeats code for every item of a list. " * 10
+    SPA = '<html><body><div id="__nuxt"></div><script src="/app.js"></script></body></html>'
+
+    @pytest.mark.asyncio
+    async def test_wait_shortens_after_complete_scrapes_and_backs_off(self):
+        from src.scraping.wait_profiles import WaitProfileStore
+
+        store = WaitProfileStore()
+        url = "https://spa.example.com/lesson"
+
+        assert await store.plan(url, "tutorial") == (1000, True)
+        await store.observe(url, "tutorial", 1000, self.PAGE, self.SPA)
+        for _ in range(2):
+            await store.observe(url, "tutorial", 1000, self.PAGE)
+        assert await store.plan(url, "tutorial") == (500, False)
+
+        assert not await store.observe(url, "tutorial", 500, "Loading...")
+        assert (await store.plan(url, "tutorial"))[0] == 1000
+
+        # The retry at 1000 ms rendered the page, so 500 ms is known to be too short
+        assert await store.observe(
+            url, "tutorial", 1000, self.PAGE, previous_wait_ms=500, previous_markdown="Loading..."
+        )
+        for _ in range(5):
+            await store.observe(url, "tutorial", 1000, self.PAGE)
+        assert (await store.plan(url, "tutorial"))[0] == 1000
+        assert store.get_stats()['shortened'] == 1
+        assert store.get_stats()['lengthened'] == 1
+
+        # ... until enough complete scrapes have passed to try it again
+        for _ in range(10):
+            await store.observe(url, "tutorial", 1000, self.PAGE)
+        assert (await store.plan(url, "tutorial"))[0] == 500
+
+    @pytest.mark.asyncio
+    async def test_short_but_complete_pages_do_not_inflate_the_wait(self):
+        from src.scraping.wait_profiles import MAX_FALSE_ALARMS, WaitProfileStore
+
+        store = WaitProfileStore()
+        url = "https://docs.example.com/glossary"
+        short = "# Glossary\nA loop repeats code."
+        mentions_loading = "# Spinners\nShow Loading... while data arrives. " + "Spinners explained. " * 20
+
+        for markdown in (short, mentions_loading):
+            # The heuristic flags the page and the wait doubles for a retry
+            assert not await store.observe(url, "tutorial", 1000, markdown)
+            assert (await store.plan(url, "tutorial"))[0] == 2000
+
+            # Waiting longer returned the same page, so the first wait was fine
+            assert await store.observe(
+                url, "tutorial", 2000, markdown, previous_wait_ms=1000, previous_markdown=markdown
+            )
+            assert (await store.plan(url, "tutorial"))[0] == 1000
+
+        # After repeated false alarms the domain's pages are taken as they come
+        assert store.get_stats()['false_alarms'] == MAX_FALSE_ALARMS
+        assert await store.observe(url, "tutorial", 1000, short)
+        assert (await store.plan(url, "tutorial"))[0] == 1000
+        assert store.memory_profiles.get(("docs.example.com", "tutorial"))['failed_ms'] == -1
+
+    @pytest.mark.asyncio
+    async def test_profiles_are_bounded_and_written_when_they_change(self, monkeypatch):
+        from config.settings import settings
+        from src.scraping.wait_profiles import PERSIST_COUNTERS_EVERY, WaitProfileStore
+        monkeypatch.setattr(settings, "wait_profile_memory_max_entries", 2)
+        writes = []
+
+        class FakeDatabase:
+            async def get_wait_profile(self, domain, content_type):
+                return None
+
+            async def set_wait_profile(self, **profile):
+                writes.append(profile)
+
+        store = WaitProfileStore(FakeDatabase())
+        url = "https://spa.example.com/lesson"
+
+        # New profile, then two unchanged scrapes, then the wait is halved
+        for _ in range(4):
+            await store.observe(url, "tutorial", (await store.plan(url, "tutorial"))[0], self.PAGE)
+        assert [write['wait_ms'] for write in writes] == [1000, 500]
+
+        for _ in range(PERSIST_COUNTERS_EVERY):
+            await store.observe(url, "tutorial", 250, self.PAGE)
+        assert len(writes) == 3 and writes[-1]['samples'] == PERSIST_COUNTERS_EVERY
+
+        for domain in ("a.example.com", "b.example.com"):
+            await store.observe(f"https://{domain}/", "tutorial", 1000, self.PAGE)
+        assert store.get_stats()['profiles'] == 2
+
+    @pytest.mark.asyncio
+    async def test_static_pages_skip_wait_and_short_waits_are_retried(self, scraper):
+        from types import SimpleNamespace
+        calls = []
+
+        class FakeTransport:
+            async def scrape(self, url, params):
+                calls.append((url, params))
+                if 'spa.example.com' in url and params.get('waitFor', 0) < 1000:
+                    return SimpleNamespace(markdown="Loading...", metadata={})
+                return SimpleNamespace(
+                    markdown=TestWaitProfiles.PAGE, metadata={},
+                    raw_html="<html><body><article>Loops</article></body></html>"
+                )
+
+        scraper.firecrawl = FakeTransport()
+
+        await scraper._scrape_educational_page("https://static.example.com/a", "tutorial")
+        await scraper._scrape_educational_page("https://static.example.com/b", "tutorial")
+
+        assert calls[0][1]['formats'] == ['markdown', 'rawHtml']
+        assert calls[0][1]['waitFor'] == 1000
+        assert calls[1][1]['formats'] == ['markdown']
+        assert 'waitFor' not in calls[1][1]
+
+        scraper.wait_profiles.memory_profiles.put(("spa.example.com", "tutorial"), {
+            "wait_ms": 500, "is_static": False, "failed_ms": -1, "streak": 0, "samples": 3
+        }, 256)
+        result = await scraper._scrape_educational_page("https://spa.example.com/c", "tutorial")
+
+        assert result['content']['markdown'] == self.PAGE
+        assert [params.get('waitFor') for _, params in calls[2:]] == [500, 1000]
+        stats = scraper.wait_profiles.get_stats()
+        assert stats['static_domains'] == 1
+        assert stats['retries'] == 1
+
+
+class FakeLeadQueue:
+    """In-memory stand-in for the educational_leads queue methods of DatabaseManager"""
+
+    def __init__(self, leads):
+        self.leads = {
+            lead_id: {'id': lead_id, 'url': url, 'content_type': 'tutorial', 'quality_score': score,
+                      'processing_status': status, 'claimed_by': None, 'attempts': 0}
+            for lead_id, (url, score, status) in enumerate(leads)
+        }
+        self.claim_order = []
+
+    async def claim_leads(self, worker_id, limit=1, lease_seconds=600, max_attempts=3):
+        await asyncio.sleep(0)
+        pending = sorted(
+            (lead for lead in self.leads.values() if lead['processing_status'] == 'pending'),
+            key=lambda lead: -lead['quality_score']
+        )[:limit]
+        for lead in pending:
+            lead.update(processing_status='processing', claimed_by=worker_id, attempts=lead['attempts'] + 1)
+            self.claim_order.append(lead['url'])
+        return [dict(lead) for lead in pending]
+
+    async def complete_lead(self, lead_id, worker_id, **fields):
+        lead = self.leads[lead_id]
+        if lead['claimed_by'] != worker_id:
+            return False
+        lead.update(processing_status='processed', claimed_by=None)
+        return True
+
+    async def renew_lead_lease(self, lead_id, worker_id):
+        lead = self.leads[lead_id]
+        lead['renewals'] = lead.get('renewals', 0) + 1
+        return lead['claimed_by'] == worker_id
+
+    async def fail_lead(self, lead_id, worker_id, error, max_attempts=3):
+        lead = self.leads[lead_id]
+        if lead['claimed_by'] != worker_id:
+            return None
+        status = 'archived' if lead['attempts'] >= max_attempts else 'pending'
+        lead.update(processing_status=status, claimed_by=None)
+        return status
+
+
+class TestLeadWorker:
+    """Test the educational lead work queue"""
+
+    @pytest.mark.asyncio
+    async def test_workers_share_queue_in_quality_order_and_retry_failures(self):
+        from src.scraping.lead_worker import LeadWorker
+
+        queue = FakeLeadQueue(
+            [(f"https://example.com/{i}", i / 10, 'pending') for i in range(6)]
+            + [("https://broken.example.com/", 0.95, 'pending'), ("https://example.com/done", 1.0, 'processed')]
+        )
+        scraped = []
+
+        class FakeScraper:
+            async def scrape_educational_content(self, url, content_type="tutorial", **options):
+                scraped.append(url)
+                await asyncio.sleep(0.01)
+                if 'broken' in url:
+                    return {'error': 'boom', 'pages_scraped': 0}
+                return {'error': None, 'pages_scraped': 1, 'difficulty_level': 'beginner'}
+
+        # Two workers stand in for two processes sharing the table
+        workers = [
+            LeadWorker(FakeScraper(), queue, concurrency=2, max_attempts=2, poll_interval=0)
+            for _ in range(2)
+        ]
+        results = await asyncio.gather(*(worker.run(stop_when_empty=True) for worker in workers))
+
+        statuses = {lead['url']: lead['processing_status'] for lead in queue.leads.values()}
+        assert statuses.pop("https://broken.example.com/") == 'archived'
+        assert set(statuses.values()) == {'processed'}
+        assert "https://example.com/done" not in scraped
+        assert scraped.count("https://broken.example.com/") == 2
+        assert len(scraped) == len(set(scraped)) + 1
+        assert queue.claim_order[:2] == ["https://broken.example.com/", "https://example.com/5"]
+        assert sum(result['processed'] for result in results) == 6
+        assert sum(result['archived'] for result in results) == 1
+        assert workers[0].worker_id != workers[1].worker_id
+
+    @pytest.mark.asyncio
+    async def test_lease_is_renewed_while_a_lead_is_processed(self):
+        from src.scraping.lead_worker import LeadWorker
+
+        queue = FakeLeadQueue([("https://example.com/long-course", 0.9, 'pending')])
+
+        class SlowScraper:
+            async def scrape_educational_content(self, url, content_type="tutorial", **options):
+                await asyncio.sleep(0.1)
+                return {'error': None, 'pages_scraped': 12}
+
+        worker = LeadWorker(SlowScraper(), queue, concurrency=1, lease_seconds=0.06, poll_interval=0)
+        stats = await worker.run(stop_when_empty=True)
+
+        assert stats['processed'] == 1
+        assert stats['lease_renewals'] == queue.leads[0]['renewals'] >= 3
+
+        # Renewals stop with the lead
+        await asyncio.sleep(0.05)
+        assert queue.leads[0]['renewals'] == stats['lease_renewals']
+
+
+class TestStageMetrics:
+    """Test per-stage latency histograms"""
+
+    def test_quantiles_track_recorded_latencies(self):
+        import time
+        from src.scraping.metrics import StageMetrics
+
+        metrics = StageMetrics()
+        started = time.perf_counter()
+        for ms in range(1, 1001):
+            metrics.record("scrape", ms / 1000, "example.com" if ms % 2 else "docs.python.org")
+        elapsed = time.perf_counter() - started
+
+        stats = metrics.get_stats()["scrape"]
+        assert stats["count"] == 1000
+        assert stats["p50_ms"] == pytest.approx(500, rel=0.1)
+        assert stats["p95_ms"] == pytest.approx(950, rel=0.1)
+        assert stats["p99_ms"] == pytest.approx(990, rel=0.1)
+        assert stats["max_ms"] == 1000
+        assert stats["domains"]["example.com"]["count"] == 500
+        # Recording is a bisect and an increment
+        assert elapsed < 0.5
+
+    @pytest.mark.asyncio
+    async def test_scraper_stages_are_exported(self, scraper):
+        from types import SimpleNamespace
+
+        class FakeTransport:
+            async def scrape(self, url, params):
+                return SimpleNamespace(markdown=TestWaitProfiles.PAGE, metadata={})
+
+        scraper.firecrawl = FakeTransport()
+        await scraper._scrape_educational_page("https://example.com/loops", "tutorial")
+        scraper._discover_related_educational_urls({'markdown': "[Tutorial](/next)"}, "https://example.com/loops")
+        scraper.metrics.add_cost("analysis", 0.0125, "example.com")
+
+        stages = scraper.metrics.get_stats()
+        assert {"rate_limit_wait", "scrape", "link_discovery"} <= set(stages)
+        assert stages["scrape"]["domains"]["example.com"]["count"] == 1
+
+        exported = scraper.export_metrics()
+        assert '# TYPE educational_scraper_stage_seconds histogram' in exported
+        assert 'educational_scraper_stage_seconds_bucket{stage="scrape",le="+Inf"} 1' in exported
+        assert 'educational_scraper_domain_stage_seconds_count{stage="scrape",domain="example.com"} 1' in exported
+        assert 'educational_scraper_stage_cost_dollars_total{stage="analysis"} 0.012500' in exported
+        assert 'educational_scraper_domain_stage_cost_dollars_total{stage="analysis",domain="example.com"} 0.012500' in exported
+
+        # Stage series carry no domain, and domains carry no buckets
+        scrape_buckets = [
+            line for line in exported.splitlines()
+            if line.startswith('educational_scraper_stage_seconds_bucket{stage="scrape"')
+        ]
+        assert 15 <= len(scrape_buckets) <= 20
+        assert scrape_buckets[-1].endswith('le="+Inf"} 1')
+        assert not any('domain=' in line for line in exported.splitlines()
+                       if line.startswith('educational_scraper_stage_'))
+        assert 'domain_stage_seconds_bucket' not in exported
+
+
+class TestProcessPool:
+    """Test offloading CPU-bound text processing"""
+
+    @pytest.mark.asyncio
+    async def test_small_inputs_run_inline_and_large_ones_in_a_worker(self):
+        from src.scraping.core import _prepare_analysis_input
+        from src.tools.process_pool import ProcessPool
+
+        pool = ProcessPool(max_workers=1, inline_threshold=1000)
+        page = "# Loops\n\n" + "A for loop repeats code for each item. " * 2000
+
+        try:
+            assert await pool.run(os.getpid, size=10) == os.getpid()
+            assert await pool.run(os.getpid, size=len(page)) != os.getpid()
+            offloaded = await pool.run(_prepare_analysis_input, page, 200, size=len(page))
+        finally:
+            pool.close()
+
+        assert offloaded == _prepare_analysis_input(page, 200)
+        assert pool.get_stats()['inline'] == 1
+        assert pool.get_stats()['offloaded'] == 2
+
+    @pytest.mark.asyncio
+    async def test_closing_the_shared_pool_stops_workers_and_allows_a_new_pool(self):
+        from src.tools import process_pool as module
+
+        pool = module.get_process_pool()
+        pool.inline_threshold = 0
+        try:
+            await pool.run(os.getpid)
+            executor = pool._executor
+        finally:
+            module.close_process_pool()
+
+        assert executor._shutdown_thread
+        assert module.process_pool is None
+        assert module.get_process_pool() is not pool
+        module.close_process_pool()
+
+    def test_closing_the_shared_transport_allows_a_new_one(self):
+        from src.scraping import transport as module
+
+        transport = module.get_firecrawl_transport()
+        module.close_firecrawl_transport()
+
+        assert transport._executor._shutdown
+        assert module.get_firecrawl_transport() is not transport
+        module.close_firecrawl_transport()
+
+
+class TestUrlCanonicalization:
+    """Test URL canonicalization ahead of scraping and caching"""
+
+    def test_variants_share_one_canonical_url(self):
+        from src.scraping.urls import canonicalize_url
+
+        variants = [
+            "https://example.com/docs/loops",
+            "http://example.com/docs/loops",
+            "https://EXAMPLE.com:443/docs/loops/",
+            "https://example.com/docs/loops#for-loops",
+            "https://example.com/docs//loops?utm_source=newsletter&utm_medium=email",
+        ]
+
+        assert {canonicalize_url(url) for url in variants} == {"https://example.com/docs/loops"}
+
+    def test_query_is_sorted_and_kept(self):
+        from src.scraping.urls import canonicalize_url
+
+        assert canonicalize_url("https://example.com/search?q=python&lang=es&fbclid=abc") == \
+            "https://example.com/search?lang=es&q=python"
+
+    def test_discovery_deduplicates_canonical_links(self, scraper):
+        markdown = "\n".join([
+            "[Tutorial: loops](/docs/loops)",
+            "[Loops tutorial again](https://example.com/docs/loops/#top)",
+            "[Guide](http://example.com/docs/loops?utm_campaign=x)",
+            "[This tutorial](#section)",
+            "[Email the course team](mailto:team@example.com)",
+        ])
+
+        urls = scraper._discover_related_educational_urls(
+            {'markdown': markdown}, "https://example.com/docs/intro"
+        )
+
+        assert urls == ["https://example.com/docs/loops"]
+
+    def test_relative_links_resolve_against_the_page_url(self, scraper):
+        markdown = "\n".join([
+            "[Tutorial: classes](classes.html)",
+            "[Tutorial: modules](../modules/)",
+            "[Legacy tutorial](http://legacy.example.com/tutorial/intro)",
+        ])
+
+        urls = scraper._discover_related_educational_urls(
+            {'markdown': markdown}, "https://docs.example.com/3/tutorial/"
+        )
+        assert urls == [
+            "https://docs.example.com/3/tutorial/classes.html",
+            "https://docs.example.com/3/modules/",
+        ]
+
+        # Links on a redirected page resolve against where it landed
+        urls = scraper._discover_related_educational_urls(
+            {'markdown': markdown, 'metadata': {'url': "https://docs.example.com/3/tutorial/"}},
+            "https://docs.example.com/3/tutorial"
+        )
+        assert urls[0] == "https://docs.example.com/3/tutorial/classes.html"
+
+    @pytest.mark.asyncio
+    async def test_pages_are_fetched_as_given_and_cached_canonically(self, scraper, monkeypatch):
+        fetched = []
+
+        async def fake_scrape(url, content_type):
+            fetched.append(url)
+            return {'url': url, 'content': {'markdown': '# Loops'}, 'error': None}
+
+        async def fake_metadata(content, content_type, url=None):
+            return {'difficulty_level': 'beginner'}, 0.0
+
+        monkeypatch.setattr(scraper, "_scrape_educational_page", fake_scrape)
+        monkeypatch.setattr(scraper, "_extract_educational_metadata", fake_metadata)
+
+        first = await scraper.scrape_educational_content("http://example.com/docs/loops/#intro")
+        second = await scraper.scrape_educational_content("https://example.com/docs/loops")
+
+        assert fetched == ["http://example.com/docs/loops/"]
+        assert first['source_url'] == "http://example.com/docs/loops/"
+        assert second['source_url'] == "https://example.com/docs/loops"
+        assert second['crawled_urls'] == first['crawled_urls'] == ["http://example.com/docs/loops/"]
+        assert second['educational_content'] == first['educational_content']
+
+    @pytest.mark.asyncio
+    async def test_migrate_cache_keys_merges_variants(self, scraper):
+        import hashlib
+        import json
+
+        cache = scraper.cache
+        tutorials = cache.cache_dir / "tutorials"
+        for i, raw_url in enumerate([
+            "https://example.com/docs/loops?utm_source=a",
+            "http://example.com/docs/loops#intro",
+        ]):
+            # Legacy keys hashed the raw URL
+            raw_key = hashlib.md5(f"{raw_url}:{{}}".encode()).hexdigest()
+            with open(tutorials / f"{raw_key}.json", 'w', encoding='utf-8') as f:
+                json.dump({"url": raw_url, "data": {"n": i}, "timestamp": f"2025-01-0{i + 1}T00:00:00"}, f)
+
+        counts = await cache.migrate_cache_keys()
+
+        files = list(tutorials.iterdir())
+        assert counts == {"migrated": 1, "merged": 1}
+        assert [f.stem for f in files] == [cache._generate_cache_key("https://example.com/docs/loops")]
+        assert cache._read_file(files[0])["data"] == {"n": 1}
+
+    @pytest.mark.asyncio
+    async def test_migrate_cache_keys_keeps_newest_database_row(self, scraper):
+        import hashlib
+        canonical = "https://example.com/docs/loops"
+        canonical_key = scraper.cache._generate_cache_key(canonical)
+
+        def raw_key(url):
+            return hashlib.md5(f"{url}:{{}}".encode()).hexdigest()
+
+        class FakeDatabase:
+            def __init__(self):
+                # cache_key -> row; created is the upsert time
+                self.rows = {
+                    canonical_key: {'url': canonical, 'data': {'n': 0}, 'created': 1},
+                    raw_key(f"{canonical}?utm_source=a"): {
+                        'url': f"{canonical}?utm_source=a", 'data': {'n': 2}, 'created': 3
+                    },
+                    raw_key(f"{canonical}#intro"): {'url': f"{canonical}#intro", 'data': {'n': 1}, 'created': 2},
+                }
+
+            async def fetch(self, query):
+                ordered = sorted(self.rows.items(), key=lambda item: item[1]['created'], reverse=True)
+                return [{'cache_key': key, 'url': row['url']} for key, row in ordered]
+
+            async def execute(self, query, *args):
+                if query.startswith("DELETE"):
+                    del self.rows[args[0]]
+                else:
+                    new_key, url, old_key = args
+                    assert new_key not in self.rows
+                    self.rows[new_key] = {**self.rows.pop(old_key), 'url': url}
+
+        db = FakeDatabase()
+        scraper.cache.db = db
+        counts = await scraper.cache.migrate_cache_keys()
+
+        assert counts == {"migrated": 1, "merged": 2}
+        assert list(db.rows) == [canonical_key]
+        assert db.rows[canonical_key]['data'] == {'n': 2}
+        assert db.rows[canonical_key]['url'] == canonical
+
+    @pytest.mark.asyncio
+    async def test_migrate_cache_keys_covers_segment_log(self, tmp_path, monkeypatch):
+        import hashlib
+        from config.settings import settings
+        from src.scraping.cache import SmartCache
+
+        monkeypatch.setattr(settings, "cache_file_tier", "segments")
+        cache = SmartCache(cache_dir=str(tmp_path / "cache"))
+        for i, raw_url in enumerate([
+            "https://example.com/docs/loops?utm_source=a",
+            "http://example.com/docs/loops#intro",
+        ]):
+            raw_key = hashlib.md5(f"{raw_url}:{{}}".encode()).hexdigest()
+            cache.segments.put(raw_key, {"url": raw_url, "data": {"n": i}}, "tutorials", timestamp=1000.0 + i)
+
+        counts = await cache.migrate_cache_keys()
+
+        canonical_key = cache._generate_cache_key("https://example.com/docs/loops")
+        assert counts == {"migrated": 1, "merged": 1}
+        assert list(cache.segments.index) == [canonical_key]
+        assert cache.segments.get(canonical_key)["data"] == {"n": 1}
+        await cache.close()
+
+
+class TestMemoryCacheTier:
+    """Test the bounded LRU memory tier of SmartCache"""
+
+    def test_evicts_least_recently_used_within_entry_and_byte_limits(self):
+        from src.scraping.lru import BoundedLRUCache
+
+        lru = BoundedLRUCache(max_entries=3, max_bytes=100, ttl=60)
+        for key in "abc":
+            lru.put(key, key.upper(), size=10)
+        assert lru.get("a") == "A"
+
+        lru.put("d", "D", size=10)
+        assert "b" not in lru and len(lru) == 3
+
+        lru.put("e", "E", size=85)
+        assert list(lru.values()) == ["D", "E"]
+        assert lru.bytes == 95
+
+        assert lru.put("huge", "H", size=101) is False
+        assert lru.get_stats()["evictions"] == 3
+        assert lru.get_stats()["rejected_oversize"] == 1
+        assert len(lru) == 2
+
+    def test_ttl_uses_monotonic_clock(self, monkeypatch):
+        from src.scraping import lru as lru_module
+
+        now = [1000.0]
+        monkeypatch.setattr(lru_module.time, "monotonic", lambda: now[0])
+
+        lru = lru_module.BoundedLRUCache(max_entries=10, max_bytes=100, ttl=60)
+        lru.put("fresh", 1, size=1)
+        lru.put("aged", 2, size=1, age=50)
+
+        now[0] += 20
+        assert lru.get("fresh") == 1
+        assert lru.get("fresh", max_age=10) is None
+        assert lru.get("aged") is None
+        assert lru.get_stats()["expirations"] == 2
+        assert lru.bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_smart_cache_memory_tier_is_bounded(self, scraper):
+        from src.scraping.lru import BoundedLRUCache
+
+        cache = scraper.cache
+        cache.memory_cache = BoundedLRUCache(max_entries=2, max_bytes=10_000, ttl=3600)
+
+        for i in range(4):
+            await cache.set(f"https://example.com/lesson-{i}", {"n": i})
+
+        stats = cache.get_stats()
+        assert stats["memory_entries"] == 2
+        assert stats["memory_evictions"] == 2
+        # Evicted entries are still served from the file tier
+        assert await cache.get("https://example.com/lesson-0") == {"n": 0}
+
+
+class TestCacheFileFormat:
+    """Test the compact compressed file tier format"""
+
+    @pytest.mark.asyncio
+    async def test_compact_files_round_trip_and_are_smaller(self, scraper):
+        from src.scraping.cache_format import MAGIC
+
+        cache = scraper.cache
+        url = "https://example.com/docs/loops"
+        data = {"markdown": "# Loops\n\n" + "A for loop repeats code for each item. " * 200}
+
+        await cache.set(url, data)
+        await cache.flush()
+        cache.memory_cache.clear()
+
+        [cache_file] = (cache.cache_dir / "tutorials").iterdir()
+        assert cache_file.suffix == ".cache"
+        assert cache_file.read_bytes().startswith(MAGIC)
+        assert await cache.get(url) == data
+
+        stats = cache.get_stats()
+        assert stats["file_format"] == "compact"
+        assert float(stats["file_compression_ratio"].rstrip("x")) > 5
+
+    @pytest.mark.asyncio
+    async def test_legacy_json_files_stay_readable(self, scraper):
+        import json
+        from datetime import datetime
+
+        cache = scraper.cache
+        url = "https://example.com/docs/loops"
+        key = cache._generate_cache_key(url)
+        legacy = cache.cache_dir / "tutorials" / f"{key}.json"
+        legacy.write_text(json.dumps(
+            {"url": url, "data": {"n": 1}, "timestamp": datetime.now().isoformat()}, indent=2
+        ), encoding='utf-8')
+
+        assert await cache.get(url) == {"n": 1}
+
+        # Rewriting the entry converts it to the compact format
+        await cache.set(url, {"n": 2})
+        await cache.flush()
+        assert [f.name for f in (cache.cache_dir / "tutorials").iterdir()] == [f"{key}.cache"]
+        assert (await cache.get_cache_summary())["file_cache"]["types"]["tutorials"] == 1
+
+
+class TestSegmentLogStore:
+    """Test the append-only segment log file tier"""
+
+    def test_index_survives_reopen_and_torn_tail(self, tmp_path):
+        from src.scraping.segment_store import SegmentLogStore
+
+        store = SegmentLogStore(tmp_path)
+        store.put("a", {"data": 1}, "tutorials")
+        store.put("b", {"data": 2}, "courses")
+        store.put("a", {"data": 3}, "tutorials")
+        assert store.delete("b") is True
+        store.close()
+
+        [segment] = tmp_path.glob("*.seg")
+        with open(segment, "ab") as f:
+            f.write(b"\x00" * 7)  # A record torn by a crash
+
+        store = SegmentLogStore(tmp_path)
+        assert store.get("a") == {"data": 3}
+        assert store.get("b") is None
+        assert store.summary() == {"tutorials": 1}
+        assert segment.stat().st_size == store.get_stats()["total_bytes"]
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_compaction_reclaims_dead_records(self, tmp_path):
+        from src.scraping.segment_store import SegmentLogStore
+
+        store = SegmentLogStore(tmp_path, segment_max_bytes=500, compaction_threshold=2.0)
+        for round_ in range(5):
+            for key in "abcd":
+                store.put(key, {"data": f"{key}{round_}" * 20}, "tutorials")
+        store.delete("d")
+        segments_before = store.get_stats()["segments"]
+
+        reclaimed = await store.compact()
+
+        stats = store.get_stats()
+        assert reclaimed > 0
+        assert stats["segments"] < segments_before
+        assert {key: store.get(key) for key in "abcd"} == {
+            "a": {"data": "a4" * 20}, "b": {"data": "b4" * 20}, "c": {"data": "c4" * 20}, "d": None
+        }
+        store.close()
+
+        reopened = SegmentLogStore(tmp_path)
+        assert reopened.get("c") == {"data": "c4" * 20}
+        assert reopened.get("d") is None
+        reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_smart_cache_on_segment_log(self, tmp_path, monkeypatch):
+        import time
+        from config.settings import settings
+        from src.scraping.cache import SmartCache
+
+        monkeypatch.setattr(settings, "cache_file_tier", "segments")
+        cache = SmartCache(cache_dir=str(tmp_path / "cache"))
+
+        await cache.set("https://example.com/docs/loops", {"n": 1})
+        await cache.set("https://example.com/docs/lists", {"n": 2}, cache_type="courses")
+        await cache.flush()
+        cache.memory_cache.clear()
+
+        assert await cache.get("https://example.com/docs/loops") == {"n": 1}
+        summary = await cache.get_cache_summary()
+        assert summary["file_cache"]["types"] == {"tutorials": 1, "courses": 1}
+        assert not list((tmp_path / "cache" / "tutorials").iterdir())
+
+        # Expiry is decided from the index timestamps
+        cache.memory_cache.clear()
+        monkeypatch.setattr(time, "time", lambda: 10 ** 10)
+        assert await cache.cleanup_expired(max_age_days=7) == 2
+        await cache.close()
+
+
+class TestDatabaseCacheTier:
+    """Test SmartCache reads through the database tier"""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_is_one_round_trip(self, monkeypatch):
+        from src.database.connection import DatabaseManager
+
+        db = DatabaseManager()
+        queries = []
+
+        async def fetchrow(query, *args):
+            queries.append(query)
+            return {'data': '{"n": 1}', 'age_seconds': 60.0, 'expires_in_seconds': 3600.0}
+
+        async def execute(query, *args):
+            queries.append(query)
+
+        monkeypatch.setattr(db, "fetchrow", fetchrow)
+        monkeypatch.setattr(db, "execute", execute)
+
+        assert await db.get_cache("key") == {"n": 1}
+        assert len(queries) == 1 and "RETURNING" in queries[0]
+
+    @pytest.mark.asyncio
+    async def test_database_entries_keep_their_real_age(self, tmp_path):
+        from src.scraping.cache import SmartCache
+
+        class FakeDatabase:
+            def __init__(self):
+                self.entries = {}
+                self.saved = []
+
+            async def get_cache_entry(self, cache_key):
+                return self.entries.get(cache_key)
+
+            async def set_cache_many(self, entries):
+                self.saved.extend(entries)
+
+        db = FakeDatabase()
+        cache = SmartCache(db, cache_dir=str(tmp_path))
+        old_key = cache._generate_cache_key("https://example.com/old")
+        fresh_key = cache._generate_cache_key("https://example.com/fresh")
+        db.entries[old_key] = {'data': {'n': 1}, 'age_seconds': 2 * 3600.0, 'expires_in_seconds': 22 * 3600.0}
+        db.entries[fresh_key] = {'data': {'n': 2}, 'age_seconds': 60.0, 'expires_in_seconds': 0.5}
+
+        # Two hours old: fresh enough for a day, stale for an hour
+        assert await cache.get("https://example.com/old", max_age_hours=1) is None
+        assert await cache.get("https://example.com/old", max_age_hours=24) == {'n': 1}
+
+        # The memory copy expires with the database row
+        assert await cache.get("https://example.com/fresh") == {'n': 2}
+        del db.entries[fresh_key]
+        await asyncio.sleep(0.6)
+        assert await cache.get("https://example.com/fresh") is None
+
+        await cache.set("https://example.com/new", {'n': 3})
+        await cache.close()
+        assert db.saved[0]['age_seconds'] < 5
+
+
+class TestCacheWriteBehind:
+    """Test background persistence of SmartCache writes"""
+
+    @pytest.mark.asyncio
+    async def test_writes_are_batched_and_drained_on_close(self, tmp_path, monkeypatch):
+        from config.settings import settings
+        from src.scraping.cache import SmartCache
+
+        class SlowDatabase:
+            def __init__(self):
+                self.batches = []
+
+            async def set_cache_many(self, entries):
+                await asyncio.sleep(0.05)
+                self.batches.append([entry['cache_key'] for entry in entries])
+
+        monkeypatch.setattr(settings, "cache_write_batch_size", 3)
+        db = SlowDatabase()
+        cache = SmartCache(db, cache_dir=str(tmp_path))
+
+        for i in range(7):
+            await cache.set(f"https://example.com/lesson-{i}", {"n": i})
+        await cache.set("https://example.com/lesson-0", {"n": 0, "v": 2})
+
+        # Nothing was persisted on the request path
+        assert db.batches == []
+        assert cache.get_stats()["write_queue"]["depth"] == 7
+        cache.memory_cache.clear()
+        assert await cache.get("https://example.com/lesson-0") == {"n": 0, "v": 2}
+
+        await cache.close()
+
+        stats = cache.get_stats()["write_queue"]
+        assert [len(batch) for batch in db.batches] == [3, 3, 1]
+        assert stats["depth"] == 0 and stats["flushed"] == 7 and stats["coalesced"] == 1
+        assert stats["flush_latency"]["count"] == 3
+        assert len(list((tmp_path / "tutorials").iterdir())) == 7
+
+    @pytest.mark.asyncio
+    async def test_segment_log_is_written_off_the_event_loop(self, tmp_path, monkeypatch):
+        import threading
+        from config.settings import settings
+        from src.scraping.cache import SmartCache
+
+        monkeypatch.setattr(settings, "cache_file_tier", "segments")
+        cache = SmartCache(cache_dir=str(tmp_path))
+        append = cache.segments._append
+        threads = []
+
+        def recording_append(*args):
+            threads.append(threading.get_ident())
+            return append(*args)
+
+        monkeypatch.setattr(cache.segments, "_append", recording_append)
+        for i in range(3):
+            await cache.set(f"https://example.com/lesson-{i}", {"n": i})
+        await cache.flush()
+
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+        cache.memory_cache.clear()
+        assert await cache.get("https://example.com/lesson-2") == {"n": 2}
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_persistence_only(self, tmp_path, monkeypatch):
+        from config.settings import settings
+        from src.scraping.cache import SmartCache
+
+        monkeypatch.setattr(settings, "cache_write_queue_size", 2)
+        cache = SmartCache(cache_dir=str(tmp_path))
+
+        for i in range(3):
+            await cache.set(f"https://example.com/lesson-{i}", {"n": i})
+
+        assert cache.get_stats()["write_queue"]["dropped"] == 1
+        assert await cache.get("https://example.com/lesson-2") == {"n": 2}
+
+        await cache.invalidate("https://example.com/lesson-1")
+        await cache.close()
+        assert len(list((tmp_path / "tutorials").iterdir())) == 1
+
+
+class TestKeywordMatcher:
+    """Test the single-pass keyword matcher"""
+
+    def test_matches_same_keywords_as_substring_checks(self):
+        from src.scraping.matcher import KeywordMatcher
+
+        groups = {
+            'indicators': ['learn', 'learning', 'docs', 'documentation', 'how-to'],
+            'levels': ['intro', 'introduction', 'deep dive', 'earn'],
+        }
+        matcher = KeywordMatcher(groups)
+        texts = [
+            "Learning Python: an Introduction (docs)",
+            "HOW-TO deep dive into documentation",
+            "nothing relevant here",
+            "",
+        ]
+
+        for text in texts:
+            hits = matcher.match(text)
+            for name, keywords in groups.items():
+                assert hits[name] == {kw for kw in keywords if kw in text.lower()}
+
+    def test_batch_scoring_matches_single_item_scoring(self, scraper):
+        items = [
+            {'title': 'Python tutorial for beginners', 'content': 'Learn loops with examples',
+             'url': 'https://www.freecodecamp.org/news/loops'},
+            {'title': 'API reference', 'content': 'Full documentation', 'url': 'https://docs.python.org'},
+            {'title': 'Cooking', 'content': 'Tacos al pastor', 'url': 'https://example.com'},
+        ]
+
+        scores = scraper.score_educational_items(items)
+
+        assert [s['estimated_type'] for s in scores] == ['tutorial', 'documentation', 'general']
+        assert scores[0]['relevance_score'] == pytest.approx(0.9)
+        assert scores[2]['relevance_score'] == 0.0
+        for item, score in zip(items, scores):
+            assert score['relevance_score'] == scraper._calculate_educational_relevance(item)
+
+
+class TestEducationalAnalysis:
+    """Test Claude-backed metadata extraction"""
+
+    @pytest.fixture(autouse=True)
+    def ungated(self, monkeypatch):
+        """These short sample pages would not pass the content gate"""
+        from config.settings import settings
+        monkeypatch.setattr(settings, "content_gate_enabled", False)
+
+    @pytest.mark.asyncio
+    async def test_cost_comes_from_reported_usage(self, scraper, monkeypatch):
+        """Cost is computed from response.usage, not a local tokenizer"""
+        from types import SimpleNamespace
+
+        async def fake_create(**kwargs):
+            return SimpleNamespace(
+                content=[SimpleNamespace(text='{"difficulty_level": "beginner"}')],
+                usage=SimpleNamespace(input_tokens=2000, output_tokens=100)
+            )
+
+        monkeypatch.setattr(scraper.anthropic.messages, "create", fake_create)
+
+        analysis, cost = await scraper._extract_educational_metadata(
+            {'markdown': '# Intro to Python'}, "tutorial"
+        )
+
+        assert analysis['difficulty_level'] == 'beginner'
+        assert cost == pytest.approx(0.0075)
+        assert scraper.stats['total_cost'] == pytest.approx(0.0075)
+
+    @pytest.mark.asyncio
+    async def test_identical_content_reuses_memoized_analysis(self, scraper, monkeypatch):
+        """Whitespace-only variants of a page cost a single Claude call"""
+        from types import SimpleNamespace
+        calls = 0
+
+        async def fake_create(**kwargs):
+            nonlocal calls
+            calls += 1
+            return SimpleNamespace(
+                content=[SimpleNamespace(text='{"learning_objectives": ["loops"]}')],
+                usage=SimpleNamespace(input_tokens=100, output_tokens=10)
+            )
+
+        monkeypatch.setattr(scraper.anthropic.messages, "create", fake_create)
+
+        first, first_cost = await scraper._extract_educational_metadata(
+            {'markdown': '# Loops\n\nUse  for loops.'}, "tutorial"
+        )
+        second, second_cost = await scraper._extract_educational_metadata(
+            {'markdown': '# Loops\nUse for loops.  '}, "tutorial"
+        )
+        other_type, _ = await scraper._extract_educational_metadata(
+            {'markdown': '# Loops\nUse for loops.'}, "course"
+        )
+
+        assert first == second == other_type
+        assert first_cost > 0 and second_cost == 0.0
+        assert calls == 2
+        memo_stats = scraper.get_stats()['memo_stats']
+        assert memo_stats['hits'] == 1
+        assert memo_stats['misses'] == 2
+
+    @pytest.mark.asyncio
+    async def test_memo_memory_tier_is_bounded(self, monkeypatch):
+        """The in-process memo evicts its least recently used analyses"""
+        from config.settings import settings
+        from src.scraping.memo import AnalysisMemo
+        monkeypatch.setattr(settings, "memo_memory_max_entries", 2)
+
+        memo = AnalysisMemo()
+        for key in ("a", "b", "c"):
+            await memo.set(key, {"topics": [key]}, "tutorial", "v1")
+
+        assert await memo.get("a") is None
+        assert await memo.get("c") == {"topics": ["c"]}
+        stats = memo.get_stats()
+        assert stats["memory_entries"] == 2
+        assert stats["memory_evictions"] == 1
+
+
+class TestContentGate:
+    """Test the local gate in front of Claude analysis"""
+
+    ENGLISH = " ".join(
+        f"In this tutorial you learn how the for loop in Python walks over item {i} of the list."
+        for i in range(12)
+    )
+    SPANISH = " ".join(
+        f"En este tutorial aprendes como el ciclo for de Python recorre el elemento {i} de la lista."
+        for i in range(12)
+    )
+    def test_language_detection(self):
+        from src.scraping.gate import WORD_PATTERN, detect_language
+
+        assert detect_language(WORD_PATTERN.findall(self.ENGLISH.lower())) == "english"
+        assert detect_language(WORD_PATTERN.findall(self.SPANISH.lower())) == "spanish"
+        assert detect_language(WORD_PATTERN.findall("for i in range(3): print(i)")) == "unknown"
+
+    def test_rejects_wrong_language_thin_and_off_topic_pages(self, scraper):
+        from src.scraping.gate import ContentGate
+
+        gate = scraper.gate
+        recipe = " ".join("Stir the soup and add the salt to the pot, then let it simmer." for _ in range(12))
+
+        assert gate.check(self.ENGLISH).passed
+        assert gate.check(self.SPANISH).passed
+        assert gate.check("# Loops\nUse a for loop.").reason == "length"
+        assert gate.check(recipe).reason == "relevance"
+        assert gate.check(recipe + "\n```python\nprint(1)\n```").passed
+
+        spanish_only = ContentGate(gate.keywords, languages=["spanish"])
+        assert spanish_only.check(self.ENGLISH).reason == "language"
+        assert spanish_only.check(self.SPANISH).passed
+
+    @pytest.mark.asyncio
+    async def test_rejected_pages_skip_claude_and_are_counted(self, scraper, monkeypatch):
+        calls = []
+
+        async def fake_create(**kwargs):
+            calls.append(kwargs)
+
+        monkeypatch.setattr(scraper.anthropic.messages, "create", fake_create)
+
+        analysis, cost = await scraper._extract_educational_metadata({'markdown': 'Cookie policy.'}, "tutorial")
+
+        assert calls == []
+        assert analysis['low_quality'] is True
+        assert analysis['gate_rejection'] == "length"
+        assert cost == 0.0
+        gate_stats = scraper.get_stats()['gate_stats']
+        assert gate_stats['rejected_length'] == 1
+        assert gate_stats['length_rejection_rate'] == "100.0%"
+
+
+class TestStructuralCompression:
+    """Test token-budgeted compression ahead of Claude analysis"""
+
+    PAGE = "\n".join([
+        "[Home](/) | [Docs](/docs) | [Blog](/blog)",
+        "# Python Loops",
+        "Loops repeat code. " + "They save typing. " * 40,
+        "",
+        "Filler prose about loops. " * 60,
+        "",
+        "```python",
+        "for i in range(3):",
+        "    print(i)",
+        "```",
+        "",
+        "- Use `for` for sequences",
+        "- Use `while` for conditions",
+        "",
+        "© 2024 Example. All rights reserved.",
+    ])
+
+    def test_keeps_structure_and_drops_boilerplate_within_budget(self):
+        from src.scraping.compression import compress_markdown, estimate_tokens
+
+        compressed = compress_markdown(self.PAGE, token_budget=60)
+
+        assert estimate_tokens(compressed) <= 60
+        assert "# Python Loops" in compressed
+        assert "Loops repeat code." in compressed
+        assert "    print(i)" in compressed
+        assert "- Use `while` for conditions" in compressed
+        assert "[Docs]" not in compressed
+        assert "All rights reserved" not in compressed
+        assert "Filler prose" not in compressed
+
+    def test_short_pages_keep_their_prose(self):
+        from src.scraping.compression import compress_markdown
+
+        page = "# Loops\nLoops repeat code. They save typing.\n\nMore detail here."
+
+        assert compress_markdown(page, token_budget=2000) == (
+            "# Loops\n\nLoops repeat code. They save typing.\n\nMore detail here."
+        )
+
+    @pytest.mark.asyncio
+    async def test_prompt_uses_compressed_page_and_ratio_is_reported(self, scraper, monkeypatch):
+        from types import SimpleNamespace
+        from config.settings import settings
+        prompts = []
+
+        async def fake_create(**kwargs):
+            prompts.append(kwargs['messages'][0]['content'])
+            return SimpleNamespace(
+                content=[SimpleNamespace(text='{}')],
+                usage=SimpleNamespace(input_tokens=100, output_tokens=10)
+            )
+
+        monkeypatch.setattr(scraper.anthropic.messages, "create", fake_create)
+        monkeypatch.setattr(settings, "analysis_token_budget", 60)
+
+        await scraper._extract_educational_metadata({'markdown': self.PAGE}, "tutorial")
+
+        assert "Filler prose" not in prompts[0]
+        assert "print(i)" in prompts[0]
+        assert scraper.get_stats()['scraper_stats']['compression_ratio'] < 0.2
+
+
+class TestMarkdownScanner:
+    """Test single-pass markdown extraction"""
+
+    PAGE = "\n".join([
+        "# Python Loops",
+        "See the [range docs](https://docs.python.org/range) and `enumerate()`.",
+        "## Objectives",
+        "- Iterate over a list",
+        "2) Count with `range`",
+        "```python",
+        "for i in range(3):",
+        "    print(i)  # [not](a-link)",
+        "```",
+        "## Next steps",
+        "* Read [while loops](/while)",
+    ])
+
+    def test_extracts_code_links_headings_and_sections(self):
+        from src.scraping.markdown import scan_markdown
+
+        scan = scan_markdown(self.PAGE)
+
+        assert [(block.language, block.code) for block in scan.code_blocks] == [
+            ("python", "for i in range(3):\n    print(i)  # [not](a-link)")
+        ]
+        assert scan.inline_code == ["enumerate()", "range"]
+        assert [(link.text, link.url) for link in scan.links] == [
+            ("range docs", "https://docs.python.org/range"),
+            ("while loops", "/while")
+        ]
+        assert [(heading.level, heading.text) for heading in scan.headings] == [
+            (1, "Python Loops"), (2, "Objectives"), (2, "Next steps")
+        ]
+        assert [(item.text, item.section) for item in scan.list_items] == [
+            ("Iterate over a list", "Objectives"),
+            ("Count with `range`", "Objectives"),
+            ("Read [while loops](/while)", "Next steps")
+        ]
+
+    def test_unclosed_brackets_scan_in_linear_time(self):
+        import time
+        from src.scraping.markdown import scan_markdown
+
+        started = time.perf_counter()
+        scan = scan_markdown("[x](" * 50000 + "`" * 50000)
+
+        assert scan.links == [] and scan.inline_code == []
+        assert time.perf_counter() - started < 1.0
+
+    def test_json_is_found_amid_prose_and_braces(self):
+        from src.scraping.markdown import find_json_object
+
+        response = 'Use {braces} carefully.\n{"difficulty_level": "beginner", "tags": {"a": 1}}\nDone {}.'
+
+        assert find_json_object(response) == {"difficulty_level": "beginner", "tags": {"a": 1}}
+        assert find_json_object("no json {here") is None
+
+    def test_fallback_parse_reads_lists_under_headings(self, scraper):
+        analysis = "\n".join([
+            "## Learning objectives",
+            "1. Write a for loop",
+            "2. Use range()",
+            "## Code",
+            "```python",
+            "print('hi')",
+            "```",
+        ])
+
+        parsed = scraper._parse_educational_analysis(analysis)
+
+        assert parsed['learning_objectives'] == ["Write a for loop", "Use range()"]
+        assert parsed['code_examples'][0] == "print('hi')"
+
+
+class TestFirecrawlTransport:
+    """Test the non-blocking Firecrawl transport"""
+
+    @pytest.mark.asyncio
+    async def test_scrape_does_not_block_event_loop(self):
+        """A slow SDK call must leave the event loop free for other work"""
+        import time
+        from src.scraping.transport import FirecrawlTransport
+
+        class SlowClient:
+            def scrape(self, url, **options):
+                time.sleep(0.2)
+                return {'url': url, 'options': options}
+
+        transport = FirecrawlTransport(client=SlowClient(), max_workers=2)
+        finished = []
+
+        async def scrape():
+            scraped = await transport.scrape("https://example.com", {'formats': ['markdown']})
+            finished.append('scrape')
+            return scraped
+
+        async def ticker():
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+            finished.append('ticker')
+
+        scraped, _ = await asyncio.gather(scrape(), ticker())
+        transport.close()
+
+        assert scraped['options'] == {'formats': ['markdown']}
+        # The ticker only finishes first if the scrape ran off the loop thread
+        assert finished == ['ticker', 'scrape']
+        assert transport.get_stats()['requests'] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_scrape_streams_pages_from_one_job(self):
+        from firecrawl import FirecrawlApp
+        from src.scraping.transport import FirecrawlTransport, document_source_url
+        from tests.fake_firecrawl import FakeFirecrawlServer
+
+        urls = [f"https://example.com/lesson-{i}" for i in range(3)]
+
+        with FakeFirecrawlServer({url: f"# {url}" for url in urls}) as server:
+            client = FirecrawlApp(api_key="fc-test", api_url=server.url)
+            transport = FirecrawlTransport(client=client, max_workers=2)
+            documents = [
+                document async for document in transport.batch_scrape(
+                    urls, {'formats': ['markdown'], 'onlyMainContent': True},
+                    poll_interval=0.01
+                )
+            ]
+            transport.close()
+
+        assert [document_source_url(document) for document in documents] == urls
+        assert server.count('POST') == 1
+        assert server.requests[0][2]['onlyMainContent'] is True
+        assert transport.get_stats()['batch_jobs'] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_crawl_maps_pages_back_to_requested_urls(self, scraper, monkeypatch):
+        """A level costs one batch job and one rate-limiter token"""
+        from firecrawl import FirecrawlApp
+        from config.settings import settings
+        from src.scraping.crawler import EducationalCrawler
+        from src.scraping.transport import FirecrawlTransport
+        from tests.fake_firecrawl import FakeFirecrawlServer
+
+        lessons = [f"https://example.com/lesson-{i}" for i in range(4)]
+        pages = {url: f"# Lesson {url}" for url in lessons[:3]}
+        root = {'markdown': "\n".join(f"[Lesson {url}]({url}#top)" for url in lessons)}
+        monkeypatch.setattr(settings, "firecrawl_batch_poll_interval", 0.01)
+
+        with FakeFirecrawlServer(pages) as server:
+            client = FirecrawlApp(api_key="fc-test", api_url=server.url)
+            scraper.firecrawl = FirecrawlTransport(client=client, max_workers=2)
+
+            crawler = EducationalCrawler(scraper, max_depth=2, batch=True)
+            crawled = await crawler.crawl("https://example.com/", root)
+            scraper.firecrawl.close()
+
+        assert [page['url'] for page in crawled] == lessons[:3]
+        assert [page['index'] for page in crawled] == [1, 2, 3]
+        assert crawled[0]['content']['metadata']['source_url'] == lessons[0]
+        assert crawler.stats['pages_failed'] == 1
+        assert server.count('POST') == 1
+        assert scraper.rate_limiter.get_stats()['firecrawl']['total_requests'] == 1
+